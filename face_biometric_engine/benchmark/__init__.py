@@ -0,0 +1 @@
+# Benchmarks for inference, preprocessing and liveness paths. Run from repo root with python -m.
@@ -0,0 +1,65 @@
+"""
+Per-call host allocations (tracemalloc) and latency: reusable NCHW input buffers vs the
+previous allocate-per-call path (astype copy, transpose + newaxis, .float(), .astype on output).
+Checks both paths give the same embeddings, and that an embedding returned earlier is not
+overwritten when the buffers are reused by the next call.
+Run from repository root: python -m face_biometric_engine.benchmark.bench_buffers
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from ..embedding import extractor
+from ._common import print_table, time_call, traced_peak_kib
+
+TOLERANCE = 1e-6  # same model and input values; only the input memory layout differs
+
+
+def _legacy_extract(face_rgb: np.ndarray) -> np.ndarray:
+    """The pre-buffer encode path, kept here only as the benchmark baseline."""
+    import torch
+    face_rgb = face_rgb.astype(np.float32) / 255.0 if face_rgb.dtype != np.float32 else face_rgb
+    x = np.transpose(face_rgb, (2, 0, 1))[np.newaxis, ...]
+    t = torch.from_numpy(x).float().to(extractor._embedding_device)
+    with torch.no_grad():
+        emb = extractor._embedding_model(t).cpu().numpy().squeeze()
+    return emb.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encoder input buffer allocations and latency")
+    parser.add_argument("--iters", type=int, default=200)
+    args = parser.parse_args()
+
+    extractor.load_embedding_model()
+    rng = np.random.default_rng(0)
+    checks, rows = [], []
+    for label, face in (
+        ("face uint8", (rng.random((112, 112, 3)) * 255).astype(np.uint8)),
+        ("face float32", rng.random((112, 112, 3), dtype=np.float32)),
+    ):
+        other = face[::-1].copy()
+        first = extractor.extract_embeddings([face])[0].rgb_embedding
+        second = extractor.extract_embeddings([other])[0].rgb_embedding
+        diff = max(
+            float(np.max(np.abs(first - _legacy_extract(face)))),
+            float(np.max(np.abs(second - _legacy_extract(other)))),
+        )
+        checks.append([label, f"{diff:.2e}", "ok" if diff <= TOLERANCE else "FAIL"])
+        for path, fn in (
+            ("per-call", lambda: _legacy_extract(face)),
+            ("buffers", lambda: extractor.extract_embeddings([face])),
+        ):
+            lat = time_call(fn, args.iters)
+            rows.append([label, path, traced_peak_kib(fn), lat["p50_ms"], lat["p99_ms"]])
+    print_table(["input", "max_embedding_diff", "check"], checks)
+    print()
+    print_table(["input", "path", "peak_kib_per_call", "p50_ms", "p99_ms"], rows)
+    if any(row[-1] != "ok" for row in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Frame capture: open / read / release per frame (the old capture_frame path) vs a persistent
+CaptureSession replaying a synthetic MJPG video written to a temp dir (no camera needed). Checks
+session frames are views into the ring buffer, match the decoded file frame for their sequence
+number, and that a held frame is not overwritten while the grab thread keeps running. On a real
+camera the per-frame open also pays device init / auto-exposure, so the gap is far larger.
+Run from repository root: python -m face_biometric_engine.benchmark.bench_capture
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..capture.session import CaptureSession
+from ._common import print_table, time_call, traced_peak_kib
+
+
+def _write_video(path: Path, n: int, fps: float, width: int, height: int) -> list:
+    """Moving gradient with a per-frame block pattern; returns the frames as decoded from the file."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    if not writer.isOpened():
+        raise SystemExit("cannot write MJPG video")
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    for i in range(n):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[...] = ((x + 8 * i) % 256).astype(np.uint8)[None, :, None]
+        frame[: height // 4, : width // 4] = (37 * i) % 256
+        writer.write(frame)
+    writer.release()
+    cap = cv2.VideoCapture(str(path))
+    decoded = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        decoded.append(frame)
+    cap.release()
+    return decoded
+
+
+def _open_read_release(path: str) -> np.ndarray:
+    cap = cv2.VideoCapture(path)
+    _, frame = cap.read()
+    cap.release()
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame device open vs persistent capture session")
+    parser.add_argument("--iters", type=int, default=100)
+    parser.add_argument("--frames", type=int, default=60, help="frames in the replay video")
+    parser.add_argument("--fps", type=float, default=100.0, help="replay pacing of the session")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--slots", type=int, default=4)
+    args = parser.parse_args()
+    if cv2 is None:
+        raise SystemExit("opencv is required")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "replay.avi")
+        ref = _write_video(Path(path), args.frames, args.fps, args.width, args.height)
+        n = len(ref)
+
+        checks = []
+        with CaptureSession(path, slots=args.slots) as session:
+            if not session.running:
+                raise SystemExit(session.error)
+            seqs, views, same = [], 0, 0
+            for _ in range(2 * n):  # laps the file: replay rewinds at the end
+                f = session.read()
+                seqs.append(f.seq)
+                views += np.shares_memory(f.image, session._ring)
+                same += np.array_equal(f.image, ref[(f.seq - 1) % n])
+            distinct = len(set(seqs)) == len(seqs) and seqs == sorted(seqs)
+            checks.append(["zero-copy views", f"{views}/{len(seqs)}", "ok" if views == len(seqs) else "FAIL"])
+            checks.append(["fresh reads distinct, in order", f"{len(set(seqs))}/{len(seqs)}", "ok" if distinct else "FAIL"])
+            checks.append(["frame == decoded file frame", f"{same}/{len(seqs)}", "ok" if same == len(seqs) else "FAIL"])
+
+            held = session.read()
+            expected = ref[(held.seq - 1) % n]
+            time.sleep(4 * args.slots / args.fps)  # grab thread laps the ring several times
+            kept = np.array_equal(held.image, expected) and session.metrics()["frames"] > held.seq + args.slots
+            checks.append(["held frame kept while grabbing", f"{session.metrics()['frames'] - held.seq} grabs", "ok" if kept else "FAIL"])
+
+        rows = []
+        fn = lambda: _open_read_release(path)
+        lat = time_call(fn, args.iters, warmup=3)
+        rows.append(["open/read/release per frame", traced_peak_kib(fn, iters=10), lat["p50_ms"], lat["p99_ms"]])
+        for label, realtime, fresh in (
+            (f"session, next frame ({args.fps:g} fps replay)", True, True),
+            ("session, next frame (unpaced)", False, True),
+            ("session, latest frame", True, False),
+        ):
+            with CaptureSession(path, slots=args.slots, realtime=realtime) as session:
+                fn = lambda: session.read(fresh=fresh)
+                lat = time_call(fn, args.iters, warmup=3)
+                rows.append([label, traced_peak_kib(fn, iters=10), lat["p50_ms"], lat["p99_ms"]])
+
+    print_table(["check", "detail", "result"], checks)
+    print()
+    print_table(["path", "peak_kib_per_call", "p50_ms", "p99_ms"], rows)
+    if any(row[-1] != "ok" for row in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Eager vs compiled (TorchScript trace + freeze) face embedding latency, p50/p99 per batch size.
+Run from repository root: python -m face_biometric_engine.benchmark.bench_compile
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from ..embedding import extractor
+from ..inference.compile import compiled_models
+from ._common import print_table, time_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eager vs compiled embedding latency")
+    parser.add_argument("--iters", type=int, default=200)
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for compiled in (False, True):
+        extractor.load_embedding_model(device=args.device, compiled=compiled, warmup_batch_sizes=args.batch_sizes)
+        for b in args.batch_sizes:
+            faces = list(rng.random((b, 112, 112, 3), dtype=np.float32))
+            results[(compiled, b)] = time_call(lambda: extractor.extract_embeddings(faces, device=args.device), args.iters)
+    print(f"compile status: {compiled_models()}")
+    rows = []
+    for b in args.batch_sizes:
+        e, c = results[(False, b)], results[(True, b)]
+        rows.append(["face", b, e["p50_ms"], e["p99_ms"], c["p50_ms"], c["p99_ms"], e["p50_ms"] / (c["p50_ms"] + 1e-9)])
+    print_table(["modality", "batch", "eager_p50", "eager_p99", "compiled_p50", "compiled_p99", "p50_speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Face liveness texture / motion cues: OpenCV-native (cvtColor + cv2.norm L1 over shifted views)
+vs the numpy reference (float64 dot, np.diff, float32 copies). Checks score equivalence on
+synthetic crops across texture levels plus flat, repeated and pure-noise frames, for float32
+[0, 1] and uint8 inputs (exits non-zero on a mismatch), then times both.
+Run from repository root: python -m face_biometric_engine.benchmark.bench_liveness_cues
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..liveness import detector
+from ._common import print_table, time_call, traced_peak_kib
+
+# Luma is computed in float32 instead of float64: differences are rounding only
+TOLERANCE = 1e-4
+
+
+def _crops(rng: np.random.Generator, n: int, dtype) -> list:
+    """Smooth base face-like crops plus noise of varying strength, so texture scores do not saturate."""
+    out = []
+    for i in range(n):
+        base = cv2.GaussianBlur(rng.random((112, 112, 3), dtype=np.float32), (0, 0), 6)
+        noise = rng.normal(0, 0.0003 * (i % 8), base.shape).astype(np.float32)
+        crop = np.clip(0.5 + 0.2 * (base - 0.5) + noise, 0, 1)  # texture scores ~0.15 .. 1
+        out.append(crop)
+    # Degenerate inputs: flat crop (zero texture), repeated frame (zero motion), pure noise (saturated)
+    out += [np.full_like(out[0], 0.5), out[-1].copy(), out[-1].copy(), rng.random(out[0].shape, dtype=np.float32)]
+    return [(c * 255).round().astype(np.uint8) for c in out] if dtype == np.uint8 else out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenCV vs numpy face liveness cues")
+    parser.add_argument("--iters", type=int, default=500)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+    if cv2 is None:
+        raise SystemExit("opencv is required")
+
+    rng = np.random.default_rng(0)
+    checks, rows = [], []
+    for dtype in (np.float32, np.uint8):
+        crops = _crops(rng, args.samples, dtype)
+        tex = max(abs(detector._texture_score(c) - detector._texture_score_np(c)) for c in crops)
+        mot = max(
+            abs(detector._frame_motion(a, b) - detector._frame_motion_np(a, b)) / max(1.0, detector._frame_motion_np(a, b))
+            for a, b in zip(crops, crops[1:])
+        )
+        ok = tex <= TOLERANCE and mot <= TOLERANCE
+        checks.append([np.dtype(dtype).name, f"{tex:.2e}", f"{mot:.2e}", "ok" if ok else "FAIL"])
+
+        a, b = crops[0], crops[1]
+        for cue, cv_fn, np_fn in (
+            ("texture", lambda: detector._texture_score(a), lambda: detector._texture_score_np(a)),
+            ("motion", lambda: detector._frame_motion(a, b), lambda: detector._frame_motion_np(a, b)),
+        ):
+            for path, fn in (("numpy", np_fn), ("opencv", cv_fn)):
+                lat = time_call(fn, args.iters)
+                rows.append([np.dtype(dtype).name, cue, path, traced_peak_kib(fn), lat["p50_ms"], lat["p99_ms"]])
+
+    print_table(["dtype", "max_texture_score_diff", "max_motion_rel_diff", "check"], checks)
+    print()
+    print_table(["dtype", "cue", "path", "peak_kib_per_call", "p50_ms", "p99_ms"], rows)
+    if any(row[-1] != "ok" for row in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Live capture pipeline: capture, preprocess and embed one frame after another (StagedExecutor with
+threaded=False, the old loop) vs overlapped on stage threads with bounded queues. The camera is
+simulated: each read blocks --capture-ms (exposure + readout) and returns a pre-rendered frame,
+so runs are deterministic and need no device; preprocessing and embedding are the real
+preprocess_frame and extract_embeddings. Checks both modes produce the same embeddings in frame
+order and that stopping on a decision cancels the stages, then reports latency and per-stage
+utilisation.
+Run from repository root: python -m face_biometric_engine.benchmark.bench_staged
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..embedding import extractor
+from ..inference.metrics import LatencyRecorder
+from ..inference.staged import StagedExecutor
+from ..preprocess.pipeline import preprocess_frame
+from ._common import print_table
+
+
+def _stages(frames, capture_ms: float):
+    def capture(i):
+        time.sleep(capture_ms / 1000.0)
+        return i, frames[i].copy()
+
+    def preprocess(item):
+        i, rgb = item
+        prep = preprocess_frame(rgb, None)
+        return (i, prep.face_rgb) if prep.num_faces == 1 else None
+
+    def infer(item):
+        i, face = item
+        return i, extractor.extract_embeddings([face])[0].rgb_embedding
+
+    return [("capture", capture), ("preprocess", preprocess), ("infer", infer)]
+
+
+def _run(frames, capture_ms: float, threaded: bool, stop_at: int = -1):
+    out = []
+    with StagedExecutor(range(len(frames)), _stages(frames, capture_ms), threaded=threaded, name="bench") as staged:
+        for i, emb in staged:
+            out.append((i, emb))
+            if i == stop_at:
+                break
+    return out, staged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs staged capture -> preprocess -> embed")
+    parser.add_argument("--iters", type=int, default=5)
+    parser.add_argument("--frames", type=int, nargs="+", default=[5, 10])
+    parser.add_argument("--capture-ms", type=float, default=33.0, help="simulated blocking time per camera read")
+    args = parser.parse_args()
+    if cv2 is None:
+        raise SystemExit("opencv is required")
+
+    extractor.load_embedding_model()
+    rng = np.random.default_rng(0)
+    checks, rows, util = [], [], []
+    for n in args.frames:
+        frames = [cv2.GaussianBlur(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8), (0, 0), 3) for _ in range(n)]
+        seq, _ = _run(frames, args.capture_ms, threaded=False)
+        par, _ = _run(frames, args.capture_ms, threaded=True)
+        same = [i for i, _ in seq] == [i for i, _ in par] and all(np.array_equal(a, b) for (_, a), (_, b) in zip(seq, par))
+        stop = n // 2
+        early, staged = _run(frames, args.capture_ms, threaded=True, stop_at=stop)
+        captured = staged.metrics()["stages"]["capture"]["items"]
+        stopped = [i for i, _ in early] == list(range(stop + 1)) and staged.cancelled and captured < n
+        checks.append([n, len(par), "yes" if same else "no", f"at {stop}, {captured}/{n} captured", "ok" if same and stopped else "FAIL"])
+
+        for mode, threaded in (("sequential", False), ("staged", True)):
+            rec = LatencyRecorder(window=args.iters)
+            for _ in range(args.iters):
+                with rec.time():
+                    _, staged = _run(frames, args.capture_ms, threaded)
+            lat = rec.summary()
+            rows.append([n, mode, lat["p50_ms"], lat["p99_ms"]])
+            for stage, m in staged.metrics()["stages"].items():
+                util.append([n, mode, stage, m["utilisation"], m["wait_ms"], m["blocked_ms"]])
+
+    print_table(["frames", "outputs", "same_embeddings", "stop_on_decision", "check"], checks)
+    print()
+    print_table(["frames", "mode", "p50_ms", "p99_ms"], rows)
+    print()
+    print_table(["frames", "mode", "stage", "utilisation", "wait_ms", "blocked_ms"], util)
+    if any(row[-1] != "ok" for row in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
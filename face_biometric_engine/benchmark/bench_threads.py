@@ -0,0 +1,68 @@
+"""
+Throughput / latency curve for CPU thread-budget splits under concurrent requests.
+Each request runs detection + crop + embedding on a synthetic frame; the split is applied
+through inference.threads.apply_thread_budget exactly as init_pipeline() does.
+Run from repository root: python -m face_biometric_engine.benchmark.bench_threads --concurrency 4
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ..embedding import extractor
+from ..inference.metrics import LatencyRecorder
+from ..inference.threads import apply_thread_budget
+from ..preprocess.pipeline import preprocess_frame
+from ._common import print_table
+
+DEFAULT_SPLITS = "1:0:0,0.5:0.25:0.25,0.25:0.5:0.25,0.25:0.25:0.25"
+
+
+def _parse_split(spec: str) -> dict:
+    torch_f, cv_f, blas_f = (float(x) for x in spec.split(":"))
+    return {"torch": torch_f, "opencv": cv_f, "blas": blas_f}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Thread budget split sweep")
+    parser.add_argument("--budget", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=4, help="simultaneous requests")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--splits", default=DEFAULT_SPLITS, help="torch:opencv:blas fractions, comma-separated")
+    args = parser.parse_args()
+
+    extractor.load_embedding_model()
+    rng = np.random.default_rng(0)
+    frame = (rng.random((480, 640, 3)) * 255).astype(np.uint8)
+
+    def request():
+        prep = preprocess_frame(frame)
+        extractor.extract_embeddings([prep.face_rgb])
+
+    rows = []
+    for spec in args.splits.split(","):
+        plan = apply_thread_budget(args.budget, workers=1, split=_parse_split(spec))
+        rec = LatencyRecorder(window=args.requests)
+
+        def timed(_):
+            with rec.time():
+                request()
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(timed, range(args.concurrency * 2)))  # warmup
+            rec = LatencyRecorder(window=args.requests)
+            t0 = time.perf_counter()
+            list(pool.map(timed, range(args.requests)))
+            elapsed = time.perf_counter() - t0
+        lat = rec.summary()
+        threads = f"{plan['torch']}/{plan['opencv']}/{plan['blas']}"
+        rows.append([spec, threads, args.requests / elapsed, lat["p50_ms"], lat["p99_ms"]])
+    print_table(["split", "torch/cv/blas", "req_per_s", "p50_ms", "p99_ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
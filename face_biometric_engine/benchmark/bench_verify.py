@@ -0,0 +1,85 @@
+"""
+Multi-frame verification: live frames embedded / fused / decided one after another vs raced on
+the verify pool (OrderedRace) through the micro-batching scheduler, as the pipeline does. The
+reference is the embedding of one frame, so that frame is the first accept; checks both modes
+settle on the same frame and scores, then reports latency with the accept at the last frame and
+with no accept at all.
+Run from repository root: python -m face_biometric_engine.benchmark.bench_verify
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from ..config import INFERENCE_BATCH_WINDOW_MS, INFERENCE_MAX_BATCH_SIZE, REJECT_THRESHOLD
+from ..decision.engine import decide
+from ..embedding import extractor
+from ..fusion.fusion import fuse_signals
+from ..inference.executor import OrderedRace, configure_executor
+from ..inference.scheduler import MicroBatchScheduler
+from ._common import print_table, time_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs concurrent multi-frame verification")
+    parser.add_argument("--iters", type=int, default=30)
+    parser.add_argument("--frames", type=int, nargs="+", default=[3, 5, 10])
+    parser.add_argument("--workers", type=int, default=None, help="verify pool size (default min(4, cpus))")
+    args = parser.parse_args()
+
+    extractor.load_embedding_model()
+    configure_executor(verify_workers=args.workers)
+    scheduler = MicroBatchScheduler(
+        lambda items: extractor.extract_embeddings([rgb for rgb, _ in items], [d for _, d in items]),
+        max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+        max_wait_ms=INFERENCE_BATCH_WINDOW_MS,
+        name="bench-embedding",
+    )
+    scheduler.start()
+    rng = np.random.default_rng(0)
+    checks, rows = [], []
+    try:
+        for n in args.frames:
+            crops = [rng.random((112, 112, 3), dtype=np.float32) for _ in range(n)]
+            target = scheduler.run((crops[-1], None))
+            ref = target.rgb_embedding
+            # Accept exactly at the frame whose embedding is the reference
+            threshold = fuse_signals(ref, ref, 1.0, motion_consistency=1.0).score - 1e-6
+
+            def verify_frame(item, ref=ref, threshold=threshold):
+                i, crop = item
+                emb = scheduler.run((crop, None))
+                fusion = fuse_signals(emb.rgb_embedding, ref, 1.0, motion_consistency=1.0)
+                return i, fusion.score, decide(fusion, accept_threshold=threshold, reject_threshold=REJECT_THRESHOLD).decision
+
+            def run(concurrent: bool, accept: bool = True):
+                race = OrderedRace(verify_frame, lambda r: accept and r[2] == "accept", concurrent=concurrent)
+                with race:
+                    for item in enumerate(crops):
+                        if not race.submit(item):
+                            break
+                    return race.finish()
+
+            seq, par = run(False), run(True)
+            same = [r[0] for r in seq] == [r[0] for r in par] and [r[2] for r in seq] == [r[2] for r in par]
+            diff = max(abs(a[1] - b[1]) for a, b in zip(seq, par))
+            ok = same and diff <= 1e-5 and seq[-1][0] == n - 1 and seq[-1][2] == "accept"
+            checks.append([n, seq[-1][0], seq[-1][2], f"{diff:.2e}", "ok" if ok else "FAIL"])
+
+            for case, accept in (("accept at last frame", True), ("no accept", False)):
+                for mode, concurrent in (("sequential", False), ("concurrent", True)):
+                    lat = time_call(lambda: run(concurrent, accept), args.iters, warmup=3)
+                    rows.append([n, case, mode, lat["p50_ms"], lat["p99_ms"]])
+    finally:
+        scheduler.stop()
+
+    print_table(["frames", "settled_frame", "decision", "max_score_diff", "check"], checks)
+    print()
+    print_table(["frames", "case", "mode", "p50_ms", "p99_ms"], rows)
+    if any(row[-1] != "ok" for row in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
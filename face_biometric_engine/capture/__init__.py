@@ -2,7 +2,18 @@
 Capture module: 3D facial data acquisition.
 - Prefer depth sensors (structured light / ToF / LiDAR) when available.
 - Fallback: RGB + software depth estimation.
+- Persistent sessions: the camera (or a replay file) is opened once and grabbed on a background thread.
 """
 from .capture_3d import capture_frame, CaptureResult, get_capture_backend
+from .session import CaptureSession, Frame, get_capture_session, close_capture_sessions, capture_session_metrics
 
-__all__ = ["capture_frame", "CaptureResult", "get_capture_backend"]
+__all__ = [
+    "capture_frame",
+    "CaptureResult",
+    "get_capture_backend",
+    "CaptureSession",
+    "Frame",
+    "get_capture_session",
+    "close_capture_sessions",
+    "capture_session_metrics",
+]
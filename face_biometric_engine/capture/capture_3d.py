@@ -16,6 +16,9 @@ try:
 except ImportError:
     cv2 = None  # type: ignore
 
+from ..config import CAPTURE_REPLAY_PATH, CAPTURE_SESSION
+from .session import get_capture_session
+
 
 @dataclass
 class CaptureResult:
@@ -25,22 +28,7 @@ class CaptureResult:
     depth_available: bool = False
     timestamp: float = 0.0
     source: str = "rgb"  # "rgb" | "structured_light" | "tof" | "lidar" | "estimated"
-
-
-def _estimate_depth_from_rgb(rgb: np.ndarray) -> np.ndarray:
-    """
-    Fallback depth estimation from RGB (e.g. simple gradient-based or placeholder).
-    Production: replace with MiDaS / DPT / or similar lightweight depth estimator.
-    """
-    if cv2 is None:
-        h, w = rgb.shape[:2]
-        return np.zeros((h, w), dtype=np.float32)
-    gray = cv2.cvtColor(rgb, cv2.COLOR_BGR2GRAY)
-    # Placeholder: Laplacian variance as proxy for "depth-like" structure
-    lap = cv2.Laplacian(gray, cv2.CV_64F)
-    depth_proxy = np.abs(lap)
-    depth_proxy = (depth_proxy - depth_proxy.min()) / (depth_proxy.max() - depth_proxy.min() + 1e-8)
-    return depth_proxy.astype(np.float32)
+    # "estimated": no depth here; it is estimated later on the aligned face crop (preprocess.depth)
 
 
 def _try_depth_sensor(width: int, height: int) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], str]:
@@ -66,7 +54,10 @@ def capture_frame(
     use_depth_fallback: bool = True,
 ) -> CaptureResult:
     """
-    Capture one frame: prefer 3D sensor, else RGB + optional depth estimation.
+    Capture one frame: prefer 3D sensor, else RGB only. With use_depth_fallback the frame is
+    marked source="estimated" and depth is estimated on the face crop during preprocessing.
+    With CAPTURE_SESSION the RGB frame comes from the process-wide capture session (camera 0 or
+    CAPTURE_REPLAY_PATH) as a view into its ring buffer, timestamped at grab time.
     """
     ts = time.time()
     rgb_frame = None
@@ -78,17 +69,21 @@ def capture_frame(
 
     # 2) Fallback: RGB camera only
     if rgb_frame is None and cv2 is not None:
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-        ret, rgb_frame = cap.read()
-        cap.release()
+        if CAPTURE_SESSION:
+            session = get_capture_session(CAPTURE_REPLAY_PATH or 0, width, height)
+            frame = session.read() if session is not None else None
+            ret = frame is not None
+            if ret:
+                rgb_frame, ts = frame.image, frame.timestamp
+        else:
+            cap = cv2.VideoCapture(CAPTURE_REPLAY_PATH or 0)
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            ret, rgb_frame = cap.read()
+            cap.release()
         if ret and rgb_frame is not None:
             if use_depth_fallback:
-                depth_frame = _estimate_depth_from_rgb(rgb_frame)
                 source = "estimated"
-            else:
-                depth_frame = None
         else:
             rgb_frame = np.zeros((height, width, 3), dtype=np.uint8)
 
@@ -14,14 +14,53 @@ TEMPLATES_DIR = BASE_DIR / "data" / "templates"  # encrypted templates only
 CAPTURE_FPS = 30
 PREFER_DEPTH = True  # Use depth sensor when available (structured light / ToF / LiDAR)
 DEPTH_ESTIMATION_FALLBACK = True  # RGB + depth estimation when no hardware depth
+DEPTH_ESTIMATOR_BACKEND = "laplacian"  # "laplacian" (proxy) | "dnn" (learned model; falls back to laplacian if missing)
+DEPTH_ESTIMATOR_MODEL = MODELS_DIR / "depth" / "face_depth.onnx"
+DEPTH_ESTIMATOR_INPUT_SIZE = 128  # px, square model input (estimation runs on the aligned face crop)
 CAPTURE_RESOLUTION = (640, 480)  # width, height
+CAPTURE_SESSION = True  # keep the camera open; a background thread grabs into a ring buffer (no per-frame open)
+CAPTURE_RING_SLOTS = 4  # preallocated frames (>= 3); the frame last handed out is not overwritten before the next read
+CAPTURE_REPLAY_PATH: Optional[str] = None  # video file / image sequence ("frames/%04d.png") replayed instead of camera 0
 DEPTH_RESOLUTION = (320, 240) if PREFER_DEPTH else None
 
+# Face detection
+FACE_DETECTOR_BACKEND = "haar"  # "haar" | "dnn" (OpenCV DNN SSD; falls back to haar if the model is missing)
+FACE_DETECTOR_DNN_MODEL = MODELS_DIR / "face_detector" / "res10_300x300_ssd_iter_140000.caffemodel"
+FACE_DETECTOR_DNN_CONFIG: Optional[Path] = MODELS_DIR / "face_detector" / "deploy.prototxt"
+FACE_DETECTOR_DNN_CONFIDENCE = 0.6
+FACE_DETECTION_WIDTH = 320  # frames are downscaled to this width for detection (0 = full resolution)
+FACE_MIN_SIZE = 80  # px at full resolution
+FACE_TRACKING = True  # multi-frame bursts: detect once, then track (re-detect on loss)
+TRACK_SEARCH_PAD = 0.5  # search ROI = bbox padded by this fraction of its size on each side
+TRACK_MIN_SCORE = 0.6  # normalized cross-correlation below this = track lost
+TRACK_TEMPLATE_WIDTH = 48  # template and search ROI are matched at this face width (px)
+TRACK_MAX_FRAMES = 30  # force a full re-detect after this many tracked frames
+
+# Frame quality gate (thumbnail measures before detection / liveness / embedding)
+QUALITY_GATE = True
+QUALITY_THUMB_WIDTH = 160  # measures are taken on a grayscale thumbnail of this width
+QUALITY_MIN_SHARPNESS = 15.0  # Laplacian variance on the thumbnail; below = blurry
+QUALITY_EXPOSURE_RANGE = (40.0, 220.0)  # acceptable mean luma
+QUALITY_MAX_CLIPPED = 0.25  # max fraction of thumbnail pixels <= 5 or >= 250
+QUALITY_MAX_MOTION_ANISOTROPY = 0.85  # gradient structure-tensor anisotropy above = motion blur
+QUALITY_MIN_FRAME_SIDE = 240  # px, short side of the input frame
+QUALITY_MIN_REGION_FRACTION = 0.02  # min detected face bbox area as a fraction of the frame
+
+# Near-duplicate frame elimination (multi-frame API requests)
+DEDUP_FRAMES = True
+DEDUP_MAX_HAMMING = 4  # 64-bit dHash distance at or below which consecutive frames are duplicates
+DEDUP_MIN_FRAMES = 3  # never keep fewer frames than this (liveness needs several)
+
 # Liveness
+LIVENESS_CASCADE = True  # check_liveness: texture gate first, skip the other cues once a frame is certainly rejected
 LIVENESS_WINDOW_SEC = 2.0
 LIVENESS_MIN_FRAMES = 45  # ~22.5 fps over 2s
 BLINK_MIN_INTERVAL_SEC = 0.1
 BLINK_MAX_INTERVAL_SEC = 0.4
+BLINK_LANDMARK_BACKEND = "contour"  # "contour" (eye-blob outline on the face crop) | "lbf" (OpenCV contrib FacemarkLBF; falls back to contour)
+BLINK_LANDMARK_MODEL = MODELS_DIR / "landmarks" / "lbfmodel.yaml"
+BLINK_EAR_CLOSED_RATIO = 0.7  # eye closed when EAR drops below this fraction of the open-eye baseline
+BLINK_FRAME_BUDGET_MS = 2.0  # per-frame landmark budget; a backend with a slower median falls back to contour
 DEPTH_CONSISTENCY_THRESHOLD = 0.15  # max normalized depth std for live face
 TEXTURE_SPOOF_THRESHOLD = 0.35  # below = suspicious (flat/printed)
 MICRO_MOTION_MIN_VARIANCE = 0.5  # pixel motion variance for live
@@ -33,6 +72,23 @@ DEVICE = "cpu"  # "cuda" | "cpu" | "mps"
 ON_DEVICE_INFERENCE = True
 EDGE_FALLBACK_URL: Optional[str] = None  # optional edge/cloud verification URL
 
+# Inference scheduling (micro-batching of concurrent requests)
+INFERENCE_BATCHING = True
+INFERENCE_BATCH_WINDOW_MS = 5.0  # max time the first queued crop waits for a batch to fill
+INFERENCE_MAX_BATCH_SIZE = 16
+COMPILE_MODELS = False  # TorchScript trace + freeze at init_pipeline(); falls back to eager on failure
+COMPILE_WARMUP_BATCH_SIZES = (1, 2, 4, 8, INFERENCE_MAX_BATCH_SIZE)
+EMBEDDING_CACHE_SIZE = 0  # in-memory LRU keyed by crop digest + model version (0 = off); never persisted
+
+# CPU thread budget: cores are split across API workers, then across torch / OpenCV / BLAS
+CPU_THREAD_BUDGET: Optional[int] = None  # total cores to use; None = os.cpu_count()
+THREAD_SPLIT = {"torch": 0.5, "opencv": 0.25, "blas": 0.25}  # fractions of each worker's share
+PREPROCESS_WORKERS: Optional[int] = None  # shared pool preprocessing burst frames in parallel; None = min(4, cpus)
+CONCURRENT_VERIFICATION = True  # live frames embed / match / decide in parallel; the first accept (by frame index) cancels later frames
+VERIFY_WORKERS: Optional[int] = None  # bounded pool for concurrent per-frame verification; None = min(4, cpus)
+PIPELINED_CAPTURE = True  # camera runs: capture, preprocess + liveness and inference overlap on stage threads
+STAGE_QUEUE_SIZE = 1  # frames waiting between two stages; a full queue blocks the stage feeding it
+
 # Fusion
 FUSION_WEIGHTS = {
     "rgb_embedding": 0.40,
@@ -59,5 +115,9 @@ TEMPLATE_HASH_SALT_ENV = "BIOMETRIC_TEMPLATE_SALT"
 # API
 API_HOST = "0.0.0.0"
 API_PORT = 8000
+API_WORKERS = 1  # uvicorn worker processes; shares CPU_THREAD_BUDGET
 ENROLLMENT_MIN_SAMPLES = 3
 VERIFICATION_TIMEOUT_SEC = 10
+STREAM_MAX_FRAMES = 60  # /verify/stream: frames processed before deciding with the last one
+STREAM_REJECT_AFTER = 5  # consecutive per-frame reject decisions that end a stream early (0 = never)
+STREAM_TIMEOUT_SEC = VERIFICATION_TIMEOUT_SEC  # /verify/stream time budget from connect to decision
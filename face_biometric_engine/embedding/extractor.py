@@ -6,7 +6,7 @@ On-device inference with optional edge/cloud fallback.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional, Sequence
 
 import numpy as np
 
@@ -17,6 +17,10 @@ except ImportError:
     torch = None
     nn = None
 
+from ..inference.buffers import BufferPool, write_unit_float
+from ..inference.cache import EmbeddingCache
+from ..inference.compile import compile_module
+
 
 @dataclass
 class EmbeddingResult:
@@ -59,30 +63,45 @@ class _SimpleEmbeddingNet(nn.Module if nn else object):
 
 _embedding_model = None
 _embedding_device = "cpu"
+_input_buffers = BufferPool()
+_embedding_cache = EmbeddingCache()
+_embedding_version = ""
 
 
-def load_embedding_model(device: str = "cpu", dim: int = 512) -> None:
-    """Load embedding model (ArcFace/MagFace/ViT). Here: minimal placeholder net."""
-    global _embedding_model, _embedding_device
+def load_embedding_model(
+    device: str = "cpu",
+    dim: int = 512,
+    compiled: bool = False,
+    warmup_batch_sizes: Sequence[int] = (1,),
+    cache_size: int = 0,
+) -> None:
+    """
+    Load embedding model (ArcFace/MagFace/ViT). Here: minimal placeholder net.
+    compiled: trace + freeze and warm for warmup_batch_sizes; eager if that fails.
+    cache_size: entries in the in-memory crop-digest -> embedding LRU (0 disables).
+    """
+    global _embedding_model, _embedding_device, _embedding_version
+    _embedding_cache.resize(cache_size)
+    _embedding_version = f"simple-cnn:{dim}:{'compiled' if compiled else 'eager'}"
     if torch is not None and nn is not None:
         _embedding_model = _SimpleEmbeddingNet(out_dim=dim)
         _embedding_model.eval()
+        _embedding_model.to(device)
         _embedding_device = device
+        if compiled:
+            _embedding_model = compile_module(
+                _embedding_model,
+                lambda b: (torch.rand(b, 3, 112, 112, device=device),),
+                warmup_batch_sizes,
+                name="face_embedding",
+            )
     else:
         _embedding_model = None
         _embedding_device = device
 
 
-def extract_embedding(
-    face_rgb: np.ndarray,
-    face_depth: Optional[np.ndarray] = None,
-    model_name: str = "arcface",
-    device: str = "cpu",
-) -> EmbeddingResult:
-    """
-    Extract 512-d normalized embedding from RGB face; optionally from depth.
-    face_rgb: HxWx3 float [0,1] or uint8.
-    """
+def _to_model_input(face_rgb: np.ndarray) -> np.ndarray:
+    """HxWx3 float [0,1] or uint8 -> 112x112x3 float32."""
     if face_rgb.dtype != np.float32:
         face_rgb = face_rgb.astype(np.float32) / 255.0
     if face_rgb.ndim == 2:
@@ -90,23 +109,80 @@ def extract_embedding(
     if face_rgb.shape[0] != 112 or face_rgb.shape[1] != 112:
         import cv2
         face_rgb = cv2.resize(face_rgb, (112, 112))
-    # CHW, batch
-    x = np.transpose(face_rgb, (2, 0, 1))[np.newaxis, ...]
+    return face_rgb
+
 
+def _write_chw(dst: np.ndarray, face_rgb: np.ndarray) -> None:
+    """Write one face into a 3x112x112 float32 slot (same values as _to_model_input, no temporaries)."""
+    if face_rgb.shape[0] != 112 or face_rgb.shape[1] != 112:
+        face_rgb = _to_model_input(face_rgb)
+    # HxW gray broadcasts across the 3 channels
+    src = np.moveaxis(face_rgb, -1, 0) if face_rgb.ndim == 3 else face_rgb
+    write_unit_float(dst, src)
+
+
+def _forward_batch(faces_rgb: Sequence[np.ndarray]) -> List[np.ndarray]:
+    """
+    One forward pass over faces (a list of crops or an (N, 112, 112, 3) batch array); rows are
+    views of the fresh output (no per-sample copies).
+    """
     if torch is not None and _embedding_model is not None:
-        t = torch.from_numpy(x).float().to(_embedding_device)
+        # Crops go straight into this thread's reusable NCHW buffer
+        x, t = _input_buffers.get("face_rgb", len(faces_rgb), (3, 112, 112), _embedding_device)
+        if isinstance(faces_rgb, np.ndarray) and faces_rgb.shape[1:] == (112, 112, 3):
+            # Aligned batch (preprocess.align_batch): one NHWC -> NCHW pass
+            write_unit_float(x, faces_rgb.transpose(0, 3, 1, 2))
+        else:
+            for slot, face in zip(x, faces_rgb):
+                _write_chw(slot, face)
         with torch.no_grad():
-            emb = _embedding_model(t).cpu().numpy().squeeze()
-        rgb_emb = emb.astype(np.float32)
-    else:
-        rgb_emb = _placeholder_embedding(face_rgb, 512)
+            embs = _embedding_model(t.to(_embedding_device, non_blocking=True)).cpu().numpy()
+        return list(embs)
+    return [_placeholder_embedding(_to_model_input(f), 512) for f in faces_rgb]
+
+
+def cache_metrics() -> dict:
+    """Embedding memo cache hit rate and size."""
+    return _embedding_cache.metrics()
+
+
+def extract_embeddings(
+    faces_rgb: Sequence[np.ndarray],
+    faces_depth: Optional[Sequence[Optional[np.ndarray]]] = None,
+    model_name: str = "arcface",
+    device: str = "cpu",
+) -> List[EmbeddingResult]:
+    """
+    Batched extract_embedding: one forward pass for all faces not already in the memo cache.
+    faces_rgb may be an (N, 112, 112, 3) float32 array from preprocess.align_batch.
+    Returns one EmbeddingResult per input, in order.
+    """
+    if len(faces_rgb) == 0:
+        return []
+    depths = list(faces_depth) if faces_depth is not None else [None] * len(faces_rgb)
+
+    rgb_embs = _embedding_cache.map(faces_rgb, _embedding_version, _forward_batch)
+    results = []
+    for rgb_emb, face_depth in zip(rgb_embs, depths):
+        depth_emb = None
+        if face_depth is not None and face_depth.size > 0:
+            depth_emb = _placeholder_embedding(face_depth.astype(np.float32, copy=False), 512)
+        results.append(EmbeddingResult(
+            rgb_embedding=rgb_emb,
+            depth_embedding=depth_emb,
+            model_name=model_name,
+        ))
+    return results
 
-    depth_emb = None
-    if face_depth is not None and face_depth.size > 0:
-        depth_emb = _placeholder_embedding(face_depth.astype(np.float32), 512)
 
-    return EmbeddingResult(
-        rgb_embedding=rgb_emb,
-        depth_embedding=depth_emb,
-        model_name=model_name,
-    )
+def extract_embedding(
+    face_rgb: np.ndarray,
+    face_depth: Optional[np.ndarray] = None,
+    model_name: str = "arcface",
+    device: str = "cpu",
+) -> EmbeddingResult:
+    """
+    Extract 512-d normalized embedding from RGB face; optionally from depth.
+    face_rgb: HxWx3 float [0,1] or uint8.
+    """
+    return extract_embeddings([face_rgb], [face_depth], model_name=model_name, device=device)[0]
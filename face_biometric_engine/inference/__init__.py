@@ -0,0 +1,7 @@
+"""
+Inference runtime: micro-batching scheduler and in-process metrics.
+"""
+from .metrics import LatencyRecorder, collect_metrics, register_metrics
+from .scheduler import MicroBatchScheduler
+
+__all__ = ["LatencyRecorder", "collect_metrics", "register_metrics", "MicroBatchScheduler"]
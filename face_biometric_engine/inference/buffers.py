@@ -0,0 +1,71 @@
+"""
+Per-thread reusable encoder input buffers (NCHW float32), shared between numpy and torch.
+Preprocessed crops are written straight into a slot instead of being stacked/transposed/copied.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+
+class BufferPool:
+    """
+    Buffers keyed by (name, per-sample shape), one set per thread. Capacity grows in powers of two
+    along the batch axis; get() returns views of the first n samples. Contents are overwritten on
+    the next get() from the same thread, so never hand a buffer view back to the caller.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _buffers(self) -> Dict[tuple, Tuple[np.ndarray, Optional["torch.Tensor"]]]:
+        bufs = getattr(self._local, "bufs", None)
+        if bufs is None:
+            bufs = self._local.bufs = {}
+        return bufs
+
+    def get(
+        self,
+        name: str,
+        n: int,
+        sample_shape: Sequence[int],
+        device: str = "cpu",
+    ) -> Tuple[np.ndarray, Optional["torch.Tensor"]]:
+        """(n, *sample_shape) float32 array and a torch tensor sharing its memory (None without torch)."""
+        key = (name, tuple(sample_shape))
+        bufs = self._buffers()
+        arr, t = bufs.get(key, (None, None))
+        if arr is None or arr.shape[0] < n:
+            capacity = 1 << max(0, int(n) - 1).bit_length()
+            shape = (capacity, *sample_shape)
+            if torch is not None:
+                # Pinned host memory only pays off for host->GPU copies
+                pin = device.startswith("cuda") and torch.cuda.is_available()
+                t = torch.empty(shape, dtype=torch.float32, pin_memory=pin)
+                arr = t.numpy()
+            else:
+                arr, t = np.empty(shape, dtype=np.float32), None
+            bufs[key] = (arr, t)
+        return arr[:n], (t[:n] if t is not None else None)
+
+    def nbytes(self) -> int:
+        """Bytes held by the calling thread."""
+        return sum(arr.nbytes for arr, _ in self._buffers().values())
+
+
+def write_unit_float(dst: np.ndarray, src: np.ndarray) -> None:
+    """
+    Write src into float32 dst; non-float32 inputs are scaled by 1/255 exactly like
+    src.astype(np.float32) / 255.0. src may broadcast (e.g. HxW gray into 3xHxW).
+    """
+    if src.dtype == np.float32:
+        dst[...] = src
+    else:
+        np.divide(src, 255.0, out=dst, dtype=np.float32, casting="unsafe")
@@ -0,0 +1,151 @@
+"""
+Shared thread pools: one for CPU-side preprocessing (OpenCV releases the GIL inside cvtColor /
+resize / detection, so frames of one request preprocess concurrently on plain threads) and one for
+concurrent per-frame verification work, whose tasks may block on the micro-batching schedulers.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = 0
+_verify_executor: Optional[ThreadPoolExecutor] = None
+_verify_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _default_workers() -> int:
+    return min(4, os.cpu_count() or 1)
+
+
+def configure_executor(max_workers: Optional[int] = None, verify_workers: Optional[int] = None) -> None:
+    """Set the pool sizes (None = min(4, cpu_count)); replaces existing pools."""
+    global _executor, _executor_workers, _verify_executor, _verify_workers
+    workers = max_workers or _default_workers()
+    verify = verify_workers or _default_workers()
+    with _executor_lock:
+        old = (_executor, _verify_executor)
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preprocess")
+        _verify_executor = ThreadPoolExecutor(max_workers=verify, thread_name_prefix="verify")
+        _executor_workers, _verify_workers = workers, verify
+    for pool in old:
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    if _executor is None:
+        configure_executor()
+    return _executor
+
+
+def get_verify_executor() -> ThreadPoolExecutor:
+    if _verify_executor is None:
+        configure_executor()
+    return _verify_executor
+
+
+def shutdown_executor() -> None:
+    global _executor, _verify_executor
+    with _executor_lock:
+        old = (_executor, _verify_executor)
+        _executor = _verify_executor = None
+    for pool in old:
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+def map_ordered(fn: Callable[[T], R], items: Iterable[T], prefetch: Optional[int] = None) -> Iterator[R]:
+    """
+    Run fn over items on the shared pool, yielding results in input order. At most `prefetch`
+    items (default: pool size) are in flight ahead of the consumer; closing the iterator early
+    (e.g. break on accept) cancels everything not yet started.
+    """
+    pool = get_executor()
+    prefetch = max(1, prefetch or _executor_workers)
+    it = iter(items)
+    pending: Deque[Future] = deque()
+    try:
+        for item in it:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= prefetch:
+                break
+        while pending:
+            fut = pending.popleft()
+            for item in it:
+                pending.append(pool.submit(fn, item))
+                break
+            yield fut.result()
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
+class OrderedRace(Generic[T, R]):
+    """
+    Per-item work run concurrently on the verify pool (at most max_in_flight at once) but settled
+    strictly in submission order: done(result) is checked for each result in order, and once it
+    holds, later items are cancelled if not started and discarded if running. The settled results
+    are exactly those of a sequential loop that breaks on done, so selection is deterministic.
+    With concurrent=False, submit() runs fn inline.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[T], R],
+        done: Callable[[R], bool],
+        concurrent: bool = True,
+        max_in_flight: Optional[int] = None,
+    ):
+        self._fn = fn
+        self._done = done
+        self._pool = get_verify_executor() if concurrent else None
+        self._max = max(1, max_in_flight or _verify_workers) if concurrent else 1
+        self._pending: Deque[Future] = deque()
+        self.results: List[R] = []
+        self.settled = False
+        self.cancelled = 0
+
+    def _record(self, result: R) -> None:
+        self.results.append(result)
+        if self._done(result):
+            self.settled = True
+            self.cancel()
+
+    def submit(self, item: T) -> bool:
+        """Queue item; returns False once settled (the caller should stop feeding items)."""
+        while self._pending and not self.settled and self._pending[0].done():
+            self._record(self._pending.popleft().result())
+        while self._pending and not self.settled and len(self._pending) >= self._max:
+            self._record(self._pending.popleft().result())
+        if self.settled:
+            return False
+        if self._pool is None:
+            self._record(self._fn(item))
+        else:
+            self._pending.append(self._pool.submit(self._fn, item))
+        return not self.settled
+
+    def finish(self) -> List[R]:
+        """Wait for in-flight items in order; returns the settled results."""
+        while self._pending and not self.settled:
+            self._record(self._pending.popleft().result())
+        return self.results
+
+    def cancel(self) -> None:
+        for fut in self._pending:
+            self.cancelled += fut.cancel()
+        self._pending.clear()
+
+    def __enter__(self) -> "OrderedRace[T, R]":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cancel()
@@ -0,0 +1,161 @@
+"""
+Dynamic micro-batching: collect inputs from concurrent requests for up to N ms or until
+batch size B, run one batched forward, scatter results back to the waiting callers.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from .metrics import LatencyRecorder
+
+_STOP = object()
+
+
+class MicroBatchScheduler:
+    """
+    Queue in front of a batched function. batch_fn(items) must return one output per item, in order.
+    If the scheduler is not started (or is stopping), calls run inline as a batch of one; stop()
+    dispatches whatever is still queued, so no caller is left waiting.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[Sequence[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        name: str = "scheduler",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.name = name
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._batch_sizes: Counter = Counter()
+        self._items = 0
+        self._forward = LatencyRecorder()
+        self._wait = LatencyRecorder()
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()  # submit() vs stop(): nothing is queued once _stopping is set
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._state_lock:
+            if self.running or self._stopping:
+                return
+            self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        with self._state_lock:
+            if not self.running or self._stopping:
+                return
+            self._stopping = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._drain()
+        with self._state_lock:
+            self._thread = None
+            self._stopping = False
+
+    def _drain(self) -> None:
+        """Dispatch entries still queued (behind _STOP, or left by a worker that did not exit in time)."""
+        batch: List[Tuple[Any, Future, float]] = []
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                continue
+            batch.append(entry)
+            if len(batch) == self.max_batch_size:
+                self._dispatch(batch)
+                batch = []
+        if batch:
+            self._dispatch(batch)
+
+    def submit(self, item: Any) -> Future:
+        fut: Future = Future()
+        entry = (item, fut, time.perf_counter())
+        with self._state_lock:
+            queued = self.running and not self._stopping
+            if queued:
+                self._queue.put(entry)
+        if not queued:
+            self._dispatch([entry])
+        return fut
+
+    def run(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit one item and block for its result."""
+        return self.submit(item).result(timeout)
+
+    def _loop(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[Tuple[Any, Future, float]]) -> None:
+        live = [(item, fut, t) for item, fut, t in batch if fut.set_running_or_notify_cancel()]
+        if not live:
+            return
+        now = time.perf_counter()
+        for _, _, t in live:
+            self._wait.record((now - t) * 1000.0)
+        with self._lock:
+            self._batch_sizes[len(live)] += 1
+            self._items += len(live)
+        try:
+            with self._forward.time():
+                outputs = list(self.batch_fn([item for item, _, _ in live]))
+            if len(outputs) != len(live):
+                # Rows cannot be matched to callers; fail them all rather than leave any waiting
+                raise RuntimeError(f"{self.name}: batch_fn returned {len(outputs)} outputs for {len(live)} items")
+        except Exception as e:
+            for _, fut, _ in live:
+                fut.set_exception(e)
+            return
+        for (_, fut, _), out in zip(live, outputs):
+            fut.set_result(out)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            sizes = dict(sorted(self._batch_sizes.items()))
+            batches = sum(sizes.values())
+            items = self._items
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": batches,
+            "items": items,
+            "mean_batch_size": items / batches if batches else 0.0,
+            "batch_size_histogram": sizes,
+            "queue_wait": self._wait.summary(),
+            "forward": self._forward.summary(),
+        }
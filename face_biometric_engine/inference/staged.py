@@ -0,0 +1,257 @@
+"""
+Staged executor for live capture: capture -> preprocess -> inference as a pipeline of threads
+joined by bounded queues, so while frame N is embedded, N+1 is preprocessed and N+2 captured.
+Stages block on the hardware, OpenCV or the schedulers, so each gets its own thread rather than a
+slot on the shared CPU pools; threads are reused across runs, so per-thread models (detectors,
+estimators) are built once. Per-stage totals are kept per executor name for /metrics.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+Stage = Tuple[str, Callable[[Any], Any]]
+
+_DONE = object()
+_POLL_SEC = 0.05  # blocked puts / gets re-check cancellation this often
+_STAGE_THREADS = 32  # upper bound on concurrently running stages across all runs
+
+_stage_pool: Optional[ThreadPoolExecutor] = None
+_stage_pool_lock = threading.Lock()
+
+
+def _start_stages(work: Callable[[int], None], n: int) -> List[Future]:
+    """
+    Start all n stage loops of one run. Submitted under one lock so runs queue whole (FIFO): every
+    run that holds a thread can get the rest once earlier runs finish, so partial runs cannot deadlock.
+    """
+    global _stage_pool
+    with _stage_pool_lock:
+        if _stage_pool is None:
+            _stage_pool = ThreadPoolExecutor(max_workers=_STAGE_THREADS, thread_name_prefix="stage")
+        return [_stage_pool.submit(work, k) for k in range(n)]
+
+
+class _StageStats:
+    __slots__ = ("items", "dropped", "busy", "wait", "blocked")
+
+    def __init__(self):
+        self.items = 0  # items processed
+        self.dropped = 0  # items the stage returned None for
+        self.busy = 0.0  # seconds in the stage function
+        self.wait = 0.0  # seconds waiting for input (starved)
+        self.blocked = 0.0  # seconds waiting for room downstream (backpressure)
+
+    def add(self, other: "_StageStats") -> None:
+        for key in self.__slots__:
+            setattr(self, key, getattr(self, key) + getattr(other, key))
+
+    def summary(self, wall: float) -> dict:
+        return {
+            "items": self.items,
+            "dropped": self.dropped,
+            "busy_ms": self.busy * 1000.0,
+            "wait_ms": self.wait * 1000.0,
+            "blocked_ms": self.blocked * 1000.0,
+            "utilisation": self.busy / wall if wall > 0 else 0.0,
+        }
+
+
+class StagedExecutor:
+    """
+    Runs source items through stages in order, one thread per stage, with at most queue_size items
+    waiting between two stages: a full queue blocks the stage feeding it (backpressure), so capture
+    never runs more than a few frames ahead of inference. A stage returning None drops the item.
+    Iterate for the last stage's outputs, in source order. Breaking out of the loop (or cancel() /
+    leaving the with block) stops every stage: queued items are abandoned, a stage call already
+    running finishes but its output is discarded. A stage exception cancels the run and is
+    re-raised to the consumer. With threaded=False, each item runs through all stages inline.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        stages: Sequence[Stage],
+        queue_size: int = 1,
+        threaded: bool = True,
+        name: str = "staged",
+    ):
+        if not stages:
+            raise ValueError("at least one stage is required")
+        self.name = name
+        self._source = source
+        self._stages = list(stages)
+        self._threaded = threaded
+        self._queues: List[queue.Queue] = [queue.Queue(maxsize=max(1, queue_size)) for _ in self._stages]
+        self._stats = [_StageStats() for _ in self._stages]
+        self._cancel = threading.Event()
+        self._futures: List[Future] = []
+        self._error: Optional[BaseException] = None
+        self._t0: Optional[float] = None
+        self._wall = 0.0
+        self._closed = False
+        self._finished = False
+        self.cancelled = False
+        self.abandoned = 0  # items queued (not yet delivered) when the run was cancelled
+
+    def _put(self, q: queue.Queue, item: Any, stats: _StageStats) -> bool:
+        t0 = time.perf_counter()
+        try:
+            while not self._cancel.is_set():
+                try:
+                    q.put(item, timeout=_POLL_SEC)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.blocked += time.perf_counter() - t0
+
+    def _get(self, q: queue.Queue) -> Any:
+        while not self._cancel.is_set():
+            try:
+                return q.get(timeout=_POLL_SEC)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _work(self, k: int) -> None:
+        _, fn = self._stages[k]
+        stats = self._stats[k]
+        source = iter(self._source) if k == 0 else None
+        try:
+            while not self._cancel.is_set():
+                t0 = time.perf_counter()
+                item = next(source, _DONE) if source is not None else self._get(self._queues[k - 1])
+                t1 = time.perf_counter()
+                stats.wait += t1 - t0
+                if item is _DONE:
+                    break
+                out = fn(item)
+                stats.busy += time.perf_counter() - t1
+                stats.items += 1
+                if out is None:
+                    stats.dropped += 1
+                elif not self._put(self._queues[k], out, stats):
+                    break
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+            self._cancel.set()
+        finally:
+            self._put(self._queues[k], _DONE, stats)
+
+    def start(self) -> "StagedExecutor":
+        if self._t0 is None:
+            self._t0 = time.perf_counter()
+            if self._threaded:
+                self._futures = _start_stages(self._work, len(self._stages))
+        return self
+
+    def _inline(self) -> Iterator[Any]:
+        for item in self._source:
+            if self._cancel.is_set():
+                return
+            for (_, fn), stats in zip(self._stages, self._stats):
+                t0 = time.perf_counter()
+                item = fn(item)
+                stats.busy += time.perf_counter() - t0
+                stats.items += 1
+                if item is None:
+                    stats.dropped += 1
+                    break
+            else:
+                yield item
+
+    def __iter__(self) -> Iterator[Any]:
+        self.start()
+        try:
+            if not self._threaded:
+                yield from self._inline()
+                self._finished = True
+                return
+            while True:
+                item = self._get(self._queues[-1])
+                if item is _DONE:
+                    break
+                yield item
+            if self._error is not None:
+                raise self._error
+            self._finished = True
+        finally:
+            self.close()
+
+    def cancel(self) -> None:
+        """Stop all stages; items not yet delivered are abandoned."""
+        if not self._cancel.is_set():
+            self.cancelled = True
+            self.abandoned = sum(q.qsize() for q in self._queues)
+            self._cancel.set()
+
+    def close(self) -> None:
+        """Cancel if still running, join the stage threads and add this run to the process totals."""
+        if self._closed:
+            return
+        self._closed = True
+        if not self._finished:
+            self.cancel()
+        wait(self._futures)
+        self._wall = time.perf_counter() - self._t0 if self._t0 is not None else 0.0
+        _record_run(self)
+
+    def __enter__(self) -> "StagedExecutor":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def metrics(self) -> dict:
+        wall = self._wall or (time.perf_counter() - self._t0 if self._t0 is not None else 0.0)
+        return {
+            "wall_ms": wall * 1000.0,
+            "cancelled": self.cancelled,
+            "abandoned": self.abandoned,
+            "stages": {stage: stats.summary(wall) for (stage, _), stats in zip(self._stages, self._stats)},
+        }
+
+
+class _Totals:
+    def __init__(self, stages: Sequence[str]):
+        self.runs = 0
+        self.cancelled = 0
+        self.abandoned = 0
+        self.wall = 0.0
+        self.stages: Dict[str, _StageStats] = {stage: _StageStats() for stage in stages}
+
+
+_totals: Dict[str, _Totals] = {}
+_totals_lock = threading.Lock()
+
+
+def _record_run(ex: StagedExecutor) -> None:
+    with _totals_lock:
+        totals = _totals.setdefault(ex.name, _Totals([stage for stage, _ in ex._stages]))
+        totals.runs += 1
+        totals.cancelled += ex.cancelled
+        totals.abandoned += ex.abandoned
+        totals.wall += ex._wall
+        for (stage, _), stats in zip(ex._stages, ex._stats):
+            totals.stages.setdefault(stage, _StageStats()).add(stats)
+
+
+def staged_metrics() -> dict:
+    """Per executor name: runs, cancellations, and per-stage totals (utilisation = busy / total wall time)."""
+    with _totals_lock:
+        return {
+            name: {
+                "runs": t.runs,
+                "cancelled": t.cancelled,
+                "abandoned": t.abandoned,
+                "wall_ms": t.wall * 1000.0,
+                "stages": {stage: stats.summary(t.wall) for stage, stats in t.stages.items()},
+            }
+            for name, t in _totals.items()
+        }
@@ -0,0 +1,274 @@
+"""
+Blink cue: eye landmarks on the aligned face crop, eye aspect ratio (EAR) tracked frame by frame,
+and blink events (EAR dips lasting BLINK_MIN_INTERVAL_SEC .. BLINK_MAX_INTERVAL_SEC).
+Landmark backends: "contour" (outline of the dark eye blob in fixed eye bands of the crop) and
+"lbf" (OpenCV contrib FacemarkLBF 68-point model from MODELS_DIR; falls back to contour if it
+cannot be loaded). A backend whose median latency exceeds BLINK_FRAME_BUDGET_MS is replaced by contour.
+"""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..config import (
+    BLINK_EAR_CLOSED_RATIO,
+    BLINK_FRAME_BUDGET_MS,
+    BLINK_LANDMARK_BACKEND,
+    BLINK_LANDMARK_MODEL,
+    BLINK_MAX_INTERVAL_SEC,
+    BLINK_MIN_INTERVAL_SEC,
+    CAPTURE_FPS,
+)
+from ..inference.metrics import LatencyRecorder
+
+
+class EyeLandmarks(NamedTuple):
+    """Six (x, y) points per eye in crop pixels: corner, two upper lid, corner, two lower lid."""
+    left: np.ndarray
+    right: np.ndarray
+
+
+def eye_aspect_ratio(eye: np.ndarray) -> float:
+    """(|p2 - p6| + |p3 - p5|) / (2 |p1 - p4|); drops towards 0 as the eye closes."""
+    p = eye.astype(np.float64)
+    width = np.linalg.norm(p[0] - p[3])
+    if width < 1e-6:
+        return 0.0
+    return float((np.linalg.norm(p[1] - p[5]) + np.linalg.norm(p[2] - p[4])) / (2.0 * width))
+
+
+def _gray_u8(face: np.ndarray) -> np.ndarray:
+    gray = cv2.cvtColor(face, cv2.COLOR_RGB2GRAY) if face.ndim == 3 else face
+    return gray if gray.dtype == np.uint8 else cv2.convertScaleAbs(gray, alpha=255.0)
+
+
+# Eye bands on a detector-box face crop (below the brows), as fractions (x0, y0, x1, y1) of the crop
+_EYE_BANDS = ((0.12, 0.3, 0.48, 0.52), (0.52, 0.3, 0.88, 0.52))
+_DARK_LEVEL = 0.5  # dark = below this fraction of the way from the band's darkest pixels to its median
+
+
+def _eye_outline(band: np.ndarray) -> Optional[np.ndarray]:
+    """Six EAR points from the largest dark blob (iris, lashes) of an eye band, or None if there is none."""
+    band = cv2.GaussianBlur(band, (3, 3), 0)
+    lo, mid = np.percentile(band, (2, 50))
+    if mid - lo < 10:
+        return None
+    _, mask = cv2.threshold(band, lo + _DARK_LEVEL * (mid - lo), 255, cv2.THRESH_BINARY_INV)
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if n < 2:
+        return None
+    k = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    x, y, w, h = (int(v) for v in stats[k, :4])
+    if w < 3:
+        return None
+    blob = labels[y : y + h, x : x + w] == k
+
+    def column(c: int):
+        rows = np.flatnonzero(blob[:, c])
+        return float(rows[0]), float(rows[-1] + 1)
+
+    (t0, b0), (t1, b1), (t2, b2), (t3, b3) = (column(c) for c in (0, w // 3, 2 * w // 3, w - 1))
+    pts = [(0, (t0 + b0) / 2), (w // 3, t1), (2 * w // 3, t2), (w - 1, (t3 + b3) / 2), (2 * w // 3, b2), (w // 3, b1)]
+    return np.array(pts, dtype=np.float32) + np.array([x, y], dtype=np.float32)
+
+
+class ContourEyeLandmarker:
+    """Placeholder-grade: eye corners and lid points from the dark eye blob (iris, lashes) in each band."""
+
+    name = "contour"
+
+    def landmarks(self, face: np.ndarray) -> Optional[EyeLandmarks]:
+        gray = _gray_u8(face)
+        h, w = gray.shape
+        eyes = []
+        for x0, y0, x1, y1 in _EYE_BANDS:
+            ox, oy = int(x0 * w), int(y0 * h)
+            pts = _eye_outline(gray[oy : int(y1 * h), ox : int(x1 * w)])
+            if pts is None:
+                return None
+            eyes.append(pts + np.array([ox, oy], dtype=np.float32))
+        return EyeLandmarks(*eyes)
+
+
+class LbfEyeLandmarker:
+    """OpenCV contrib FacemarkLBF (68-point iBUG layout), fitted to the whole crop; eyes are points 36-47."""
+
+    name = "lbf"
+
+    def __init__(self, model_path: Path = BLINK_LANDMARK_MODEL):
+        if not hasattr(cv2, "face"):
+            raise RuntimeError("cv2.face not available (requires opencv-contrib-python)")
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"Landmark model not found: {model_path}")
+        self._facemark = cv2.face.createFacemarkLBF()
+        self._facemark.loadModel(str(model_path))
+
+    def landmarks(self, face: np.ndarray) -> Optional[EyeLandmarks]:
+        gray = _gray_u8(face)
+        h, w = gray.shape
+        ok, shapes = self._facemark.fit(gray, np.array([[0, 0, w, h]], dtype=np.int32))
+        if not ok or len(shapes) == 0:
+            return None
+        pts = np.asarray(shapes[0], dtype=np.float32).reshape(-1, 2)
+        return EyeLandmarks(pts[36:42], pts[42:48])
+
+
+_BACKENDS = {"contour": ContourEyeLandmarker, "lbf": LbfEyeLandmarker}
+_BUDGET_CHECK_EVERY = 32  # frames between budget checks (median over the recorder window)
+
+
+class EyeLandmarkManager:
+    """
+    One landmarker per thread (Facemark is not thread-safe). Falls back to contour when the backend
+    cannot be loaded, or once its median latency exceeds budget_ms.
+    """
+
+    def __init__(self, backend: str = BLINK_LANDMARK_BACKEND, budget_ms: float = BLINK_FRAME_BUDGET_MS):
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown eye landmark backend: {backend}")
+        self.backend = backend
+        self.budget_ms = budget_ms
+        self._local = threading.local()
+        self._latency: Dict[str, LatencyRecorder] = {name: LatencyRecorder() for name in _BACKENDS}
+        self._calls = 0
+        self._over_budget = False
+        self._fallback_reason: Optional[str] = None
+
+    def _landmarker(self):
+        est = getattr(self._local, "landmarker", None)
+        if est is not None and self._over_budget and est.name != "contour":
+            est = None
+        if est is None:
+            if self._over_budget or self.backend == "contour":
+                est = ContourEyeLandmarker()
+            else:
+                try:
+                    est = _BACKENDS[self.backend]()
+                except (OSError, RuntimeError, cv2.error) as e:
+                    self._fallback_reason = str(e)
+                    est = ContourEyeLandmarker()
+            self._local.landmarker = est
+        return est
+
+    def landmarks(self, face: np.ndarray) -> Optional[EyeLandmarks]:
+        """Eye landmarks on an aligned face crop (uint8 or float32 [0, 1]), or None if no eyes were found."""
+        if cv2 is None:
+            return None
+        est = self._landmarker()
+        recorder = self._latency[est.name]
+        with recorder.time():
+            out = est.landmarks(face)
+        self._calls += 1
+        if est.name != "contour" and self.budget_ms > 0 and self._calls % _BUDGET_CHECK_EVERY == 0:
+            p50 = recorder.summary()["p50_ms"]
+            if p50 > self.budget_ms:
+                self._over_budget = True
+                self._fallback_reason = f"{est.name} p50 {p50:.2f} ms over {self.budget_ms:.2f} ms budget"
+        return out
+
+    def metrics(self) -> dict:
+        return {
+            "backend": self.backend,
+            "budget_ms": self.budget_ms,
+            "fallback": self._fallback_reason,
+            "latency": {name: rec.summary() for name, rec in self._latency.items()},
+        }
+
+
+_manager: Optional[EyeLandmarkManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_eye_landmarker() -> EyeLandmarkManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = EyeLandmarkManager()
+    return _manager
+
+
+def load_eye_landmarker(backend: str = BLINK_LANDMARK_BACKEND) -> EyeLandmarkManager:
+    """Replace the process-wide manager and build the calling thread's landmarker eagerly."""
+    global _manager
+    manager = EyeLandmarkManager(backend)
+    if cv2 is not None:
+        manager._landmarker()
+    with _manager_lock:
+        _manager = manager
+    return manager
+
+
+def face_eye_aspect_ratio(face: np.ndarray) -> Optional[float]:
+    """Mean EAR of both eyes on an aligned face crop, or None if the landmarks were not found."""
+    eyes = get_eye_landmarker().landmarks(face)
+    if eyes is None:
+        return None
+    return 0.5 * (eye_aspect_ratio(eyes.left) + eye_aspect_ratio(eyes.right))
+
+
+def eye_landmark_metrics() -> dict:
+    return get_eye_landmarker().metrics()
+
+
+class BlinkTracker:
+    """
+    Incremental EAR tracking (O(1) per frame). The open-eye baseline is an EMA over open frames; the
+    eye is closed below closed_ratio * baseline, and a blink is a closed spell whose duration is
+    within [min_interval, max_interval] seconds. Frames without a timestamp are spaced 1 / CAPTURE_FPS.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = BLINK_MIN_INTERVAL_SEC,
+        max_interval: float = BLINK_MAX_INTERVAL_SEC,
+        closed_ratio: float = BLINK_EAR_CLOSED_RATIO,
+        frame_interval: float = 1.0 / CAPTURE_FPS,
+        baseline_alpha: float = 0.1,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.closed_ratio = closed_ratio
+        self.frame_interval = frame_interval
+        self.baseline_alpha = baseline_alpha
+        self.reset()
+
+    def reset(self) -> None:
+        self.baseline: Optional[float] = None
+        self.samples = 0
+        self.blinks = 0
+        self._t: Optional[float] = None
+        self._closed_since: Optional[float] = None
+
+    def update(self, ear: Optional[float], timestamp: Optional[float] = None) -> bool:
+        """Add one frame's EAR (None = eyes not found); True when a blink completes on this frame."""
+        if timestamp is None:
+            timestamp = 0.0 if self._t is None else self._t + self.frame_interval
+        self._t = timestamp
+        if ear is None:
+            return False
+        self.samples += 1
+        if self.baseline is None:
+            self.baseline = ear
+            return False
+        if ear < self.closed_ratio * self.baseline:
+            if self._closed_since is None:
+                self._closed_since = timestamp
+            return False
+        self.baseline += self.baseline_alpha * (ear - self.baseline)
+        if self._closed_since is None:
+            return False
+        duration = timestamp - self._closed_since
+        self._closed_since = None
+        if self.min_interval <= duration <= self.max_interval:
+            self.blinks += 1
+            return True
+        return False
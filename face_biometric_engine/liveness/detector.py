@@ -9,6 +9,15 @@ from typing import List, Optional
 
 import numpy as np
 
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..config import LIVENESS_CASCADE, LIVENESS_MIN_FRAMES, TEXTURE_SPOOF_THRESHOLD
+from .blink import BlinkTracker, face_eye_aspect_ratio
+from .cascade import CascadeOutcome, CascadeStage, LivenessCascade
+
 
 @dataclass
 class LivenessResult:
@@ -20,6 +29,18 @@ class LivenessResult:
     blink_score: float = 0.0
     texture_score: float = 0.0
     details: str = ""
+    skipped: List[str] = field(default_factory=list)  # cues not evaluated (cascade stopped early)
+
+
+def _mean_depth(depth: np.ndarray) -> float:
+    return float(np.mean(depth))
+
+
+def _depth_score(std_over_time: float) -> float:
+    # Moderate stability = live; too flat (0) or chaotic (high) = suspicious
+    if std_over_time < 1e-6:
+        return 0.2  # too flat
+    return float(min(1.0, 1.0 / (1.0 + 10 * std_over_time)))
 
 
 def _depth_consistency_score(depth_maps: List[np.ndarray]) -> float:
@@ -29,16 +50,30 @@ def _depth_consistency_score(depth_maps: List[np.ndarray]) -> float:
     """
     if not depth_maps or depth_maps[0] is None:
         return 0.5  # no depth: neutral
-    stack = np.stack([d for d in depth_maps if d is not None])
-    if stack.size == 0:
+    means = [_mean_depth(d) for d in depth_maps if d is not None]
+    if not means:
         return 0.5
-    mean_per_frame = np.mean(stack, axis=(1, 2))
-    std_over_time = np.std(mean_per_frame)
-    # Moderate stability = live; too flat (0) or chaotic (high) = suspicious
-    if std_over_time < 1e-6:
-        return 0.2  # too flat
-    score = min(1.0, 1.0 / (1.0 + 10 * std_over_time))
-    return float(score)
+    return _depth_score(float(np.std(means)))
+
+
+_CV_DTYPES = (np.uint8, np.float32)
+
+
+def _frame_motion(a: np.ndarray, b: np.ndarray) -> float:
+    """Mean absolute difference between consecutive crops, in crop units (one L1 pass, no temporaries)."""
+    if cv2 is None or a.dtype != b.dtype or a.dtype not in _CV_DTYPES:
+        return _frame_motion_np(a, b)
+    return cv2.norm(a, b, cv2.NORM_L1) / a.size
+
+
+def _frame_motion_np(a: np.ndarray, b: np.ndarray) -> float:
+    """numpy fallback / reference for _frame_motion."""
+    diff = np.abs(a.astype(np.float32) - b.astype(np.float32))
+    return float(np.mean(diff))
+
+
+def _motion_score(variance: float) -> float:
+    return min(1.0, variance * 20.0)
 
 
 def _micro_motion_score(face_crops: List[np.ndarray]) -> float:
@@ -53,31 +88,58 @@ def _micro_motion_score(face_crops: List[np.ndarray]) -> float:
         a, b = face_crops[i - 1], face_crops[i]
         if a.shape != b.shape:
             continue
-        diff = np.abs(a.astype(np.float32) - b.astype(np.float32))
-        diffs.append(np.mean(diff))
+        diffs.append(_frame_motion(a, b))
     if not diffs:
         return 0.5
-    variance = float(np.var(diffs))
-    return min(1.0, variance * 20.0)
+    return _motion_score(float(np.var(diffs)))
+
+
+_BLINK_MIN_FRAMES = 10  # EAR samples before a missing blink counts against the face
+_NO_BLINK_SCORE = 0.3
 
 
-def _blink_score(eye_region_frames: List[np.ndarray]) -> float:
+def _blink_tracker_score(tracker: BlinkTracker) -> float:
+    """1 once a blink was seen; neutral until enough eyes were observed, then low (photos don't blink)."""
+    if tracker.blinks:
+        return 1.0
+    return 0.5 if tracker.samples < _BLINK_MIN_FRAMES else _NO_BLINK_SCORE
+
+
+def _blink_score(face_crops: List[np.ndarray]) -> float:
     """
-    Pseudocode: detect blink (eye aspect ratio drop) over window.
+    Eye aspect ratio from eye landmarks on each crop, tracked over the window for blink events.
     Real users blink; photos don't. Returns 0..1.
     """
-    if len(eye_region_frames) < 10:
+    if len(face_crops) < _BLINK_MIN_FRAMES:
         return 0.5
-    # Placeholder: variance in intensity as proxy for blink
-    intensities = [np.mean(f) for f in eye_region_frames]
-    return min(1.0, float(np.std(intensities)) * 5.0)
+    tracker = BlinkTracker()
+    for crop in face_crops:
+        tracker.update(face_eye_aspect_ratio(crop))
+    return _blink_tracker_score(tracker)
 
 
 def _texture_score(face_rgb: np.ndarray) -> float:
     """
     Flat texture (paper/print) vs skin (fine pores, specular). Returns 0..1.
-    High-frequency energy as proxy for real skin texture.
+    High-frequency energy as proxy for real skin texture: mean absolute vertical + horizontal
+    gradient of the luma, each reduced by one cv2.norm L1 pass over shifted views.
     """
+    if face_rgb.size == 0:
+        return 0.0
+    if cv2 is None or face_rgb.dtype not in _CV_DTYPES or (face_rgb.ndim == 3 and face_rgb.shape[2] != 3):
+        return _texture_score_np(face_rgb)
+    gray = face_rgb
+    if face_rgb.ndim == 3:
+        # uint8 luma would be rounded by cvtColor, which flattens low-contrast gradients
+        src = face_rgb.astype(np.float32) if face_rgb.dtype == np.uint8 else face_rgb
+        gray = cv2.cvtColor(src, cv2.COLOR_RGB2GRAY)
+    lap = cv2.norm(gray[1:], gray[:-1], cv2.NORM_L1) + cv2.norm(gray[:, 1:], gray[:, :-1], cv2.NORM_L1)
+    lap = lap / (gray.size + 1e-8)
+    return float(min(1.0, lap * 2.0))
+
+
+def _texture_score_np(face_rgb: np.ndarray) -> float:
+    """numpy fallback / reference for _texture_score."""
     if face_rgb.size == 0:
         return 0.0
     gray = (
@@ -93,45 +155,187 @@ def _texture_score(face_rgb: np.ndarray) -> float:
     return float(score)
 
 
+# Fusion weights (tunable)
+_WEIGHTS = {"depth": 0.25, "blink": 0.25, "motion": 0.35, "texture": 0.15}
+_TEXTURE_FLAT_CAP = 0.4  # max score when texture is below the spoof threshold
+_MIN_USABLE_SCORE = 0.4  # pipelines drop frames below this score; the cascade also stops early under it
+
+
+def _texture_stage(compute) -> CascadeStage:
+    return CascadeStage(
+        "texture", _WEIGHTS["texture"], compute,
+        gate=TEXTURE_SPOOF_THRESHOLD, gate_cap=_TEXTURE_FLAT_CAP, gate_rejects=True,
+        gate_reason="texture_too_flat",
+    )
+
+
+def _result(outcome: CascadeOutcome, dc: float, mm: float, bl: float, tx: float) -> LivenessResult:
+    return LivenessResult(
+        is_live=outcome.is_live,
+        score=outcome.score,
+        depth_consistency=dc,
+        micro_motion=mm,
+        blink_score=bl,
+        texture_score=tx,
+        details=outcome.gate_reason or "ok",
+        skipped=outcome.skipped,
+    )
+
+
+def _fuse(dc: float, mm: float, bl: float, tx: float, texture_spoof_threshold: float) -> LivenessResult:
+    """All four cues, same weights and texture gate as the cascade (LivenessSession computes every cue anyway)."""
+    score = _WEIGHTS["depth"] * dc + _WEIGHTS["motion"] * mm + _WEIGHTS["blink"] * bl + _WEIGHTS["texture"] * tx
+    flat = tx < texture_spoof_threshold
+    if flat:
+        score = min(score, _TEXTURE_FLAT_CAP)
+    score = min(max(score, 0.0), 1.0)
+    return LivenessResult(
+        is_live=not flat and score >= 0.5,
+        score=score,
+        depth_consistency=dc,
+        micro_motion=mm,
+        blink_score=bl,
+        texture_score=tx,
+        details="texture_too_flat" if flat else "ok",
+    )
+
+
+# check_liveness(): ctx = (face_rgb_frames, depth_maps). The texture gate is decisive (a too-flat
+# frame is never live), so it is declared first: a flat spoof skips the window cues.
+_window_cascade = LivenessCascade([
+    _texture_stage(lambda c: _texture_score(c[0][-1]) if c[0] else 0.0),
+    CascadeStage("depth", _WEIGHTS["depth"], lambda c: _depth_consistency_score(c[1]) if c[1] else 0.5),
+    CascadeStage("motion", _WEIGHTS["motion"], lambda c: _micro_motion_score(c[0])),
+    CascadeStage("blink", _WEIGHTS["blink"], lambda c: _blink_score(c[0])),
+], reject_below=_MIN_USABLE_SCORE)
+
+
 def check_liveness(
     face_rgb_frames: List[np.ndarray],
     depth_frames: Optional[List[Optional[np.ndarray]]] = None,
     eye_region_frames: Optional[List[np.ndarray]] = None,
     depth_consistency_threshold: float = 0.15,
-    texture_spoof_threshold: float = 0.35,
+    texture_spoof_threshold: float = TEXTURE_SPOOF_THRESHOLD,
     micro_motion_min: float = 0.5,
 ) -> LivenessResult:
     """
     Fuse depth consistency, micro-motion, blink, texture into one liveness score.
+    Scores a whole window at once; for frame-by-frame use, see LivenessSession. eye_region_frames is
+    accepted and ignored: blink is measured from eye landmarks on face_rgb_frames.
+    With LIVENESS_CASCADE, cues stop early once the frame is certainly rejected: too-flat texture
+    or a score that cannot reach 0.4 (skipped cues report 0 and the score covers the evaluated cues).
     """
-    depth_maps = depth_frames or []
-    eye_frames = eye_region_frames or []
-    dc = _depth_consistency_score(depth_maps) if depth_maps else 0.5
-    mm = _micro_motion_score(face_rgb_frames)
-    bl = _blink_score(eye_frames) if eye_frames else 0.5
-    tx = _texture_score(face_rgb_frames[-1]) if face_rgb_frames else 0.0
-
-    # Weights (tunable)
-    w_dc, w_mm, w_bl, w_tx = 0.25, 0.35, 0.25, 0.15
-    score = w_dc * dc + w_mm * mm + w_bl * bl + w_tx * tx
-
-    # Hard checks
-    if tx < texture_spoof_threshold:
-        score = min(score, 0.4)
-        details = "texture_too_flat"
-    else:
-        details = "ok"
-    is_live = score >= 0.5 and tx >= texture_spoof_threshold
+    ctx = (face_rgb_frames, depth_frames or [])
+    out = _window_cascade.run(ctx, early_exit=LIVENESS_CASCADE, gates={"texture": texture_spoof_threshold})
+    c = out.cues
+    return _result(out, c.get("depth", 0.0), c.get("motion", 0.0), c.get("blink", 0.0), c.get("texture", 0.0))
 
-    return LivenessResult(
-        is_live=is_live,
-        score=float(np.clip(score, 0, 1)),
-        depth_consistency=dc,
-        micro_motion=mm,
-        blink_score=bl,
-        texture_score=tx,
-        details=details,
-    )
+
+class _WindowStats:
+    """Mean / population variance of the last `capacity` values: sliding Welford update over a ring buffer."""
+
+    def __init__(self, capacity: int):
+        self._buf = np.zeros(max(1, int(capacity)), dtype=np.float64)
+        self.clear()
+
+    def clear(self) -> None:
+        self._head = 0
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, x: float) -> None:
+        cap = self._buf.size
+        if self.n < cap:
+            self._buf[self.n] = x
+            self.n += 1
+            delta = x - self.mean
+            self.mean += delta / self.n
+            self._m2 += delta * (x - self.mean)
+        else:
+            # Replace the oldest value: mean and M2 updated for the swap in O(1)
+            old = float(self._buf[self._head])
+            self._buf[self._head] = x
+            self._head = (self._head + 1) % cap
+            old_mean = self.mean
+            self.mean += (x - old) / cap
+            self._m2 += (x - old) * (x - self.mean + old - old_mean)
+        self._m2 = max(self._m2, 0.0)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.n if self.n else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+
+class LivenessSession:
+    """
+    Frame-by-frame liveness over a sliding window (one session per request / burst, not thread-safe).
+    update() scores the window ending at the new frame in O(1) time and memory: per-frame depth means
+    and consecutive-frame motion feed running window statistics, eye aspect ratio feeds a BlinkTracker,
+    and only the previous crop is kept. Same cues and fusion as check_liveness(); the depth window
+    holds the last `window` frames that carried depth, and a blink counts for the whole session.
+    """
+
+    def __init__(
+        self,
+        window: int = LIVENESS_MIN_FRAMES,
+        texture_spoof_threshold: float = TEXTURE_SPOOF_THRESHOLD,
+    ):
+        self.window = max(2, int(window))
+        self.texture_spoof_threshold = texture_spoof_threshold
+        self._depth = _WindowStats(self.window)
+        self._motion = _WindowStats(self.window - 1)
+        self._blink = BlinkTracker()
+        self._prev: Optional[np.ndarray] = None
+        self.frames = 0
+
+    def reset(self) -> None:
+        self._depth.clear()
+        self._motion.clear()
+        self._blink.reset()
+        self._prev = None
+        self.frames = 0
+
+    def _depth_cue(self) -> float:
+        return _depth_score(self._depth.std) if self._depth.n else 0.5
+
+    def _motion_cue(self) -> float:
+        return _motion_score(self._motion.variance) if self._motion.n else 0.5
+
+    def _blink_cue(self) -> float:
+        return _blink_tracker_score(self._blink)
+
+    def update(
+        self,
+        face_rgb: np.ndarray,
+        face_depth: Optional[np.ndarray] = None,
+        timestamp: Optional[float] = None,
+    ) -> LivenessResult:
+        """
+        Add one aligned face crop (and optional depth ROI, capture time in seconds); score the
+        current window. Every frame must enter the depth / motion / blink windows, so all cues
+        are computed and there is no early exit here (see check_liveness).
+        """
+        self.frames += 1
+        if face_depth is not None:
+            self._depth.push(_mean_depth(face_depth))
+        if self._prev is not None and self._prev.shape == face_rgb.shape:
+            self._motion.push(_frame_motion(self._prev, face_rgb))
+        self._blink.update(face_eye_aspect_ratio(face_rgb), timestamp)
+        self._prev = face_rgb
+        return _fuse(
+            self._depth_cue(), self._motion_cue(), self._blink_cue(), _texture_score(face_rgb),
+            self.texture_spoof_threshold,
+        )
+
+
+def liveness_metrics() -> dict:
+    """check_liveness cascade stage reach / early-exit rates and time saved."""
+    return _window_cascade.metrics()
 
 
 def collect_liveness_scores(
@@ -4,8 +4,11 @@ Single flow for enrollment (store encrypted template) and verification (match +
 """
 from __future__ import annotations
 
+import threading
+import time
+from contextlib import closing
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 
@@ -16,13 +19,171 @@ from config import (
     REJECT_THRESHOLD,
 )
 from capture.capture_3d import capture_frame, CaptureResult
-from preprocess.pipeline import preprocess_frame, PreprocessResult
-from liveness.detector import check_liveness, collect_liveness_scores, LivenessResult
-from embedding.extractor import extract_embedding, load_embedding_model, EmbeddingResult
+from capture.session import close_capture_sessions, capture_session_metrics
+from preprocess.pipeline import preprocess_frame, new_face_batch, PreprocessResult
+from preprocess.detector import load_face_detector, detector_metrics
+from preprocess.tracker import FaceTracker, tracking_metrics
+from preprocess.quality import assess_quality, check_region_size
+from preprocess.dedup import select_distinct
+from preprocess.depth import load_depth_estimator, depth_estimator_metrics
+from liveness.detector import LivenessSession, LivenessResult, liveness_metrics
+from liveness.blink import load_eye_landmarker, eye_landmark_metrics
+from embedding.extractor import extract_embeddings, load_embedding_model, cache_metrics, EmbeddingResult
 from fusion.fusion import fuse_signals, FusionResult
 from decision.engine import decide, DecisionResult
 from storage.template_store import TemplateStore, enroll_template, verify_against_templates
 from config import EMBEDDING_DIM, DEVICE, ENCRYPT_TEMPLATES, TEMPLATES_DIR
+from config import INFERENCE_BATCHING, INFERENCE_BATCH_WINDOW_MS, INFERENCE_MAX_BATCH_SIZE
+from config import COMPILE_MODELS, COMPILE_WARMUP_BATCH_SIZES, EMBEDDING_CACHE_SIZE
+from config import CPU_THREAD_BUDGET, THREAD_SPLIT, API_WORKERS, FACE_TRACKING, PREPROCESS_WORKERS
+from config import CONCURRENT_VERIFICATION, VERIFY_WORKERS, PIPELINED_CAPTURE, STAGE_QUEUE_SIZE, CAPTURE_SESSION
+from config import QUALITY_GATE, DEDUP_FRAMES, DEDUP_MIN_FRAMES, DEPTH_ESTIMATION_FALLBACK
+from config import STREAM_MAX_FRAMES, STREAM_REJECT_AFTER, STREAM_TIMEOUT_SEC
+from inference.compile import compiled_models
+from inference.executor import OrderedRace, configure_executor, map_ordered, shutdown_executor
+from inference.metrics import LatencyRecorder, register_metrics
+from inference.scheduler import MicroBatchScheduler
+from inference.staged import Stage, StagedExecutor, staged_metrics
+from inference.threads import apply_thread_budget, thread_budget
+
+
+def _embed_batch(items):
+    faces_rgb = [rgb for rgb, _ in items]
+    faces_depth = [depth for _, depth in items]
+    return extract_embeddings(faces_rgb, faces_depth, device=DEVICE)
+
+
+# Shared across requests; started in init_pipeline(). Runs inline when not started.
+_embed_scheduler = MicroBatchScheduler(
+    _embed_batch,
+    max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=INFERENCE_BATCH_WINDOW_MS,
+    name="face-embedding",
+)
+register_metrics("embedding_scheduler", _embed_scheduler.metrics)
+register_metrics("compiled_models", compiled_models)
+register_metrics("thread_budget", thread_budget)
+register_metrics("capture_sessions", capture_session_metrics)
+register_metrics("staged_capture", staged_metrics)
+register_metrics("embedding_cache", cache_metrics)
+register_metrics("face_detector", detector_metrics)
+register_metrics("face_tracker", tracking_metrics)
+register_metrics("depth_estimator", depth_estimator_metrics)
+register_metrics("eye_landmarks", eye_landmark_metrics)
+register_metrics("liveness_cascade", liveness_metrics)
+
+_stream_latency = LatencyRecorder()  # ms from stream start to decision
+_stream_outcomes = {"accept": 0, "reject": 0, "budget": 0, "ended": 0}
+_stream_lock = threading.Lock()
+
+
+def _stream_metrics() -> dict:
+    with _stream_lock:
+        outcomes = dict(_stream_outcomes)
+    return {"time_to_decision": _stream_latency.summary(), "outcomes": outcomes}
+
+
+register_metrics("verify_stream", _stream_metrics)
+
+
+def _new_tracker() -> Optional[FaceTracker]:
+    """One tracker per burst when FACE_TRACKING is on."""
+    return FaceTracker() if FACE_TRACKING else None
+
+
+def _drop_duplicates(images: List[np.ndarray], min_keep: int) -> Tuple[List[int], Dict[int, List[str]]]:
+    """Indices of frames worth processing, and near_duplicate reasons for the rest."""
+    if not DEDUP_FRAMES:
+        return list(range(len(images))), {}
+    kept = select_distinct(images, min_keep=max(DEDUP_MIN_FRAMES, min_keep))
+    kept_set = set(kept)
+    return kept, {i: ["near_duplicate"] for i in range(len(images)) if i not in kept_set}
+
+
+def _preprocess_checked(
+    rgb: np.ndarray,
+    depth: Optional[np.ndarray],
+    tracker: Optional[FaceTracker] = None,
+    estimate_depth: bool = False,
+    out: Optional[np.ndarray] = None,
+    depth_out: Optional[np.ndarray] = None,
+) -> Tuple[Optional[PreprocessResult], List[str]]:
+    """Quality gate, preprocess, face-size check. Returns (None, reasons) for unusable frames."""
+    if QUALITY_GATE:
+        quality = assess_quality(rgb)
+        if not quality.ok:
+            return None, quality.reasons
+    prep = preprocess_frame(rgb, depth, tracker=tracker, estimate_depth=estimate_depth, out=out, depth_out=depth_out)
+    if QUALITY_GATE:
+        reason = check_region_size(prep.bbox, rgb.shape)
+        if reason is not None:
+            return None, [reason]
+    return prep, []
+
+
+def _preprocess_burst(
+    images: List[np.ndarray],
+    depths: List[Optional[np.ndarray]],
+    tracker: Optional[FaceTracker],
+    faces: Optional[np.ndarray] = None,
+    face_depths: Optional[np.ndarray] = None,
+) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray], Optional[PreprocessResult], List[str]]]:
+    """
+    Preprocess frames concurrently on the shared pool, yielding (rgb, depth, prep, reasons) in order
+    (prep is None for frames rejected by the quality gate). With a tracker, frames are processed
+    synchronously until one passes the gate and anchors it; the remaining frames track against the
+    frozen anchor in parallel. Closing the iterator cancels unstarted frames.
+    With faces / face_depths (from new_face_batch), frame i is aligned into row i, so
+    prep.face_rgb / prep.face_depth are views of the batch arrays.
+    """
+    def run(j: int, t: Optional[FaceTracker]):
+        rgb, depth = images[j], depths[j]
+        out = faces[j] if faces is not None else None
+        depth_out = face_depths[j] if face_depths is not None and depth is not None else None
+        return (rgb, depth, *_preprocess_checked(rgb, depth, t, out=out, depth_out=depth_out))
+
+    pending = list(range(len(images)))
+    if tracker is not None:
+        while pending:
+            rgb, depth, prep, reasons = run(pending.pop(0), tracker)
+            yield rgb, depth, prep, reasons
+            if prep is not None:
+                break
+        tracker.freeze()
+    yield from map_ordered(lambda j: run(j, tracker), pending)
+
+
+def _batch_rows(batch: np.ndarray, rows: List[int]) -> np.ndarray:
+    """Selected rows of a batch array: a view when they are contiguous, else one gather."""
+    if rows == list(range(rows[0], rows[0] + len(rows))):
+        return batch[rows[0] : rows[0] + len(rows)]
+    return batch[rows]
+
+
+def _capture_stage(i: int) -> Optional[Tuple[int, CaptureResult]]:
+    """Capture frame i. Pipelined, several frames are in flight, so session views are copied."""
+    cap = capture_frame()
+    if cap.rgb is None:
+        return None
+    if PIPELINED_CAPTURE and CAPTURE_SESSION:
+        cap.rgb = cap.rgb.copy()
+    return i, cap
+
+
+def _camera_run(num_frames: int, stages: List[Stage], name: str) -> StagedExecutor:
+    """Capture frames 0..num_frames-1 and run them through stages; overlapped unless PIPELINED_CAPTURE is off."""
+    return StagedExecutor(
+        range(num_frames),
+        [("capture", _capture_stage), *stages],
+        queue_size=STAGE_QUEUE_SIZE,
+        threaded=PIPELINED_CAPTURE,
+        name=name,
+    )
+
+
+def _embed(face_rgb: np.ndarray, face_depth: Optional[np.ndarray]) -> EmbeddingResult:
+    """Embed one face through the shared micro-batching scheduler."""
+    return _embed_scheduler.run((face_rgb, face_depth))
 
 
 @dataclass
@@ -35,6 +196,8 @@ class PipelineResult:
     fusion_score: float = 0.0
     components: dict = field(default_factory=dict)
     match: bool = False
+    frame_reasons: Dict[int, List[str]] = field(default_factory=dict)  # frames dropped before liveness, by index
+    frames_skipped: int = 0  # near-duplicate frames never processed
 
 
 def _run_single_frame(
@@ -45,11 +208,7 @@ def _run_single_frame(
     ref_depth: Optional[np.ndarray] = None,
 ) -> tuple[EmbeddingResult, FusionResult, DecisionResult]:
     """One frame: embed, fuse with reference (if any), decide."""
-    emb = extract_embedding(
-        preprocess_result.face_rgb,
-        preprocess_result.face_depth,
-        device=DEVICE,
-    )
+    emb = _embed(preprocess_result.face_rgb, preprocess_result.depth())
     if ref_rgb is None:
         ref_rgb = emb.rgb_embedding
         ref_depth = emb.depth_embedding
@@ -88,28 +247,42 @@ def run_verification(
         )
     ref_rgb, ref_depth = loaded
 
-    liveness_scores: List[float] = []
     last_emb: Optional[EmbeddingResult] = None
     last_fusion: Optional[FusionResult] = None
     last_decision: Optional[DecisionResult] = None
 
-    for _ in range(num_frames):
-        cap = capture_frame()
-        if cap.rgb is None:
-            continue
-        prep = preprocess_frame(cap.rgb, cap.depth)
+    tracker = _new_tracker()
+    liveness = LivenessSession()
+    frame_reasons: Dict[int, List[str]] = {}
+    scores: List[Tuple[int, float]] = []
+
+    def preprocess(item: Tuple[int, CaptureResult]):
+        i, cap = item
+        prep, reasons = _preprocess_checked(cap.rgb, cap.depth, tracker, cap.source == "estimated")
+        if prep is None:
+            frame_reasons[i] = reasons
+            return None
         if prep.num_faces != 1:
-            continue
-        live = check_liveness(cap.rgb, cap.depth, prep.face_rgb, prep.face_depth)
-        liveness_scores.append(live.score)
+            return None
+        live = liveness.update(prep.face_rgb, prep.depth(), cap.timestamp)
+        scores.append((i, live.score))
         if live.score < 0.4:
-            continue
-        emb, fusion, dec = _run_single_frame(cap, prep, live, ref_rgb, ref_depth)
-        last_emb = emb
-        last_fusion = fusion
-        last_decision = dec
-        if dec.decision == "accept":
-            break
+            return None
+        return i, cap, prep, live
+
+    def infer(item):
+        i, cap, prep, live = item
+        return (i, *_run_single_frame(cap, prep, live, ref_rgb, ref_depth))
+
+    cutoff = num_frames
+    with _camera_run(num_frames, [("preprocess", preprocess), ("infer", infer)], "face-verify") as staged:
+        for i, last_emb, last_fusion, last_decision in staged:
+            if last_decision.decision == "accept":
+                cutoff = i
+                break
+    # Frames preprocessed ahead of the accepted one count as never captured, as in a sequential run
+    frame_reasons = {i: r for i, r in frame_reasons.items() if i <= cutoff}
+    liveness_scores = [score for i, score in scores if i <= cutoff]
 
     if last_fusion is None or last_decision is None or last_emb is None:
         return PipelineResult(
@@ -119,6 +292,7 @@ def run_verification(
             liveness_score=float(np.mean(liveness_scores)) if liveness_scores else 0.0,
             fusion_score=0.0,
             match=False,
+            frame_reasons=frame_reasons,
         )
 
     match, _ = verify_against_templates(
@@ -135,6 +309,7 @@ def run_verification(
         fusion_score=last_fusion.score,
         components=last_fusion.components,
         match=match,
+        frame_reasons=frame_reasons,
     )
 
 
@@ -155,23 +330,38 @@ def run_enrollment(
     depth_embeddings: List[np.ndarray] = []
     liveness_scores: List[float] = []
 
-    for _ in range(num_samples * 3):
-        if len(rgb_embeddings) >= num_samples:
-            break
-        cap = capture_frame()
-        if cap.rgb is None:
-            continue
-        prep = preprocess_frame(cap.rgb, cap.depth)
+    tracker = _new_tracker()
+    liveness = LivenessSession()
+    frame_reasons: Dict[int, List[str]] = {}
+
+    def preprocess(item: Tuple[int, CaptureResult]):
+        i, cap = item
+        prep, reasons = _preprocess_checked(cap.rgb, cap.depth, tracker, cap.source == "estimated")
+        if prep is None:
+            frame_reasons[i] = reasons
+            return None
         if prep.num_faces != 1:
-            continue
-        live = check_liveness(cap.rgb, cap.depth, prep.face_rgb, prep.face_depth)
+            return None
+        live = liveness.update(prep.face_rgb, prep.depth(), cap.timestamp)
         if live.score < 0.5:
-            continue
-        emb = extract_embedding(prep.face_rgb, prep.face_depth, device=DEVICE)
-        rgb_embeddings.append(emb.rgb_embedding)
-        if emb.depth_embedding is not None:
-            depth_embeddings.append(emb.depth_embedding)
-        liveness_scores.append(live.score)
+            return None
+        return i, prep, live.score
+
+    def infer(item):
+        i, prep, score = item
+        return i, _embed(prep.face_rgb, prep.depth()), score
+
+    cutoff = num_samples * 3
+    with _camera_run(num_samples * 3, [("preprocess", preprocess), ("infer", infer)], "face-enroll") as staged:
+        for i, emb, score in staged:
+            rgb_embeddings.append(emb.rgb_embedding)
+            if emb.depth_embedding is not None:
+                depth_embeddings.append(emb.depth_embedding)
+            liveness_scores.append(score)
+            if len(rgb_embeddings) >= num_samples:
+                cutoff = i
+                break
+    frame_reasons = {i: r for i, r in frame_reasons.items() if i <= cutoff}
 
     if len(rgb_embeddings) < num_samples:
         return PipelineResult(
@@ -181,6 +371,7 @@ def run_enrollment(
             liveness_score=float(np.mean(liveness_scores)) if liveness_scores else 0.0,
             fusion_score=0.0,
             match=False,
+            frame_reasons=frame_reasons,
         )
 
     rgb_mean = np.mean(rgb_embeddings, axis=0).astype(np.float32)
@@ -198,6 +389,7 @@ def run_enrollment(
         fusion_score=1.0,
         components={},
         match=True,
+        frame_reasons=frame_reasons,
     )
 
 
@@ -215,36 +407,56 @@ def run_verification_from_images(
         return PipelineResult(decision="reject", confidence=0.0, message="User not enrolled.", match=False)
     ref_rgb, ref_depth = loaded
     depths = depths or [None] * len(images)
-    liveness_scores = []
-    last_emb = None
-    last_fusion = None
-    last_decision = None
-    for rgb, depth in zip(images, depths):
-        prep = preprocess_frame(rgb, depth)
-        if prep.num_faces != 1:
-            continue
-        live = check_liveness(rgb, depth, prep.face_rgb, prep.face_depth)
-        liveness_scores.append(live.score)
-        if live.score < 0.4:
-            continue
-        emb = extract_embedding(prep.face_rgb, prep.face_depth, device=DEVICE)
+    liveness = LivenessSession()
+    kept, frame_reasons = _drop_duplicates(images, min_keep=1)
+    kept_depths = [depths[i] for i in kept]
+    faces, face_depths = new_face_batch(len(kept), with_depth=any(d is not None for d in kept_depths))
+    burst = _preprocess_burst([images[i] for i in kept], kept_depths, _new_tracker(), faces, face_depths)
+
+    def verify_frame(item: Tuple[int, PreprocessResult, LivenessResult]):
+        i, prep, live = item
+        emb = _embed(prep.face_rgb, prep.depth())
         fusion = fuse_signals(
             emb.rgb_embedding, ref_rgb, live.score,
             depth_embedding=emb.depth_embedding, reference_depth_embedding=ref_depth,
             motion_consistency=live.micro_motion, weights=FUSION_WEIGHTS,
         )
         dec = decide(fusion, accept_threshold=ACCEPT_THRESHOLD, reject_threshold=REJECT_THRESHOLD)
-        last_emb, last_fusion, last_decision = emb, fusion, dec
-        if dec.decision == "accept":
-            break
-    if last_emb is None or last_fusion is None or last_decision is None:
+        return i, emb, fusion, dec
+
+    # Liveness runs in frame order; embed / fuse / decide of live frames race on the verify pool
+    scores: List[Tuple[int, float]] = []
+    reasons_seen: Dict[int, List[str]] = {}
+    race = OrderedRace(verify_frame, lambda r: r[3].decision == "accept", concurrent=CONCURRENT_VERIFICATION)
+    with closing(burst) as preps, race:
+        for i, (rgb, depth, prep, reasons) in zip(kept, preps):
+            if prep is None:
+                reasons_seen[i] = reasons
+                continue
+            if prep.num_faces != 1:
+                continue
+            live = liveness.update(prep.face_rgb, prep.depth())
+            scores.append((i, live.score))
+            if live.score < 0.4:
+                continue
+            if not race.submit((i, prep, live)):
+                break
+        results = race.finish()
+    # Frames after the accepted one count as never processed, as in a sequential run
+    cutoff = results[-1][0] if race.settled else len(images)
+    frame_reasons.update((i, r) for i, r in reasons_seen.items() if i <= cutoff)
+    liveness_scores = [score for i, score in scores if i <= cutoff]
+    if not results:
         return PipelineResult(
             decision="reject",
             confidence=0.0,
             message="No valid frames or liveness failed.",
             liveness_score=float(np.mean(liveness_scores)) if liveness_scores else 0.0,
             match=False,
+            frame_reasons=frame_reasons,
+            frames_skipped=len(images) - len(kept),
         )
+    _, last_emb, last_fusion, last_decision = results[-1]
     match, _ = verify_against_templates(store, user_id, last_emb.rgb_embedding, last_emb.depth_embedding, threshold=ACCEPT_THRESHOLD)
     return PipelineResult(
         decision=last_decision.decision,
@@ -254,9 +466,144 @@ def run_verification_from_images(
         fusion_score=last_fusion.score,
         components=last_fusion.components,
         match=match,
+        frame_reasons=frame_reasons,
+        frames_skipped=len(images) - len(kept),
     )
 
 
+@dataclass
+class StreamUpdate:
+    """Outcome of one frame pushed to a VerificationStream."""
+    frame: int  # 0-based index in the stream
+    reasons: List[str] = field(default_factory=list)  # quality-gate reasons when the frame was dropped
+    liveness_score: Optional[float] = None  # None when no single face reached liveness
+    decision: Optional[str] = None  # this frame's decision; None unless the frame was live
+    result: Optional[PipelineResult] = None  # set once the stream is decided
+
+
+class VerificationStream:
+    """
+    Verification of frames that arrive one at a time (the /verify/stream endpoint), so frames are
+    processed while the client is still capturing. push() runs the quality gate, tracked
+    preprocessing and liveness (the session window grows frame by frame) and embeds / fuses / decides
+    live frames. The stream is decided on the first accept, after reject_after consecutive reject
+    decisions, or once max_frames or timeout seconds are used up (then the last live frame decides,
+    as in a batch of the same frames). Not thread-safe: push frames in order from one caller.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        store: Optional[TemplateStore] = None,
+        max_frames: int = STREAM_MAX_FRAMES,
+        timeout: float = STREAM_TIMEOUT_SEC,
+        reject_after: int = STREAM_REJECT_AFTER,
+    ):
+        if store is None:
+            store = TemplateStore(base_dir=TEMPLATES_DIR, encrypt=ENCRYPT_TEMPLATES)
+        self.user_id = user_id
+        self.store = store
+        self.max_frames = max_frames
+        self.reject_after = reject_after
+        self.frames = 0
+        self.result: Optional[PipelineResult] = None
+        self._t0 = time.perf_counter()
+        self._deadline = self._t0 + timeout
+        self._tracker = _new_tracker()
+        self._liveness = LivenessSession()
+        self._frame_reasons: Dict[int, List[str]] = {}
+        self._scores: List[float] = []
+        self._last: Optional[Tuple[EmbeddingResult, FusionResult, DecisionResult]] = None
+        self._rejects = 0
+        loaded = store.load(user_id)
+        if loaded is None:
+            self.result = PipelineResult(decision="reject", confidence=0.0, message="User not enrolled.", match=False)
+        else:
+            self._ref_rgb, self._ref_depth = loaded
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def remaining(self) -> float:
+        """Seconds left of the time budget."""
+        return max(0.0, self._deadline - time.perf_counter())
+
+    def push(
+        self,
+        rgb: np.ndarray,
+        depth: Optional[np.ndarray] = None,
+        timestamp: Optional[float] = None,
+    ) -> StreamUpdate:
+        """Process the next frame (capture time in seconds, if known); .result is set once decided."""
+        if self.result is not None:
+            raise RuntimeError("verification stream already decided")
+        update = StreamUpdate(frame=self.frames)
+        self.frames += 1
+        prep, update.reasons = _preprocess_checked(rgb, depth, self._tracker)
+        if prep is None:
+            self._frame_reasons[update.frame] = update.reasons
+        elif prep.num_faces == 1:
+            live = self._liveness.update(prep.face_rgb, prep.depth(), timestamp)
+            self._scores.append(live.score)
+            update.liveness_score = live.score
+            if live.score >= 0.4:
+                emb = _embed(prep.face_rgb, prep.depth())
+                fusion = fuse_signals(
+                    emb.rgb_embedding, self._ref_rgb, live.score,
+                    depth_embedding=emb.depth_embedding, reference_depth_embedding=self._ref_depth,
+                    motion_consistency=live.micro_motion, weights=FUSION_WEIGHTS,
+                )
+                dec = decide(fusion, accept_threshold=ACCEPT_THRESHOLD, reject_threshold=REJECT_THRESHOLD)
+                self._last = emb, fusion, dec
+                update.decision = dec.decision
+                self._rejects = self._rejects + 1 if dec.decision == "reject" else 0
+        if update.decision == "accept":
+            update.result = self._decide("accept")
+        elif self.reject_after and self._rejects >= self.reject_after:
+            update.result = self._decide("reject")
+        elif self.frames >= self.max_frames or self.remaining() <= 0:
+            update.result = self._decide("budget")
+        return update
+
+    def finish(self) -> PipelineResult:
+        """Decide with the frames pushed so far (the client stopped sending, or the budget ran out while waiting)."""
+        if self.result is not None:
+            return self.result
+        return self._decide("budget" if self.remaining() <= 0 else "ended")
+
+    def _decide(self, outcome: str) -> PipelineResult:
+        liveness_score = float(np.mean(self._scores)) if self._scores else 0.0
+        if self._last is None:
+            self.result = PipelineResult(
+                decision="reject",
+                confidence=0.0,
+                message="No valid frames or liveness failed.",
+                liveness_score=liveness_score,
+                match=False,
+                frame_reasons=self._frame_reasons,
+            )
+        else:
+            emb, fusion, dec = self._last
+            match, _ = verify_against_templates(
+                self.store, self.user_id, emb.rgb_embedding, emb.depth_embedding, threshold=ACCEPT_THRESHOLD,
+            )
+            self.result = PipelineResult(
+                decision=dec.decision,
+                confidence=dec.confidence,
+                message=dec.message,
+                liveness_score=liveness_score,
+                fusion_score=fusion.score,
+                components=fusion.components,
+                match=match,
+                frame_reasons=self._frame_reasons,
+            )
+        _stream_latency.record((time.perf_counter() - self._t0) * 1000.0)
+        with _stream_lock:
+            _stream_outcomes[outcome] += 1
+        return self.result
+
+
 def run_enrollment_from_images(
     user_id: str,
     images: List[np.ndarray],
@@ -268,32 +615,44 @@ def run_enrollment_from_images(
     min_samples = min_samples or ENROLLMENT_MIN_SAMPLES
     if store is None:
         store = TemplateStore(base_dir=TEMPLATES_DIR, encrypt=ENCRYPT_TEMPLATES)
-    rgb_embeddings = []
-    depth_embeddings = []
+    live_rows: List[int] = []
+    live_depths: List[Optional[np.ndarray]] = []
     liveness_scores = []
     depths = depths or [None] * len(images)
-    for rgb, depth in zip(images, depths):
-        prep = preprocess_frame(rgb, depth)
-        if prep.num_faces != 1:
-            continue
-        live = check_liveness(rgb, depth, prep.face_rgb, prep.face_depth)
-        if live.score < 0.5:
-            continue
-        emb = extract_embedding(prep.face_rgb, prep.face_depth, device=DEVICE)
-        rgb_embeddings.append(emb.rgb_embedding)
-        if emb.depth_embedding is not None:
-            depth_embeddings.append(emb.depth_embedding)
-        liveness_scores.append(live.score)
-        if len(rgb_embeddings) >= min_samples:
-            break
-    if len(rgb_embeddings) < min_samples:
+    liveness = LivenessSession()
+    kept, frame_reasons = _drop_duplicates(images, min_keep=min_samples)
+    kept_depths = [depths[i] for i in kept]
+    faces, face_depths = new_face_batch(len(kept), with_depth=any(d is not None for d in kept_depths))
+    burst = _preprocess_burst([images[i] for i in kept], kept_depths, _new_tracker(), faces, face_depths)
+    with closing(burst) as preps:
+        for row, (i, (rgb, depth, prep, reasons)) in enumerate(zip(kept, preps)):
+            if prep is None:
+                frame_reasons[i] = reasons
+                continue
+            if prep.num_faces != 1:
+                continue
+            live = liveness.update(prep.face_rgb, prep.depth())
+            if live.score < 0.5:
+                continue
+            live_rows.append(row)
+            live_depths.append(prep.depth())
+            liveness_scores.append(live.score)
+            if len(live_rows) >= min_samples:
+                break
+    if len(live_rows) < min_samples:
         return PipelineResult(
             decision="reject",
             confidence=0.0,
-            message=f"Need at least {min_samples} live samples; got {len(rgb_embeddings)}.",
+            message=f"Need at least {min_samples} live samples; got {len(live_rows)}.",
             liveness_score=float(np.mean(liveness_scores)) if liveness_scores else 0.0,
             match=False,
+            frame_reasons=frame_reasons,
+            frames_skipped=len(images) - len(kept),
         )
+    # All live crops are already rows of one aligned batch: embed them in a single call
+    embs = extract_embeddings(_batch_rows(faces, live_rows), live_depths, device=DEVICE)
+    rgb_embeddings = [e.rgb_embedding for e in embs]
+    depth_embeddings = [e.depth_embedding for e in embs if e.depth_embedding is not None]
     rgb_mean = np.mean(rgb_embeddings, axis=0).astype(np.float32)
     rgb_mean /= np.linalg.norm(rgb_mean) + 1e-8
     depth_mean = None
@@ -308,10 +667,33 @@ def run_enrollment_from_images(
         liveness_score=float(np.mean(liveness_scores)),
         fusion_score=1.0,
         match=True,
+        frame_reasons=frame_reasons,
+        frames_skipped=len(images) - len(kept),
     )
 
 
 def init_pipeline() -> None:
-    """Load embedding model and ensure dirs."""
-    load_embedding_model(device=DEVICE, dim=EMBEDDING_DIM)
+    """Apply the CPU thread budget, load face detector, eye landmarker and embedding model, start the batching scheduler, and ensure dirs."""
+    apply_thread_budget(CPU_THREAD_BUDGET, workers=API_WORKERS, split=THREAD_SPLIT)
+    load_face_detector()
+    if DEPTH_ESTIMATION_FALLBACK:
+        load_depth_estimator()
+    load_eye_landmarker()
+    configure_executor(PREPROCESS_WORKERS, VERIFY_WORKERS)
+    load_embedding_model(
+        device=DEVICE,
+        dim=EMBEDDING_DIM,
+        compiled=COMPILE_MODELS,
+        warmup_batch_sizes=COMPILE_WARMUP_BATCH_SIZES if INFERENCE_BATCHING else (1,),
+        cache_size=EMBEDDING_CACHE_SIZE,
+    )
+    if INFERENCE_BATCHING:
+        _embed_scheduler.start()
     TEMPLATES_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def shutdown_pipeline() -> None:
+    """Stop background workers started by init_pipeline() and release capture devices."""
+    _embed_scheduler.stop()
+    shutdown_executor()
+    close_capture_sessions()
@@ -1,6 +1,8 @@
 """
 Preprocess: face detection, alignment, normalization for embedding and liveness.
 """
+from .detector import FaceDetectorManager, detect_faces, load_face_detector
 from .pipeline import preprocess_frame, PreprocessResult
+from .tracker import FaceTracker
 
-__all__ = ["preprocess_frame", "PreprocessResult"]
+__all__ = ["preprocess_frame", "PreprocessResult", "FaceDetectorManager", "detect_faces", "load_face_detector", "FaceTracker"]
@@ -0,0 +1,133 @@
+"""
+Depth estimation fallback for RGB-only capture. Runs on the aligned face crop (112x112 working
+size, float32) rather than the full frame, and only when liveness or embedding asks for depth.
+Backends: "laplacian" (gradient-magnitude proxy) and "dnn" (lightweight learned monocular depth
+model from MODELS_DIR, loaded with OpenCV DNN; falls back to the proxy if it cannot be loaded).
+"""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..config import DEPTH_ESTIMATOR_BACKEND, DEPTH_ESTIMATOR_MODEL, DEPTH_ESTIMATOR_INPUT_SIZE
+from ..inference.metrics import LatencyRecorder
+
+
+def _minmax(depth: np.ndarray) -> np.ndarray:
+    return cv2.normalize(depth, None, 0.0, 1.0, cv2.NORM_MINMAX, dtype=cv2.CV_32F)
+
+
+class LaplacianDepthEstimator:
+    """Placeholder proxy: |Laplacian| of the face crop, min-max normalized to [0, 1]."""
+
+    name = "laplacian"
+
+    def estimate(self, face: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY) if face.ndim == 3 else face
+        return _minmax(np.abs(cv2.Laplacian(gray, cv2.CV_32F)))
+
+
+class DnnDepthEstimator:
+    """Learned monocular depth (MiDaS-small style ONNX / Caffe / TF model); output resized to the crop."""
+
+    name = "dnn"
+
+    def __init__(self, model_path: Path = DEPTH_ESTIMATOR_MODEL, input_size: int = DEPTH_ESTIMATOR_INPUT_SIZE):
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"Depth model not found: {model_path}")
+        self._net = cv2.dnn.readNet(str(model_path))
+        self._input_size = (input_size, input_size)
+
+    def estimate(self, face: np.ndarray) -> np.ndarray:
+        h, w = face.shape[:2]
+        if face.ndim == 2:
+            face = cv2.cvtColor(face, cv2.COLOR_GRAY2BGR)
+        # face is float32 in [0, 1]; model expects RGB in [0, 1]
+        blob = cv2.dnn.blobFromImage(face, 1.0, self._input_size, swapRB=True)
+        self._net.setInput(blob)
+        out = self._net.forward()
+        depth = out.reshape(out.shape[-2], out.shape[-1]).astype(np.float32, copy=False)
+        return _minmax(cv2.resize(depth, (w, h), interpolation=cv2.INTER_LINEAR))
+
+
+_BACKENDS = {"laplacian": LaplacianDepthEstimator, "dnn": DnnDepthEstimator}
+
+
+class DepthEstimatorManager:
+    """One estimator per thread (DNN nets are not thread-safe); falls back to the Laplacian proxy."""
+
+    def __init__(self, backend: str = DEPTH_ESTIMATOR_BACKEND):
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown depth estimator backend: {backend}")
+        self.backend = backend
+        self._local = threading.local()
+        self._latency: Dict[str, LatencyRecorder] = {name: LatencyRecorder() for name in _BACKENDS}
+        self._fallback_reason: Optional[str] = None
+
+    def _estimator(self):
+        est = getattr(self._local, "estimator", None)
+        if est is None:
+            try:
+                est = _BACKENDS[self.backend]()
+            except (OSError, RuntimeError, cv2.error) as e:
+                if self.backend == "laplacian":
+                    raise
+                self._fallback_reason = str(e)
+                est = LaplacianDepthEstimator()
+            self._local.estimator = est
+        return est
+
+    def estimate(self, face: np.ndarray) -> np.ndarray:
+        """HxW float32 depth in [0, 1] for an aligned face crop (same size as the crop)."""
+        if cv2 is None:
+            return np.zeros(face.shape[:2], dtype=np.float32)
+        est = self._estimator()
+        with self._latency[est.name].time():
+            return est.estimate(face)
+
+    def metrics(self) -> dict:
+        return {
+            "backend": self.backend,
+            "fallback": self._fallback_reason,
+            "latency": {name: rec.summary() for name, rec in self._latency.items()},
+        }
+
+
+_manager: Optional[DepthEstimatorManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_depth_estimator() -> DepthEstimatorManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = DepthEstimatorManager()
+    return _manager
+
+
+def load_depth_estimator(backend: str = DEPTH_ESTIMATOR_BACKEND) -> DepthEstimatorManager:
+    """Replace the process-wide manager and build the calling thread's estimator eagerly."""
+    global _manager
+    manager = DepthEstimatorManager(backend)
+    if cv2 is not None:
+        manager._estimator()
+    with _manager_lock:
+        _manager = manager
+    return manager
+
+
+def estimate_face_depth(face: np.ndarray) -> np.ndarray:
+    return get_depth_estimator().estimate(face)
+
+
+def depth_estimator_metrics() -> dict:
+    return get_depth_estimator().metrics()
@@ -0,0 +1,190 @@
+"""
+Face detector manager: one detector instance per thread (OpenCV classifiers and DNN nets are
+not thread-safe), loaded once instead of per frame. Frames are downscaled to a detection
+width and boxes mapped back to full resolution.
+Backends: "haar" (OpenCV Haar cascade) and "dnn" (OpenCV DNN SSD face detector from MODELS_DIR).
+"""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..config import (
+    FACE_DETECTOR_BACKEND,
+    FACE_DETECTOR_DNN_MODEL,
+    FACE_DETECTOR_DNN_CONFIG,
+    FACE_DETECTOR_DNN_CONFIDENCE,
+    FACE_DETECTION_WIDTH,
+    FACE_MIN_SIZE,
+)
+from ..inference.metrics import LatencyRecorder
+
+Box = Tuple[int, int, int, int]  # x, y, w, h
+
+
+class HaarFaceDetector:
+    """OpenCV frontal-face Haar cascade (the original fallback detector)."""
+
+    name = "haar"
+
+    def __init__(self):
+        self._cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        )
+        if self._cascade.empty():
+            raise RuntimeError("Haar cascade failed to load")
+
+    def detect(self, img: np.ndarray, min_size: int) -> List[Box]:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        boxes = self._cascade.detectMultiScale(gray, 1.1, 5, minSize=(min_size, min_size))
+        return [(int(x), int(y), int(w), int(h)) for (x, y, w, h) in boxes]
+
+
+class DnnFaceDetector:
+    """OpenCV DNN SSD face detector (res10 300x300 Caffe model or compatible)."""
+
+    name = "dnn"
+    input_size = (300, 300)
+    mean = (104.0, 177.0, 123.0)
+
+    def __init__(
+        self,
+        model_path: Path = FACE_DETECTOR_DNN_MODEL,
+        config_path: Optional[Path] = FACE_DETECTOR_DNN_CONFIG,
+        confidence: float = FACE_DETECTOR_DNN_CONFIDENCE,
+    ):
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"DNN face model not found: {model_path}")
+        self._net = cv2.dnn.readNet(str(model_path), str(config_path) if config_path else "")
+        self._confidence = confidence
+
+    def detect(self, img: np.ndarray, min_size: int) -> List[Box]:
+        h, w = img.shape[:2]
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        blob = cv2.dnn.blobFromImage(img, 1.0, self.input_size, self.mean)
+        self._net.setInput(blob)
+        out = self._net.forward().reshape(-1, 7)  # [_, _, conf, x1, y1, x2, y2] normalized
+        boxes = []
+        for conf, x1, y1, x2, y2 in out[:, 2:7]:
+            if conf < self._confidence:
+                continue
+            x1, y1 = max(0, int(x1 * w)), max(0, int(y1 * h))
+            x2, y2 = min(w, int(x2 * w)), min(h, int(y2 * h))
+            if x2 - x1 >= min_size and y2 - y1 >= min_size:
+                boxes.append((x1, y1, x2 - x1, y2 - y1))
+        return boxes
+
+
+_BACKENDS = {"haar": HaarFaceDetector, "dnn": DnnFaceDetector}
+
+
+class FaceDetectorManager:
+    """
+    Lazily builds the configured backend once per thread. If the backend cannot be loaded
+    (e.g. missing DNN model file) it falls back to Haar and records the reason in metrics().
+    """
+
+    def __init__(
+        self,
+        backend: str = FACE_DETECTOR_BACKEND,
+        detection_width: int = FACE_DETECTION_WIDTH,
+        min_size: int = FACE_MIN_SIZE,
+    ):
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown face detector backend: {backend}")
+        self.backend = backend
+        self.detection_width = detection_width
+        self.min_size = min_size
+        self._local = threading.local()
+        self._latency: Dict[str, LatencyRecorder] = {name: LatencyRecorder() for name in _BACKENDS}
+        self._fallback_reason: Optional[str] = None
+
+    def _detector(self):
+        det = getattr(self._local, "detector", None)
+        if det is None:
+            try:
+                det = _BACKENDS[self.backend]()
+            except (OSError, RuntimeError, cv2.error) as e:
+                if self.backend == "haar":
+                    raise
+                self._fallback_reason = str(e)
+                det = HaarFaceDetector()
+            self._local.detector = det
+        return det
+
+    def detect(self, rgb: np.ndarray) -> List[Box]:
+        """Face boxes in full-resolution coordinates (empty list if none)."""
+        if cv2 is None:
+            return []
+        h, w = rgb.shape[:2]
+        scale = 1.0
+        img = rgb
+        if self.detection_width and w > self.detection_width:
+            scale = w / float(self.detection_width)
+            img = cv2.resize(
+                rgb, (self.detection_width, max(1, int(round(h / scale)))), interpolation=cv2.INTER_AREA
+            )
+        det = self._detector()
+        with self._latency[det.name].time():
+            boxes = det.detect(img, max(1, int(round(self.min_size / scale))))
+        if scale == 1.0:
+            return boxes
+        return [
+            (int(round(x * scale)), int(round(y * scale)), int(round(bw * scale)), int(round(bh * scale)))
+            for (x, y, bw, bh) in boxes
+        ]
+
+    def metrics(self) -> dict:
+        """Configured backend, fallback reason (if any), and per-backend detection latency."""
+        return {
+            "backend": self.backend,
+            "detection_width": self.detection_width,
+            "fallback": self._fallback_reason,
+            "latency": {name: rec.summary() for name, rec in self._latency.items()},
+        }
+
+
+_manager: Optional[FaceDetectorManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_face_detector() -> FaceDetectorManager:
+    """Process-wide detector manager (created with config defaults on first use)."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = FaceDetectorManager()
+    return _manager
+
+
+def load_face_detector(
+    backend: str = FACE_DETECTOR_BACKEND,
+    detection_width: int = FACE_DETECTION_WIDTH,
+    min_size: int = FACE_MIN_SIZE,
+) -> FaceDetectorManager:
+    """Replace the process-wide manager and build the calling thread's detector eagerly."""
+    global _manager
+    manager = FaceDetectorManager(backend, detection_width, min_size)
+    if cv2 is not None:
+        manager._detector()
+    with _manager_lock:
+        _manager = manager
+    return manager
+
+
+def detect_faces(rgb: np.ndarray) -> List[Box]:
+    return get_face_detector().detect(rgb)
+
+
+def detector_metrics() -> dict:
+    return get_face_detector().metrics()
@@ -5,7 +5,7 @@ Input: RGB (+ optional depth). Output: aligned face crop(s) + ROI depth for down
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Optional, Sequence, Tuple
 
 import numpy as np
 
@@ -14,31 +14,34 @@ try:
 except ImportError:
     cv2 = None
 
+from .depth import estimate_face_depth
+from .detector import detect_faces
+from .tracker import FaceTracker
+
 
 @dataclass
 class PreprocessResult:
-    """Aligned face(s) and optional depth ROI for one frame."""
+    """Aligned face(s) and optional depth ROI for one frame. Read depth through depth()."""
     face_rgb: np.ndarray           # 112x112 or 224x224 normalized for embedding
-    face_depth: Optional[np.ndarray] = None  # same crop region from depth
+    face_depth: Optional[np.ndarray] = None  # same crop region from depth (sensor, or estimated once by depth())
     bbox: Optional[Tuple[int, int, int, int]] = None  # x,y,w,h
     landmarks: Optional[np.ndarray] = None  # 5 or 68 pts
     num_faces: int = 1
+    tracked: bool = False  # bbox came from the burst tracker, not a full detection
+    estimate_depth: bool = False  # no sensor depth: estimate on the face crop when first asked
 
+    def depth(self) -> Optional[np.ndarray]:
+        """Face-crop depth; estimated from face_rgb on first call (then cached) when estimate_depth."""
+        if self.face_depth is None and self.estimate_depth:
+            self.face_depth = estimate_face_depth(self.face_rgb)
+        return self.face_depth
 
-def _detect_face_cascade(rgb: np.ndarray) -> List[Tuple[int, int, int, int]]:
-    """Simple Haar cascade fallback. Production: use MTCNN / RetinaFace / YOLO."""
-    if cv2 is None:
-        h, w = rgb.shape[:2]
-        return [(0, 0, w, h)]
-    gray = cv2.cvtColor(rgb, cv2.COLOR_BGR2GRAY)
-    cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
-    boxes = cascade.detectMultiScale(gray, 1.1, 5, minSize=(80, 80))
-    if len(boxes) == 0:
-        h, w = rgb.shape[:2]
-        return [(0, 0, w, h)]
-    return [(int(x), int(y), int(w), int(h)) for (x, y, w, h) in boxes]
+
+def new_face_batch(n: int, output_size: int = 112, with_depth: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Preallocated (n, S, S, 3) float32 face batch and, if with_depth, an (n, S, S) float32 depth batch."""
+    faces = np.empty((n, output_size, output_size, 3), dtype=np.float32)
+    depths = np.empty((n, output_size, output_size), dtype=np.float32) if with_depth else None
+    return faces, depths
 
 
 def _align_and_crop(
@@ -46,43 +49,97 @@ def _align_and_crop(
     bbox: Tuple[int, int, int, int],
     depth: Optional[np.ndarray],
     output_size: int = 112,
+    out: Optional[np.ndarray] = None,
+    depth_out: Optional[np.ndarray] = None,
 ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
-    """Crop and resize face to output_size x output_size; same region for depth."""
+    """
+    Crop and resize face to output_size x output_size; same region for depth.
+    With out / depth_out (float32 rows of a batch from new_face_batch) the results are written
+    in place and the rows are returned; values match the allocating path exactly.
+    """
     x, y, w, h = bbox
     if cv2 is None:
         face_rgb = rgb[y : y + h, x : x + w]
         face_depth = depth[y : y + h, x : x + w] if depth is not None else None
+        return face_rgb.astype(np.float32) / 255.0, face_depth
+    size = (output_size, output_size)
+    if out is None:
+        face_rgb = cv2.resize(rgb[y : y + h, x : x + w], size)
+        # Normalize to [0,1] or standard mean/std for the embedding model
+        face_rgb = face_rgb.astype(np.float32) / 255.0
     else:
-        face_rgb = cv2.resize(rgb[y : y + h, x : x + w], (output_size, output_size))
-        face_depth = (
-            cv2.resize(depth[y : y + h, x : x + w], (output_size, output_size))
-            if depth is not None else None
-        )
-    # Normalize to [0,1] or standard mean/std for the embedding model
-    face_rgb = face_rgb.astype(np.float32) / 255.0
+        face_rgb = out
+        np.divide(cv2.resize(rgb[y : y + h, x : x + w], size), 255.0, out=out, dtype=np.float32, casting="unsafe")
+    face_depth = None
+    if depth is not None:
+        roi = depth[y : y + h, x : x + w]
+        if depth_out is None:
+            face_depth = cv2.resize(roi, size)
+        elif roi.dtype == np.float32:
+            face_depth = depth_out
+            cv2.resize(roi, size, dst=depth_out)
+        else:
+            face_depth = depth_out
+            np.copyto(depth_out, cv2.resize(roi, size), casting="unsafe")
     return face_rgb, face_depth
 
 
+def align_batch(
+    images: Sequence[np.ndarray],
+    boxes: Sequence[Tuple[int, int, int, int]],
+    depths: Optional[Sequence[Optional[np.ndarray]]] = None,
+    output_size: int = 112,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Align N known boxes into one (N, S, S, 3) float32 array (plus (N, S, S) depth when any frame
+    has depth; rows of frames without depth are left unset). Feed it straight to extract_embeddings.
+    """
+    depths = depths if depths is not None else [None] * len(images)
+    faces, face_depths = new_face_batch(len(images), output_size, any(d is not None for d in depths))
+    for i, (rgb, bbox, depth) in enumerate(zip(images, boxes, depths)):
+        _align_and_crop(
+            rgb, bbox, depth, output_size, out=faces[i],
+            depth_out=face_depths[i] if depth is not None else None,
+        )
+    return faces, face_depths
+
+
 def preprocess_frame(
     rgb: np.ndarray,
     depth: Optional[np.ndarray] = None,
     output_size: int = 112,
     max_faces: int = 1,
+    tracker: Optional[FaceTracker] = None,
+    estimate_depth: bool = False,
+    out: Optional[np.ndarray] = None,
+    depth_out: Optional[np.ndarray] = None,
 ) -> PreprocessResult:
     """
     Detect face(s), align, crop to output_size, normalize.
     Returns the first (or primary) face for embedding/liveness.
+    With a tracker (one per burst), later frames follow the first detection instead of
+    re-detecting; detection re-runs on track loss.
+    Without sensor depth, estimate_depth defers depth estimation to PreprocessResult.depth().
+    out / depth_out: batch rows to align into (see new_face_batch) instead of fresh arrays.
     """
-    boxes = _detect_face_cascade(rgb)
+    tracked = tracker.track(rgb) if tracker is not None and tracker.active else None
+    if tracked is not None:
+        boxes = [tracked]
+    else:
+        boxes = detect_faces(rgb)
+        if tracker is not None and len(boxes) == 1:
+            tracker.init(rgb, boxes[0])
     if not boxes:
         h, w = rgb.shape[:2]
         boxes = [(0, 0, w, h)]
     # Take largest face
     primary = max(boxes, key=lambda b: b[2] * b[3])
-    face_rgb, face_depth = _align_and_crop(rgb, primary, depth, output_size)
+    face_rgb, face_depth = _align_and_crop(rgb, primary, depth, output_size, out=out, depth_out=depth_out)
     return PreprocessResult(
         face_rgb=face_rgb,
         face_depth=face_depth,
         bbox=primary,
         num_faces=len(boxes),
+        tracked=tracked is not None,
+        estimate_depth=estimate_depth and depth is None,
     )
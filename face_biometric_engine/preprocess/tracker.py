@@ -0,0 +1,132 @@
+"""
+Cross-frame face tracking for multi-frame bursts: detect once, then follow the box with
+normalized template matching inside a padded search ROI. Full detection re-runs only on
+track loss (low correlation) or after max_frames tracked frames.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..config import TRACK_SEARCH_PAD, TRACK_MIN_SCORE, TRACK_TEMPLATE_WIDTH, TRACK_MAX_FRAMES
+
+Box = Tuple[int, int, int, int]  # x, y, w, h
+
+_counts = {"detections": 0, "tracked": 0, "lost": 0}
+_counts_lock = threading.Lock()
+
+
+def _count(key: str) -> None:
+    with _counts_lock:
+        _counts[key] += 1
+
+
+def tracking_metrics() -> dict:
+    """Detections vs tracked frames across all trackers (tracked share = detection work saved)."""
+    with _counts_lock:
+        counts = dict(_counts)
+    total = counts["detections"] + counts["tracked"]
+    counts["tracked_ratio"] = counts["tracked"] / total if total else 0.0
+    return counts
+
+
+def _gray(img: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+
+
+class FaceTracker:
+    """
+    One tracker per burst (not shared between requests). The template is taken once from the
+    detected face (anchor), so matching does not drift; only the search position follows the face.
+    After freeze() the tracker is read-only: every frame is searched around the anchor box and no
+    state changes, so frames of one burst can be tracked concurrently.
+    """
+
+    def __init__(
+        self,
+        search_pad: float = TRACK_SEARCH_PAD,
+        min_score: float = TRACK_MIN_SCORE,
+        template_width: int = TRACK_TEMPLATE_WIDTH,
+        max_frames: int = TRACK_MAX_FRAMES,
+    ):
+        self.search_pad = search_pad
+        self.min_score = min_score
+        self.template_width = template_width
+        self.max_frames = max_frames
+        self.bbox: Optional[Box] = None
+        self._template: Optional[np.ndarray] = None
+        self._scale = 1.0
+        self._age = 0
+        self.frozen = False
+
+    @property
+    def active(self) -> bool:
+        return self._template is not None
+
+    def freeze(self) -> None:
+        """Stop updating: track() searches around the anchor box only (thread-safe)."""
+        self.frozen = True
+
+    def reset(self) -> None:
+        if self.frozen:
+            return
+        self.bbox = None
+        self._template = None
+        self._age = 0
+
+    def init(self, rgb: np.ndarray, bbox: Box) -> None:
+        """Anchor on a freshly detected box (no-op once frozen)."""
+        _count("detections")
+        if cv2 is None or self.frozen:
+            return
+        x, y, w, h = bbox
+        if w < 8 or h < 8:
+            self.reset()
+            return
+        self._scale = min(1.0, self.template_width / float(w))
+        crop = _gray(rgb[y : y + h, x : x + w])
+        self._template = cv2.resize(
+            crop, (max(1, int(round(w * self._scale))), max(1, int(round(h * self._scale)))),
+            interpolation=cv2.INTER_AREA,
+        )
+        self.bbox = bbox
+        self._age = 0
+
+    def track(self, rgb: np.ndarray) -> Optional[Box]:
+        """New box for this frame, or None on loss (caller re-detects and calls init())."""
+        if not self.active or (not self.frozen and self._age >= self.max_frames):
+            self.reset()
+            return None
+        x, y, w, h = self.bbox
+        H, W = rgb.shape[:2]
+        px, py = int(w * self.search_pad), int(h * self.search_pad)
+        x0, y0 = max(0, x - px), max(0, y - py)
+        x1, y1 = min(W, x + w + px), min(H, y + h + py)
+        th, tw = self._template.shape[:2]
+        sw, sh = int(round((x1 - x0) * self._scale)), int(round((y1 - y0) * self._scale))
+        if sw < tw or sh < th:
+            _count("lost")
+            self.reset()
+            return None
+        search = cv2.resize(_gray(rgb[y0:y1, x0:x1]), (sw, sh), interpolation=cv2.INTER_AREA)
+        res = cv2.matchTemplate(search, self._template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (mx, my) = cv2.minMaxLoc(res)
+        if score < self.min_score:
+            _count("lost")
+            self.reset()
+            return None
+        nx = min(max(0, x0 + int(round(mx / self._scale))), W - w)
+        ny = min(max(0, y0 + int(round(my / self._scale))), H - h)
+        _count("tracked")
+        if self.frozen:
+            return (nx, ny, w, h)
+        self.bbox = (nx, ny, w, h)
+        self._age += 1
+        return self.bbox
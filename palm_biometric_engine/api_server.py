@@ -2,37 +2,78 @@
 FastAPI: enrollment and verification for multimodal palm recognition.
 Blockchain-ready: responses include template_hash for smart-contract binding.
 Zero-trust; no raw images stored; encrypted templates only.
+/verify/stream takes frames over a WebSocket as they are captured and decides early.
 """
 from __future__ import annotations
 
+import asyncio
 import base64
-from typing import List, Optional
+import io
+import json
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
-from config import API_HOST, API_PORT, ENROLLMENT_MIN_SAMPLES, RESPONSE_INCLUDE_HASH
+from config import API_HOST, API_PORT, API_WORKERS, ENROLLMENT_MIN_SAMPLES, RESPONSE_INCLUDE_HASH
+from inference.executor import map_ordered
+from inference.metrics import collect_metrics
 from pipeline import (
     init_pipeline,
+    shutdown_pipeline,
     run_enrollment_from_images,
     run_verification_from_images,
     PalmPipelineResult,
+    VerificationStream,
 )
 from storage import TemplateStore
-from config import TEMPLATES_DIR, ENCRYPT_TEMPLATES
+from config import TEMPLATES_DIR, ENCRYPT_TEMPLATES, CAPTURE_RGB_RESOLUTION
 
 
-def decode_image(b64: str) -> np.ndarray:
-    raw = base64.b64decode(b64)
+def _reduced_decode_flag(raw: bytes, target: Tuple[int, int]) -> int:
+    """
+    Largest IMREAD_REDUCED_COLOR_* factor that keeps the image at or above the working
+    resolution (JPEG decodes at 1/2, 1/4, 1/8 scale via DCT scaling). Size comes from the header.
+    """
+    import cv2
+    try:
+        from PIL import Image
+        with Image.open(io.BytesIO(raw)) as im:
+            w, h = im.size
+    except Exception:
+        return cv2.IMREAD_COLOR
+    # Compare long/short sides so portrait uploads are not over-reduced
+    long_side, short_side = max(w, h), min(w, h)
+    t_long, t_short = max(target), min(target)
+    for factor, flag in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2)):
+        if long_side // factor >= t_long and short_side // factor >= t_short:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def decode_image_bytes(raw: bytes, target: Optional[Tuple[int, int]] = CAPTURE_RGB_RESOLUTION) -> np.ndarray:
+    """Decode an encoded image (JPEG, PNG, ...) to a BGR numpy array (H, W, 3)."""
     import cv2
     arr = np.frombuffer(raw, dtype=np.uint8)
-    img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
+    flag = _reduced_decode_flag(raw, target) if target else cv2.IMREAD_COLOR
+    img = cv2.imdecode(arr, flag)
     if img is None:
         raise ValueError("Invalid image")
     return img
 
 
+def decode_image(b64: str, target: Optional[Tuple[int, int]] = CAPTURE_RGB_RESOLUTION) -> np.ndarray:
+    """Decode base64 image to a BGR numpy array (H, W, 3)."""
+    return decode_image_bytes(base64.b64decode(b64), target)
+
+
+def decode_images(b64_images: List[str]) -> List[np.ndarray]:
+    """Decode a request's images concurrently (imdecode releases the GIL)."""
+    return list(map_ordered(decode_image, b64_images, prefetch=len(b64_images)))
+
+
 app = FastAPI(
     title="Multimodal Palm Recognition API",
     description="Palmprint + palm vein + hand geometry. Encrypted templates only; blockchain-ready.",
@@ -47,6 +88,11 @@ def startup():
     init_pipeline()
 
 
+@app.on_event("shutdown")
+def shutdown():
+    shutdown_pipeline()
+
+
 class EnrollRequest(BaseModel):
     user_id: str
     images: List[str]
@@ -64,6 +110,8 @@ class EnrollResponse(BaseModel):
     message: str
     liveness_score: float = 0.0
     template_hash: Optional[str] = None
+    frame_reasons: Dict[int, List[str]] = {}  # frame index -> quality-gate / near_duplicate reasons
+    frames_skipped: int = 0
 
 
 class VerifyResponse(BaseModel):
@@ -75,6 +123,8 @@ class VerifyResponse(BaseModel):
     liveness_score: float = 0.0
     similarity_score: float = 0.0
     template_hash: Optional[str] = None
+    frame_reasons: Dict[int, List[str]] = {}  # frame index -> quality-gate / near_duplicate reasons
+    frames_skipped: int = 0
 
 
 @app.post("/enroll", response_model=EnrollResponse)
@@ -82,7 +132,7 @@ def enroll(req: EnrollRequest):
     if len(req.images) < ENROLLMENT_MIN_SAMPLES:
         raise HTTPException(400, detail=f"At least {ENROLLMENT_MIN_SAMPLES} images required.")
     try:
-        images = [decode_image(b) for b in req.images]
+        images = decode_images(req.images)
     except Exception as e:
         raise HTTPException(400, detail=f"Invalid image: {e}")
     result = run_enrollment_from_images(req.user_id, images, min_samples=ENROLLMENT_MIN_SAMPLES, store=store)
@@ -93,6 +143,8 @@ def enroll(req: EnrollRequest):
         message=result.message,
         liveness_score=result.liveness_score,
         template_hash=result.template_hash if RESPONSE_INCLUDE_HASH else None,
+        frame_reasons=result.frame_reasons,
+        frames_skipped=result.frames_skipped,
     )
 
 
@@ -101,10 +153,13 @@ def verify(req: VerifyRequest):
     if not req.images:
         raise HTTPException(400, detail="At least one image required.")
     try:
-        images = [decode_image(b) for b in req.images]
+        images = decode_images(req.images)
     except Exception as e:
         raise HTTPException(400, detail=f"Invalid image: {e}")
-    result = run_verification_from_images(req.user_id, images, store=store)
+    return _verify_response(run_verification_from_images(req.user_id, images, store=store))
+
+
+def _verify_response(result: PalmPipelineResult) -> VerifyResponse:
     return VerifyResponse(
         success=result.decision == "accept" and result.match,
         decision=result.decision,
@@ -114,17 +169,82 @@ def verify(req: VerifyRequest):
         liveness_score=result.liveness_score,
         similarity_score=result.similarity_score,
         template_hash=result.template_hash if RESPONSE_INCLUDE_HASH else None,
+        frame_reasons=result.frame_reasons,
+        frames_skipped=result.frames_skipped,
     )
 
 
+def _stream_frame(msg: dict) -> Optional[bytes]:
+    """Encoded image of one stream message; None for {"end": true}."""
+    if msg.get("bytes") is not None:
+        return msg["bytes"]
+    payload = json.loads(msg.get("text") or "{}")
+    if payload.get("end"):
+        return None
+    return base64.b64decode(payload["image"])
+
+
+@app.websocket("/verify/stream")
+async def verify_stream(websocket: WebSocket, user_id: str):
+    """
+    Streaming verification: send each frame as soon as it is captured, as a binary message (encoded
+    image) or text {"image": base64}; {"end": true} asks for a decision with the frames sent so far.
+    Each frame is processed on arrival and answered with {"type": "frame", ...}; the decision is
+    pushed as {"type": "result", ...} (the /verify response fields) as soon as the stream accepts,
+    confidently rejects or runs out of its STREAM_* frame / time budget, and the socket is closed.
+    """
+    await websocket.accept()
+    stream = await run_in_threadpool(VerificationStream, user_id, store)
+    try:
+        while not stream.done:
+            try:
+                msg = await asyncio.wait_for(websocket.receive(), timeout=stream.remaining())
+            except asyncio.TimeoutError:
+                break
+            if msg["type"] == "websocket.disconnect":
+                return
+            try:
+                raw = _stream_frame(msg)
+                if raw is None:
+                    break
+                rgb = await run_in_threadpool(decode_image_bytes, raw)
+            except Exception as e:
+                await websocket.send_json({"type": "error", "detail": f"Invalid image: {e}"})
+                await websocket.close(code=1003)
+                return
+            update = await run_in_threadpool(stream.push, rgb)
+            await websocket.send_json({
+                "type": "frame",
+                "frame": update.frame,
+                "reasons": update.reasons,
+                "liveness_score": update.liveness_score,
+                "decision": update.decision,
+            })
+        result = await run_in_threadpool(stream.finish)
+        await websocket.send_json({"type": "result", **_verify_response(result).model_dump()})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 
-def run_server(host: str = API_HOST, port: int = API_PORT):
+@app.get("/metrics")
+def metrics():
+    """Inference metrics: scheduler queue depth, batch sizes, latencies."""
+    return collect_metrics()
+
+
+def run_server(host: str = API_HOST, port: int = API_PORT, workers: int = API_WORKERS):
     import uvicorn
-    uvicorn.run(app, host=host, port=port)
+    if workers > 1:
+        # Multiple workers need an import string; each process applies its share of CPU_THREAD_BUDGET
+        uvicorn.run("api_server:app", host=host, port=port, workers=workers)
+    else:
+        uvicorn.run(app, host=host, port=port)
 
 
 if __name__ == "__main__":
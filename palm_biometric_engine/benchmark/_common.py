@@ -0,0 +1,44 @@
+"""Shared timing helpers for benchmark scripts."""
+from __future__ import annotations
+
+from typing import Callable, Dict, List
+
+from ..inference.metrics import LatencyRecorder
+
+
+def time_call(fn: Callable[[], object], iters: int = 200, warmup: int = 10) -> Dict[str, float]:
+    """Run fn warmup + iters times; return LatencyRecorder summary over the timed runs."""
+    for _ in range(warmup):
+        fn()
+    rec = LatencyRecorder(window=iters)
+    for _ in range(iters):
+        with rec.time():
+            fn()
+    return rec.summary()
+
+
+def print_table(header: List[str], rows: List[List[object]]) -> None:
+    cells = [[str(c) if not isinstance(c, float) else f"{c:.3f}" for c in row] for row in rows]
+    widths = [max(len(h), *(len(r[i]) for r in cells)) for i, h in enumerate(header)]
+    print("  ".join(h.ljust(w) for h, w in zip(header, widths)))
+    for r in cells:
+        print("  ".join(c.ljust(w) for c, w in zip(r, widths)))
+
+
+def traced_peak_kib(fn: Callable[[], object], iters: int = 50, warmup: int = 5) -> float:
+    """Mean per-call tracemalloc peak (KiB) above the pre-call baseline: transient host allocations."""
+    import tracemalloc
+    for _ in range(warmup):
+        fn()
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(iters):
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - base
+    finally:
+        tracemalloc.stop()
+    return total / iters / 1024.0
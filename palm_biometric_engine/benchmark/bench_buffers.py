@@ -0,0 +1,96 @@
+"""
+Per-call host allocations (tracemalloc) and latency: reusable NCHW input buffers vs the
+previous allocate-per-call path (stack/transpose/astype copies, .float(), .astype on output).
+Checks both paths give the same embeddings, single and batched, and that an embedding returned
+earlier is not overwritten when the buffers are reused by the next call.
+Run from repository root: python -m palm_biometric_engine.benchmark.bench_buffers
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from ..config import ROI_PALMPRINT_SIZE, ROI_VEIN_SIZE
+from ..encoders import palmprint_encoder, vein_encoder, geometry_encoder
+from ._common import print_table, time_call, traced_peak_kib
+
+TOLERANCE = 1e-5  # same model and input values; batched convolutions may block differently
+
+
+def _legacy_forward(model, x: np.ndarray) -> np.ndarray:
+    """The pre-buffer encode path, kept here only as the benchmark baseline."""
+    import torch
+    t = torch.from_numpy(x).float().to("cpu")
+    with torch.no_grad():
+        emb = model(t).cpu().numpy().squeeze()
+    return emb.astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encoder input buffer allocations and latency")
+    parser.add_argument("--iters", type=int, default=200)
+    args = parser.parse_args()
+
+    palmprint_encoder.load_palmprint_encoder()
+    vein_encoder.load_vein_encoder()
+    geometry_encoder.load_geometry_encoder()
+    rng = np.random.default_rng(0)
+    pp = rng.random((*ROI_PALMPRINT_SIZE[::-1], 3), dtype=np.float32)
+    gray = rng.random(ROI_PALMPRINT_SIZE[::-1], dtype=np.float32)
+    vein = rng.random((*ROI_VEIN_SIZE[::-1], 1), dtype=np.float32)
+    geom = rng.random(6).astype(np.float32)
+
+    def legacy_palmprint(roi):
+        if roi.ndim == 2:
+            roi = np.stack([roi] * 3, axis=-1)
+        x = np.transpose(roi, (2, 0, 1))[np.newaxis, ...].astype(np.float32)
+        return _legacy_forward(palmprint_encoder._PALMPRINT_MODEL, x)
+
+    def legacy_vein(roi):
+        x = np.transpose(roi, (2, 0, 1))[np.newaxis, ...].astype(np.float32)
+        return _legacy_forward(vein_encoder._VEIN_MODEL, x)
+
+    def legacy_geometry(g):
+        pad = np.zeros(128, dtype=np.float32)
+        pad[: g.size] = g.ravel()
+        return _legacy_forward(geometry_encoder._GEOMETRY_MODEL, pad[np.newaxis, ...])
+
+    checks = []
+    for label, x, legacy, batch in (
+        ("palmprint 128x128x3", pp, legacy_palmprint, palmprint_encoder.encode_palmprint_batch),
+        ("palmprint 128x128 gray", gray, legacy_palmprint, palmprint_encoder.encode_palmprint_batch),
+        ("vein 128x128x1", vein, legacy_vein, vein_encoder.encode_vein_batch),
+        ("geometry 128", geom, legacy_geometry, geometry_encoder.encode_geometry_batch),
+    ):
+        other = 1.0 - x
+        first = batch([x])[0].embedding
+        second = batch([other])[0].embedding
+        pair = [e.embedding for e in batch([x, other])]
+        ref = [legacy(x), legacy(other)]
+        diff = max(
+            float(np.max(np.abs(got - want)))
+            for got, want in zip([first, second, *pair], [*ref, *ref])
+        )
+        checks.append([label, f"{diff:.2e}", "ok" if diff <= TOLERANCE else "FAIL"])
+
+    cases = [
+        ("palmprint 128x128x3", lambda: legacy_palmprint(pp), lambda: palmprint_encoder.encode_palmprint(pp)),
+        ("palmprint 128x128 gray", lambda: legacy_palmprint(gray), lambda: palmprint_encoder.encode_palmprint(gray)),
+        ("vein 128x128x1", lambda: legacy_vein(vein), lambda: vein_encoder.encode_vein(vein)),
+        ("geometry 128", lambda: legacy_geometry(geom), lambda: geometry_encoder.encode_geometry(geom)),
+    ]
+    rows = []
+    for label, legacy, current in cases:
+        for path, fn in (("per-call", legacy), ("buffers", current)):
+            lat = time_call(fn, args.iters)
+            rows.append([label, path, traced_peak_kib(fn), lat["p50_ms"], lat["p99_ms"]])
+    print_table(["input", "max_embedding_diff", "check"], checks)
+    print()
+    print_table(["input", "path", "peak_kib_per_call", "p50_ms", "p99_ms"], rows)
+    if any(row[-1] != "ok" for row in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Eager vs compiled (TorchScript trace + freeze) encoder latency, p50/p99 per modality and batch size.
+Run from repository root: python -m palm_biometric_engine.benchmark.bench_compile
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from ..config import ROI_PALMPRINT_SIZE, ROI_VEIN_SIZE, EMBEDDING_DIM_PALMPRINT, EMBEDDING_DIM_VEIN, EMBEDDING_DIM_GEOMETRY
+from ..encoders import (
+    encode_palmprint_batch, load_palmprint_encoder,
+    encode_vein_batch, load_vein_encoder,
+    encode_geometry_batch, load_geometry_encoder,
+)
+from ..fusion.fusion import fuse_modalities_batch, load_fusion_model
+from ..inference.compile import compiled_models
+from ._common import print_table, time_call
+
+
+def _load_all(device: str, compiled: bool, batch_sizes) -> None:
+    opts = dict(compiled=compiled, warmup_batch_sizes=batch_sizes)
+    load_palmprint_encoder(device=device, dim=EMBEDDING_DIM_PALMPRINT, **opts)
+    load_vein_encoder(device=device, dim=EMBEDDING_DIM_VEIN, **opts)
+    load_geometry_encoder(device=device, dim=EMBEDDING_DIM_GEOMETRY, **opts)
+    load_fusion_model(device=device, **opts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eager vs compiled palm encoder latency")
+    parser.add_argument("--iters", type=int, default=200)
+    parser.add_argument("--batch_sizes", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    w, h = ROI_PALMPRINT_SIZE
+    vw, vh = ROI_VEIN_SIZE
+    results = {}
+    for compiled in (False, True):
+        _load_all(args.device, compiled, args.batch_sizes)
+        for b in args.batch_sizes:
+            pp = list(rng.random((b, h, w, 3), dtype=np.float32))
+            v = list(rng.random((b, vh, vw, 1), dtype=np.float32))
+            g = list(rng.random((b, 128), dtype=np.float32))
+            pp_e = [e.embedding for e in encode_palmprint_batch(pp, device=args.device)]
+            v_e = [e.embedding for e in encode_vein_batch(v, device=args.device)]
+            g_e = [e.embedding for e in encode_geometry_batch(g, device=args.device)]
+            cases = {
+                "palmprint": lambda: encode_palmprint_batch(pp, device=args.device),
+                "vein": lambda: encode_vein_batch(v, device=args.device),
+                "geometry": lambda: encode_geometry_batch(g, device=args.device),
+                "fusion": lambda: fuse_modalities_batch(pp_e, v_e, g_e, device=args.device),
+            }
+            for modality, fn in cases.items():
+                results[(compiled, modality, b)] = time_call(fn, args.iters)
+    print(f"compile status: {compiled_models()}")
+    rows = []
+    for modality in ("palmprint", "vein", "geometry", "fusion"):
+        for b in args.batch_sizes:
+            e, c = results[(False, modality, b)], results[(True, modality, b)]
+            rows.append([modality, b, e["p50_ms"], e["p99_ms"], c["p50_ms"], c["p99_ms"], e["p50_ms"] / (c["p50_ms"] + 1e-9)])
+    print_table(["modality", "batch", "eager_p50", "eager_p99", "compiled_p50", "compiled_p99", "p50_speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
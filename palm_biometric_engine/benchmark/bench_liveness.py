@@ -0,0 +1,129 @@
+"""
+Palm liveness for a burst: check_palm_liveness per frame (all cues, no early exit) vs
+check_palm_liveness_batch over stacked (N, 128, 128, C) ROIs. Checks cue scores, fused scores
+and verdicts agree (geometry chained frame to frame), then reports latency per burst.
+Then runs the early-exit cascade on live-like, flat print, flat IR and half-flat frames: checks
+verdicts match the full evaluation, scores match wherever a pipeline would use the frame (>= 0.4),
+and every flat print skips the stages after texture; reports early exits, stages run and latency per frame.
+Run from repository root: python -m palm_biometric_engine.benchmark.bench_liveness
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..liveness import detector
+from ._common import print_table, time_call, traced_peak_kib
+
+# IR std accumulates in float32 over a different reduction shape; texture and geometry are exact
+TOLERANCE = 1e-6
+
+
+def _burst(rng: np.random.Generator, n: int):
+    """Smooth palm-like crops with varying ridge noise, vein ROIs and slowly drifting geometry."""
+    palm, vein, geometry = [], [], []
+    g = rng.random(128).astype(np.float32)
+    for i in range(n):
+        base = cv2.GaussianBlur(rng.random((128, 128, 3), dtype=np.float32), (0, 0), 4)
+        noise = rng.normal(0, 0.01 * (i % 6), base.shape).astype(np.float32)
+        palm.append(np.clip(0.5 + 0.3 * (base - 0.5) + noise, 0, 1))
+        vein.append(np.clip(rng.normal(0.5, 0.02 * (i % 7), (128, 128, 1)), 0, 1).astype(np.float32))
+        g = np.clip(g + rng.normal(0, 0.05, 128), 0, 1).astype(np.float32)
+        geometry.append(g)
+    return palm, vein, geometry
+
+
+def _per_frame(palm, vein, geometry):
+    out, prev = [], None
+    for p, v, g in zip(palm, vein, geometry):
+        r = detector._cascade.run((p, v, g, prev), early_exit=False)
+        out.append((r.cues["texture"], r.cues["ir_response"], r.cues["geometry"], r.score, r.is_live))
+        prev = g
+    return out
+
+
+def _spoofs(rng: np.random.Generator, n: int) -> dict:
+    """Frame kinds for the cascade: live-like, a flat print, a flat (no veins) IR image, a half-flat palm."""
+    palm, vein, geometry = _burst(rng, n)
+    flat_palm = [np.full_like(p, p.mean()) for p in palm]
+    flat_vein = [np.full_like(v, 0.5) for v in vein]
+    half = [np.concatenate([p[:64], np.full_like(p[64:], 0.5)]) for p in palm]
+    return {
+        "live-like": list(zip(palm, vein, geometry)),
+        "flat print": list(zip(flat_palm, vein, geometry)),
+        "flat ir": list(zip(palm, flat_vein, geometry)),
+        "half-flat palm": list(zip(half, vein, geometry)),
+    }
+
+
+def _run_cascade(frames, early_exit: bool):
+    return [detector._cascade.run((p, v, g, None), early_exit=early_exit) for p, v, g in frames]
+
+
+def _cascade_rows(rng: np.random.Generator, n: int, iters: int):
+    checks, rows = [], []
+    for kind, frames in _spoofs(rng, n).items():
+        full, fast = _run_cascade(frames, False), _run_cascade(frames, True)
+        verdicts = [f.is_live for f in full] == [c.is_live for c in fast]
+        scores = all(abs(f.score - c.score) <= TOLERANCE for f, c in zip(full, fast) if f.score >= detector._MIN_USABLE_SCORE)
+        exits = sum(bool(c.skipped) for c in fast)
+        skips = kind != "flat print" or exits == len(fast)  # the texture gate alone settles a flat print
+        stages = sum(len(c.cues) for c in fast) / len(fast)
+        checks.append([kind, f"{exits}/{len(fast)}", f"{stages:.2f}", "ok" if verdicts and scores and skips else "FAIL"])
+        for path, early_exit in (("all cues", False), ("cascade", True)):
+            lat = time_call(lambda: _run_cascade(frames, early_exit), iters)
+            rows.append([kind, path, lat["p50_ms"] / len(frames), lat["p99_ms"] / len(frames)])
+    return checks, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame vs batched palm liveness")
+    parser.add_argument("--iters", type=int, default=200)
+    parser.add_argument("--frames", type=int, nargs="+", default=[3, 5, 10])
+    parser.add_argument("--cascade-frames", type=int, default=50, help="frames per kind for the cascade rows")
+    args = parser.parse_args()
+    if cv2 is None:
+        raise SystemExit("opencv is required")
+
+    rng = np.random.default_rng(0)
+    checks, rows = [], []
+    for n in args.frames:
+        palm, vein, geometry = _burst(rng, n)
+        stacked = np.stack(palm), np.stack(vein), np.stack(geometry)
+
+        ref = _per_frame(palm, vein, geometry)
+        burst = detector.check_palm_liveness_batch(*stacked)
+        got = [(f.texture_score, f.ir_response_score, f.geometry_score, f.score, f.is_live) for f in burst.frames]
+        diff = max(abs(a - b) for r, g in zip(ref, got) for a, b in zip(r[:4], g[:4]))
+        ok = diff <= TOLERANCE and [r[4] for r in ref] == [g[4] for g in got]
+        checks.append([n, f"{diff:.2e}", sum(g[4] for g in got), f"{burst.geometry_consistency:.3f}", "ok" if ok else "FAIL"])
+
+        for path, fn in (
+            ("per-frame", lambda: _per_frame(palm, vein, geometry)),
+            ("batch", lambda: detector.check_palm_liveness_batch(*stacked)),
+        ):
+            lat = time_call(fn, args.iters)
+            rows.append([n, path, traced_peak_kib(fn), lat["p50_ms"], lat["p99_ms"]])
+
+    print_table(["frames", "max_score_diff", "live", "geometry_consistency", "check"], checks)
+    print()
+    print_table(["frames", "path", "peak_kib_per_call", "p50_ms", "p99_ms"], rows)
+    print()
+    cascade_checks, cascade_rows = _cascade_rows(rng, args.cascade_frames, max(1, args.iters // 10))
+    checks += cascade_checks
+    print_table(["frames", "early_exits", "stages_run", "check"], cascade_checks)
+    print()
+    print_table(["frames", "path", "p50_ms_per_frame", "p99_ms_per_frame"], cascade_rows)
+    print(f"cascade order: {detector.liveness_metrics()['order']}")
+    if any(row[-1] != "ok" for row in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+ROI normalization: histogram + LUT uint8 path vs the np.percentile float reference.
+Checks bit-exactness on random crops of several kinds (smooth noise, flat, two-level, full range,
+single-channel HxWx1) first and exits non-zero on any mismatch, then reports per-ROI latency.
+Run from repository root: python -m palm_biometric_engine.benchmark.bench_normalize
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from ..config import ROI_PALMPRINT_SIZE, ROI_VEIN_SIZE, NORMALIZE_PERCENTILE
+from ..preprocess.pipeline import _normalize_roi, _normalize_roi_float
+from ._common import print_table, time_call
+
+
+def _crop(kind: str, rng: np.random.Generator, shape: tuple) -> np.ndarray:
+    if kind == "normal":
+        return np.clip(rng.normal(128, rng.uniform(2, 80), shape), 0, 255).astype(np.uint8)
+    if kind == "flat":
+        return np.full(shape, rng.integers(0, 256), dtype=np.uint8)
+    if kind == "two-level":
+        lo, hi = sorted(rng.integers(0, 256, 2))
+        return np.where(rng.random(shape) < rng.uniform(0.005, 0.995), lo, hi).astype(np.uint8)
+    return rng.integers(0, 256, shape, dtype=np.uint8)  # full range
+
+
+def _check_exact(rng: np.random.Generator, kind: str, cases: int) -> int:
+    """Number of crops of one kind where the two paths differ (must be 0)."""
+    mismatches = 0
+    for i in range(cases):
+        h, w = rng.integers(8, 400, 2)
+        shape = ((h, w), (h, w, 3), (h, w, 1))[i % 3]
+        roi = _crop(kind, rng, shape)
+        size = ROI_PALMPRINT_SIZE if shape[-1] == 3 else ROI_VEIN_SIZE
+        a = _normalize_roi(roi, size, NORMALIZE_PERCENTILE)
+        b = _normalize_roi_float(roi.squeeze(-1) if roi.ndim == 3 and roi.shape[-1] == 1 else roi, size, NORMALIZE_PERCENTILE)
+        if a.dtype != b.dtype or a.shape != b.shape or not np.array_equal(a, b):
+            mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ROI normalization exactness and latency")
+    parser.add_argument("--iters", type=int, default=500)
+    parser.add_argument("--cases", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    checks = []
+    for kind in ("normal", "flat", "two-level", "full range"):
+        mismatches = _check_exact(rng, kind, args.cases)
+        checks.append([kind, f"{args.cases - mismatches}/{args.cases}", "ok" if not mismatches else "FAIL"])
+    print_table(["crops", "bit_exact", "check"], checks)
+    print()
+    if any(row[-1] != "ok" for row in checks):
+        raise SystemExit(1)
+
+    rows = []
+    for label, roi, size in (
+        ("vein 288x288 gray", (rng.random((288, 288)) * 255).astype(np.uint8), ROI_VEIN_SIZE),
+        ("palmprint 288x288 rgb", (rng.random((288, 288, 3)) * 255).astype(np.uint8), ROI_PALMPRINT_SIZE),
+    ):
+        for path, fn in (
+            ("percentile", lambda: _normalize_roi_float(roi, size, NORMALIZE_PERCENTILE)),
+            ("hist+lut", lambda: _normalize_roi(roi, size, NORMALIZE_PERCENTILE)),
+        ):
+            lat = time_call(fn, args.iters)
+            rows.append([label, path, lat["mean_ms"], lat["p50_ms"], lat["p99_ms"]])
+    print_table(["roi", "path", "mean_ms", "p50_ms", "p99_ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Time to decision: batch upload (/verify: the client captures the whole burst, base64-uploads it,
+then the server decodes and processes frames until the first accept) vs streaming (/verify/stream:
+each JPEG frame is sent when captured and processed on arrival, and the decision stops the
+capture). The client is simulated: a frame is ready every --capture-ms; the server work per frame
+is the real decode, preprocess_palm, check_palm_liveness (geometry chained to the previous frame)
+and encode_palmprint_batch. The decision
+itself needs an enrolled user, so it is fixed: frame --accept-at accepts. Checks both modes embed
+the same frames to the same vectors and that the stream stops capturing on the decision, then
+reports time to decision measured from the start of capture.
+Run from repository root: python -m palm_biometric_engine.benchmark.bench_stream
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import queue
+import threading
+import time
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..config import EMBEDDING_DIM_PALMPRINT
+from ..encoders import encode_palmprint_batch, load_palmprint_encoder
+from ..inference.metrics import LatencyRecorder
+from ..liveness.detector import check_palm_liveness
+from ..preprocess.pipeline import preprocess_palm
+from ._common import print_table
+
+
+def _process(prev: list, jpeg: bytes) -> np.ndarray:
+    """Server work for one frame: decode, preprocess, liveness chained to prev[0], encode."""
+    rgb = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+    prep = preprocess_palm(rgb, None)
+    check_palm_liveness(prep.palmprint_roi, prep.vein_roi, prep.geometry_vector, prev[0])
+    prev[0] = prep.geometry_vector
+    return encode_palmprint_batch([prep.palmprint_roi])[0].embedding
+
+
+def _capture(frames, capture_ms: float, i: int) -> bytes:
+    time.sleep(capture_ms / 1000.0)
+    return cv2.imencode(".jpg", frames[i])[1].tobytes()
+
+
+def _batch(frames, capture_ms: float, accept_at: int):
+    t0 = time.perf_counter()
+    body = [base64.b64encode(_capture(frames, capture_ms, i)).decode() for i in range(len(frames))]
+    prev, out = [None], []
+    for b64 in body:
+        out.append(_process(prev, base64.b64decode(b64)))
+        if len(out) > accept_at:
+            break
+    return out, time.perf_counter() - t0, len(body)
+
+
+def _stream(frames, capture_ms: float, accept_at: int):
+    t0 = time.perf_counter()
+    socket: queue.Queue = queue.Queue()
+    decided = threading.Event()
+    sent = []
+
+    def client():
+        for i in range(len(frames)):
+            if decided.is_set():
+                break
+            socket.put(_capture(frames, capture_ms, i))
+            sent.append(i)
+        socket.put(None)
+
+    thread = threading.Thread(target=client)
+    thread.start()
+    prev, out = [None], []
+    while (jpeg := socket.get()) is not None:
+        out.append(_process(prev, jpeg))
+        if len(out) > accept_at:
+            decided.set()
+            break
+    elapsed = time.perf_counter() - t0
+    thread.join()
+    return out, elapsed, len(sent)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch upload vs streamed frames: time to decision")
+    parser.add_argument("--iters", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=5, help="burst size of the batch upload")
+    parser.add_argument("--accept-at", type=int, nargs="+", default=[0, 2], help="0-based frame that accepts")
+    parser.add_argument("--capture-ms", type=float, default=33.0, help="client frame interval")
+    args = parser.parse_args()
+    if cv2 is None:
+        raise SystemExit("opencv is required")
+
+    load_palmprint_encoder(dim=EMBEDDING_DIM_PALMPRINT)
+    rng = np.random.default_rng(0)
+    frames = [cv2.GaussianBlur(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8), (0, 0), 3) for _ in range(args.frames)]
+    checks, rows = [], []
+    for k in args.accept_at:
+        batch, _, _ = _batch(frames, args.capture_ms, k)
+        stream, _, sent = _stream(frames, args.capture_ms, k)
+        same = len(batch) == len(stream) == k + 1 and all(np.array_equal(a, b) for a, b in zip(batch, stream))
+        stopped = sent < args.frames
+        checks.append([k, "yes" if same else "no", f"{sent}/{args.frames}", "ok" if same and stopped else "FAIL"])
+
+        p50 = {}
+        for mode, run in (("batch upload", _batch), ("stream", _stream)):
+            rec = LatencyRecorder(window=args.iters)
+            for _ in range(args.iters):
+                rec.record(run(frames, args.capture_ms, k)[1] * 1000.0)
+            lat = rec.summary()
+            p50[mode] = lat["p50_ms"]
+            rows.append([k, mode, lat["p50_ms"], lat["p99_ms"], f"{p50['batch upload'] / lat['p50_ms']:.2f}x"])
+
+    print_table(["accept_at", "same_embeddings", "frames_captured", "check"], checks)
+    print()
+    print_table(["accept_at", "mode", "p50_ms", "p99_ms", "speedup"], rows)
+    if any(row[-1] != "ok" for row in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
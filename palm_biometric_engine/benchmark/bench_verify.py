@@ -0,0 +1,104 @@
+"""
+Multi-frame verification: live samples encoded / matched / decided one after another vs raced on
+the verify pool (OrderedRace) through the micro-batching scheduler, as the pipeline does. The
+reference is the identity vector of one sample, so that sample is the first accept; checks both
+modes settle on the same frame and similarities, then reports latency with the accept at the last
+frame and with no accept at all.
+Run from repository root: python -m palm_biometric_engine.benchmark.bench_verify
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from ..config import (
+    ROI_PALMPRINT_SIZE, ROI_VEIN_SIZE, EMBEDDING_DIM_PALMPRINT, EMBEDDING_DIM_VEIN, EMBEDDING_DIM_GEOMETRY,
+    INFERENCE_BATCH_WINDOW_MS, INFERENCE_MAX_BATCH_SIZE, REJECT_THRESHOLD,
+)
+from ..decision.engine import decide
+from ..encoders import (
+    encode_palmprint_batch, load_palmprint_encoder,
+    encode_vein_batch, load_vein_encoder,
+    encode_geometry_batch, load_geometry_encoder,
+)
+from ..fusion.fusion import fuse_modalities_batch, load_fusion_model
+from ..inference.executor import OrderedRace, configure_executor
+from ..inference.scheduler import MicroBatchScheduler
+from ..matching.matcher import match_identity
+from ._common import print_table, time_call
+
+# Untrained encoders map random samples to similarities of ~0.96-0.99: accept only the reference itself
+ACCEPT = 0.999
+
+
+def _encode_batch(samples):
+    pp = [e.embedding for e in encode_palmprint_batch([s[0] for s in samples])]
+    v = [e.embedding for e in encode_vein_batch([s[1] for s in samples])]
+    g = [e.embedding for e in encode_geometry_batch([s[2] for s in samples])]
+    return fuse_modalities_batch(pp, v, g)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs concurrent multi-frame palm verification")
+    parser.add_argument("--iters", type=int, default=30)
+    parser.add_argument("--frames", type=int, nargs="+", default=[3, 5, 10])
+    parser.add_argument("--workers", type=int, default=None, help="verify pool size (default min(4, cpus))")
+    args = parser.parse_args()
+
+    load_palmprint_encoder(dim=EMBEDDING_DIM_PALMPRINT)
+    load_vein_encoder(dim=EMBEDDING_DIM_VEIN)
+    load_geometry_encoder(dim=EMBEDDING_DIM_GEOMETRY)
+    load_fusion_model()
+    configure_executor(verify_workers=args.workers)
+    scheduler = MicroBatchScheduler(
+        _encode_batch, max_batch_size=INFERENCE_MAX_BATCH_SIZE, max_wait_ms=INFERENCE_BATCH_WINDOW_MS, name="bench-encoders",
+    )
+    scheduler.start()
+    rng = np.random.default_rng(0)
+    w, h = ROI_PALMPRINT_SIZE
+    vw, vh = ROI_VEIN_SIZE
+    checks, rows = [], []
+    try:
+        for n in args.frames:
+            samples = [
+                (rng.random((h, w, 3), dtype=np.float32), rng.random((vh, vw, 1), dtype=np.float32), rng.random(128, dtype=np.float32))
+                for _ in range(n)
+            ]
+            ref = scheduler.run(samples[-1]).vector
+
+            def verify_frame(item, ref=ref):
+                i, sample = item
+                mr = match_identity(scheduler.run(sample).vector, ref, threshold=ACCEPT)
+                return i, mr.score, decide(mr.score, 1.0, ACCEPT, REJECT_THRESHOLD).decision
+
+            def run(concurrent: bool, accept: bool = True):
+                race = OrderedRace(verify_frame, lambda r: accept and r[2] == "accept", concurrent=concurrent)
+                with race:
+                    for item in enumerate(samples):
+                        if not race.submit(item):
+                            break
+                    return race.finish()
+
+            seq, par = run(False), run(True)
+            same = [r[0] for r in seq] == [r[0] for r in par] and [r[2] for r in seq] == [r[2] for r in par]
+            diff = max(abs(a[1] - b[1]) for a, b in zip(seq, par))
+            ok = same and diff <= 1e-5 and seq[-1][0] == n - 1 and seq[-1][2] == "accept"
+            checks.append([n, seq[-1][0], seq[-1][2], f"{diff:.2e}", "ok" if ok else "FAIL"])
+
+            for case, accept in (("accept at last frame", True), ("no accept", False)):
+                for mode, concurrent in (("sequential", False), ("concurrent", True)):
+                    lat = time_call(lambda: run(concurrent, accept), args.iters, warmup=3)
+                    rows.append([n, case, mode, lat["p50_ms"], lat["p99_ms"]])
+    finally:
+        scheduler.stop()
+
+    print_table(["frames", "settled_frame", "decision", "max_similarity_diff", "check"], checks)
+    print()
+    print_table(["frames", "case", "mode", "p50_ms", "p99_ms"], rows)
+    if any(row[-1] != "ok" for row in checks):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
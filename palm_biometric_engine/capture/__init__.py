@@ -1,6 +1,18 @@
 """
 Multi-modal palm capture: RGB (palmprint), IR (vein), optional depth/ultrasound.
+Devices (or replay files) are opened once per process and grabbed on background threads.
 """
-from .multimodal_capture import capture_palm_frames, PalmCaptureResult, get_capture_backend
+from .multimodal_capture import capture_palm_frames, capture_metrics, PalmCaptureResult, get_capture_backend
+from .session import CaptureSession, Frame, get_capture_session, close_capture_sessions, capture_session_metrics
 
-__all__ = ["capture_palm_frames", "PalmCaptureResult", "get_capture_backend"]
+__all__ = [
+    "capture_palm_frames",
+    "PalmCaptureResult",
+    "get_capture_backend",
+    "capture_metrics",
+    "CaptureSession",
+    "Frame",
+    "get_capture_session",
+    "close_capture_sessions",
+    "capture_session_metrics",
+]
@@ -1,11 +1,16 @@
 """
 Edge device capture: RGB palmprint, IR palm vein, optional depth/ultrasound.
 Stubs for real hardware; fallbacks for dev (single camera / synthetic IR).
+With CAPTURE_SYNC the sources are grabbed in parallel and IR / depth are paired with the RGB frame
+by capture time (within CAPTURE_SYNC_TOLERANCE_MS); synthetic IR is computed on the preprocess pool.
 """
 from __future__ import annotations
 
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple, Union
 
 import numpy as np
 
@@ -18,7 +23,15 @@ from ..config import (
     CAPTURE_RGB_RESOLUTION,
     CAPTURE_IR_RESOLUTION,
     CAPTURE_DEPTH_AVAILABLE,
+    CAPTURE_SESSION,
+    CAPTURE_REPLAY_RGB_PATH,
+    CAPTURE_REPLAY_IR_PATH,
+    CAPTURE_SYNC,
+    CAPTURE_SYNC_TOLERANCE_MS,
 )
+from ..inference.executor import get_executor
+from ..inference.metrics import LatencyRecorder
+from .session import get_capture_session
 
 
 @dataclass
@@ -27,27 +40,54 @@ class PalmCaptureResult:
     rgb: Optional[np.ndarray] = None      # HxWx3 BGR/RGB palmprint
     ir: Optional[np.ndarray] = None       # HxW IR for vein
     depth: Optional[np.ndarray] = None    # HxW depth if sensor available
-    timestamp: float = 0.0
+    timestamp: float = 0.0                # RGB capture time
     source: str = "camera"
+    skew_ms: float = 0.0                  # largest |t - t_rgb| of the IR / depth frames paired with it
+    ir_synthetic: bool = False            # IR derived from RGB (no IR frame within tolerance)
 
 
 _capture_backend = "opencv"  # or "realsense", "tof", "synthetic"
 
 
-def _try_rgb_camera() -> Optional[np.ndarray]:
-    """Capture one RGB frame. Prefer back camera for palm (user facing)."""
-    if cv2 is None:
-        return None
-    cap = cv2.VideoCapture(0)
+Grab = Tuple[Optional[np.ndarray], float]  # frame (None if unavailable), capture time
+
+
+def _read_device(source: Union[int, str], near: Optional[float] = None) -> Grab:
+    """
+    One frame from a camera index or replay path. With CAPTURE_SESSION: the next unread frame of
+    the process-wide session (view into its ring buffer; device opened once), or with near the
+    buffered frame grabbed closest to that time, within CAPTURE_SYNC_TOLERANCE_MS. Else open,
+    read, release (near is not supported).
+    """
+    if CAPTURE_SESSION:
+        session = get_capture_session(source)
+        if session is None:
+            return None, time.time()
+        if near is None:
+            frame = session.read()
+        else:
+            frame = session.read_nearest(near, CAPTURE_SYNC_TOLERANCE_MS / 1000.0)
+        return (frame.image, frame.timestamp) if frame is not None else (None, time.time())
+    if near is not None:
+        return None, time.time()
+    cap = cv2.VideoCapture(source)
     if not cap.isOpened():
-        return None
+        return None, time.time()
     ret, frame = cap.read()
     cap.release()
-    if not ret or frame is None:
-        return None
+    return (frame if ret else None), time.time()
+
+
+def _try_rgb_camera() -> Grab:
+    """Capture one RGB frame. Prefer back camera for palm (user facing)."""
+    if cv2 is None:
+        return None, time.time()
+    frame, ts = _read_device(CAPTURE_REPLAY_RGB_PATH or 0)
+    if frame is None:
+        return None, ts
     if (frame.shape[1], frame.shape[0]) != CAPTURE_RGB_RESOLUTION:
         frame = cv2.resize(frame, CAPTURE_RGB_RESOLUTION)
-    return frame
+    return frame, ts
 
 
 def _synthetic_ir_from_rgb(rgb: np.ndarray) -> np.ndarray:
@@ -63,21 +103,17 @@ def _synthetic_ir_from_rgb(rgb: np.ndarray) -> np.ndarray:
     return np.expand_dims(ir, axis=-1)
 
 
-def _try_ir_sensor() -> Optional[np.ndarray]:
-    """Try dedicated IR camera (e.g. second device). Returns None if not available."""
+def _try_ir_sensor(near: Optional[float] = None) -> Grab:
+    """Try dedicated IR camera (e.g. second device); frame None if not available. near: see _read_device."""
     if cv2 is None:
-        return None
-    cap = cv2.VideoCapture(1)  # often IR on multi-camera setups
-    if not cap.isOpened():
-        return None
-    ret, frame = cap.read()
-    cap.release()
-    if not ret or frame is None:
-        return None
+        return None, time.time()
+    frame, ts = _read_device(CAPTURE_REPLAY_IR_PATH or 1, near)  # device 1: often IR on multi-camera setups
+    if frame is None:
+        return None, ts
     if frame.ndim == 3:
         frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     frame = cv2.resize(frame, CAPTURE_IR_RESOLUTION)
-    return np.expand_dims(frame, axis=-1)
+    return np.expand_dims(frame, axis=-1), ts
 
 
 def _try_depth_sensor() -> Optional[np.ndarray]:
@@ -85,31 +121,137 @@ def _try_depth_sensor() -> Optional[np.ndarray]:
     return None
 
 
+def _grab_depth() -> Grab:
+    return _try_depth_sensor(), time.time()
+
+
+_SOURCES = ("rgb", "ir", "depth", "synthetic_ir", "frame", "burst")
+_latency: Dict[str, LatencyRecorder] = {name: LatencyRecorder() for name in _SOURCES}
+_skew = LatencyRecorder()  # ms between the RGB frame and the IR / depth frames paired with it
+_counts = {"frames": 0, "ir_sensor": 0, "ir_repaired": 0, "ir_dropped": 0, "ir_synthetic": 0, "depth_dropped": 0}
+_counts_lock = threading.Lock()
+_grab_pool: Optional[ThreadPoolExecutor] = None
+_grab_pool_lock = threading.Lock()
+
+
+def _count(**deltas: int) -> None:
+    with _counts_lock:
+        for key, n in deltas.items():
+            _counts[key] += n
+
+
+def _timed(name: str, fn: Callable, *args):
+    with _latency[name].time():
+        return fn(*args)
+
+
+def _get_grab_pool() -> ThreadPoolExecutor:
+    """Threads that block on the devices (one per source), kept apart from the CPU pools."""
+    global _grab_pool
+    if _grab_pool is None:
+        with _grab_pool_lock:
+            if _grab_pool is None:
+                _grab_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="palm-capture")
+    return _grab_pool
+
+
+def _capture_one(sync: bool, copy_rgb: bool) -> Tuple[PalmCaptureResult, Optional[Future]]:
+    """
+    One multi-modal frame. IR grabbed more than the tolerance away from the RGB frame is re-paired
+    from the IR session buffer; if the re-paired frame is still out of tolerance, it is dropped and
+    the frame falls back to synthetic IR. Depth more than the tolerance away is dropped. Returns the
+    result and, when IR falls back to synthetic, the pending synthetic IR (sync mode; computed inline
+    otherwise).
+    """
+    t0 = time.perf_counter()
+    if sync:
+        pool = _get_grab_pool()
+        ir_f = pool.submit(_timed, "ir", _try_ir_sensor)
+        depth_f = pool.submit(_timed, "depth", _grab_depth) if CAPTURE_DEPTH_AVAILABLE else None
+        rgb, ts = _timed("rgb", _try_rgb_camera)
+        ir, ir_ts = ir_f.result()
+        depth, depth_ts = depth_f.result() if depth_f is not None else (None, ts)
+    else:
+        rgb, ts = _timed("rgb", _try_rgb_camera)
+        ir, ir_ts = _timed("ir", _try_ir_sensor)
+        depth, depth_ts = _timed("depth", _grab_depth) if CAPTURE_DEPTH_AVAILABLE else (None, ts)
+    if rgb is not None and copy_rgb:
+        rgb = rgb.copy()  # a session slot is reused once the next frame has been read
+
+    tolerance = CAPTURE_SYNC_TOLERANCE_MS / 1000.0
+    skews = []
+    if ir is not None and rgb is not None and abs(ir_ts - ts) > tolerance:
+        ir, ir_ts = _try_ir_sensor(near=ts)
+        if ir is not None and abs(ir_ts - ts) > tolerance:
+            ir = None
+            _count(ir_dropped=1)
+        else:
+            _count(ir_repaired=int(ir is not None))
+    if ir is not None:
+        skews.append(abs(ir_ts - ts))
+        _count(ir_sensor=1)
+    if depth is not None and rgb is not None and abs(depth_ts - ts) > tolerance:
+        depth = None
+        _count(depth_dropped=1)
+    if depth is not None:
+        skews.append(abs(depth_ts - ts))
+    skew_ms = 1000.0 * max(skews, default=0.0)
+    _skew.record(skew_ms)
+
+    pending = None
+    synthetic = ir is None and rgb is not None
+    if synthetic:
+        _count(ir_synthetic=1)
+        if sync:
+            pending = get_executor().submit(_timed, "synthetic_ir", _synthetic_ir_from_rgb, rgb)
+        else:
+            ir = _timed("synthetic_ir", _synthetic_ir_from_rgb, rgb)
+    _count(frames=1)
+    _latency["frame"].record((time.perf_counter() - t0) * 1000.0)
+    result = PalmCaptureResult(
+        rgb=rgb,
+        ir=ir,
+        depth=depth,
+        timestamp=ts,
+        source=_capture_backend,
+        skew_ms=skew_ms,
+        ir_synthetic=synthetic,
+    )
+    return result, pending
+
+
 def capture_palm_frames(
     num_frames: int = 1,
     require_ir: bool = False,
+    sync: bool = CAPTURE_SYNC,
 ) -> list[PalmCaptureResult]:
     """
     Capture one or more multi-modal palm frames.
     RGB always attempted; IR from sensor or synthetic from RGB; depth if configured.
+    With sync, sources are grabbed in parallel and synthetic IR overlaps the following grabs.
     """
-    results = []
-    for _ in range(num_frames):
-        rgb = _try_rgb_camera()
-        ir = _try_ir_sensor()
-        if ir is None and rgb is not None:
-            ir = _synthetic_ir_from_rgb(rgb)
-        depth = _try_depth_sensor() if CAPTURE_DEPTH_AVAILABLE else None
-        import time
-        results.append(PalmCaptureResult(
-            rgb=rgb,
-            ir=ir,
-            depth=depth,
-            timestamp=time.time(),
-            source=_capture_backend,
-        ))
-    return results
+    t0 = time.perf_counter()
+    copy_rgb = CAPTURE_SESSION and num_frames > 1
+    frames = [_capture_one(sync, copy_rgb) for _ in range(num_frames)]
+    for result, pending in frames:
+        if pending is not None:
+            result.ir = pending.result()
+    _latency["burst"].record((time.perf_counter() - t0) * 1000.0)
+    return [result for result, _ in frames]
 
 
 def get_capture_backend() -> str:
     return _capture_backend
+
+
+def capture_metrics() -> dict:
+    """Per-source grab latency, per-frame ("frame") and per-call ("burst") latency, pairing counts."""
+    with _counts_lock:
+        counts = dict(_counts)
+    return {
+        "mode": "sync" if CAPTURE_SYNC else "sequential",
+        "tolerance_ms": CAPTURE_SYNC_TOLERANCE_MS,
+        "latency": {name: rec.summary() for name, rec in _latency.items()},
+        "skew": _skew.summary(),
+        **counts,
+    }
@@ -0,0 +1,264 @@
+"""
+Persistent capture sessions. The device (camera index) or a replay file (video, or an image
+sequence pattern such as "frames/%04d.png") is opened once; a background thread grabs frames
+continuously into a preallocated ring of `slots` frames, and readers get a view of the newest
+slot (no copy). The slot last handed out is skipped by the grab thread, so a frame stays valid
+until the next read() on its session; copy it to keep it longer. read_nearest() pairs a frame
+with another stream by grab time, from the frames still in the ring.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Union
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..config import CAPTURE_FPS, CAPTURE_RING_SLOTS
+from ..inference.metrics import LatencyRecorder
+
+
+class Frame(NamedTuple):
+    image: np.ndarray  # HxWx3 BGR view into the ring buffer
+    timestamp: float  # wall clock when the grab completed
+    seq: int  # 1-based grab counter of the session
+
+
+class CaptureSession:
+    """
+    One opened source and its grab thread. Replay files are paced to their own frame rate
+    (CAPTURE_FPS if unknown) when realtime, and rewound at the end when loop.
+    """
+
+    def __init__(
+        self,
+        source: Union[int, str],
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        slots: int = CAPTURE_RING_SLOTS,
+        realtime: bool = True,
+        loop: bool = True,
+    ):
+        if slots < 3:
+            raise ValueError("slots must be >= 3")
+        self.source = source
+        self.replay = isinstance(source, str)
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.realtime = realtime
+        self.loop = loop
+        self.error: Optional[str] = None
+        self._cap = None
+        self._ring: Optional[np.ndarray] = None  # (slots, H, W, 3) uint8, allocated on the first frame
+        self._slot = -1
+        self._pinned = -1
+        self._stamps = np.full(slots, -np.inf)  # grab time per slot; -inf = empty or being written
+        self._seqs = np.zeros(slots, dtype=np.int64)
+        self._seq = 0
+        self._handed = 0
+        self._timestamp = 0.0
+        self._dropped = 0
+        self._interval = 0.0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._grab = LatencyRecorder()
+
+    def open(self) -> bool:
+        """Open the source and grab the first frame (sizes the ring). False with .error set on failure."""
+        if self._cap is not None:
+            return True
+        if cv2 is None:
+            self.error = "opencv not available"
+            return False
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            self.error = f"cannot open capture source {self.source!r}"
+            return False
+        if not self.replay and self.width and self.height:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        ok, first = cap.read()
+        if not ok or first is None:
+            cap.release()
+            self.error = f"no frames from capture source {self.source!r}"
+            return False
+        if self.replay and self.realtime:
+            self._interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or CAPTURE_FPS)
+        self._ring = np.empty((self.slots, *first.shape), dtype=first.dtype)
+        self._ring[0] = first
+        self._cap = cap
+        self.error = None
+        self._publish(0)
+        return True
+
+    def start(self) -> "CaptureSession":
+        """Open (if needed) and start the grab thread; check .running for success."""
+        if self._thread is None and self.open():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"capture-{self.source}", daemon=True)
+            self._thread.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _read_into(self, slot: int) -> bool:
+        buf = self._ring[slot]
+        ok, img = self._cap.read(image=buf)
+        if not ok and self.replay and self.loop:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, img = self._cap.read(image=buf)
+        if not ok or img is None:
+            return False
+        if img is not buf and not np.shares_memory(img, buf):
+            buf[...] = img  # backend reallocated (e.g. converted format); same shape expected
+        return True
+
+    def _run(self) -> None:
+        slot = self._slot
+        next_t = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                with self._cond:
+                    slot = (slot + 1) % self.slots
+                    if slot == self._pinned:
+                        slot = (slot + 1) % self.slots
+                    self._stamps[slot] = -np.inf
+                t0 = time.perf_counter()
+                if not self._read_into(slot):
+                    self.error = f"capture source {self.source!r} stopped delivering frames"
+                    break
+                self._grab.record((time.perf_counter() - t0) * 1000.0)
+                self._publish(slot)
+                if self._interval:
+                    next_t += self._interval
+                    delay = next_t - time.perf_counter()
+                    if delay > 0:
+                        self._stop.wait(delay)
+                    else:
+                        next_t = time.perf_counter()
+        except (cv2.error, ValueError) as e:
+            self.error = str(e)
+        finally:
+            with self._cond:
+                self._cond.notify_all()
+
+    def _publish(self, slot: int) -> None:
+        with self._cond:
+            if self._seq > self._handed:
+                self._dropped += 1  # previous frame was never handed out
+            self._slot = slot
+            self._seq += 1
+            self._timestamp = time.time()
+            self._stamps[slot] = self._timestamp
+            self._seqs[slot] = self._seq
+            self._cond.notify_all()
+
+    def read(self, fresh: bool = True, timeout: float = 1.0) -> Optional[Frame]:
+        """
+        Newest frame (view into the ring). With fresh, wait up to timeout seconds for a frame not
+        handed out before, so consecutive reads return distinct frames. None if there is none.
+        """
+        with self._cond:
+            if fresh:
+                self._cond.wait_for(lambda: self._seq > self._handed or not self.running, timeout)
+                if self._seq <= self._handed:
+                    return None
+            if self._slot < 0:
+                return None
+            self._handed = self._seq
+            self._pinned = self._slot
+            return Frame(self._ring[self._slot], self._timestamp, self._seq)
+
+    def read_nearest(self, timestamp: float, tolerance: float, timeout: Optional[float] = None) -> Optional[Frame]:
+        """
+        Buffered frame grabbed closest to timestamp, if within tolerance seconds. Waits up to timeout
+        (default tolerance) for a frame at or after timestamp first. Pins the frame like read().
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._timestamp >= timestamp or not self.running,
+                tolerance if timeout is None else timeout,
+            )
+            if self._slot < 0:
+                return None
+            k = int(np.argmin(np.abs(self._stamps - timestamp)))
+            if not abs(self._stamps[k] - timestamp) <= tolerance:
+                return None
+            self._handed = max(self._handed, int(self._seqs[k]))
+            self._pinned = k
+            return Frame(self._ring[k], float(self._stamps[k]), int(self._seqs[k]))
+
+    def stop(self) -> None:
+        """Stop the grab thread and release the source (the session can be started again)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self._slot = self._pinned = -1
+        self._stamps[:] = -np.inf
+
+    def __enter__(self) -> "CaptureSession":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def metrics(self) -> dict:
+        return {
+            "source": str(self.source),
+            "running": self.running,
+            "slots": self.slots,
+            "frames": self._seq,
+            "last_read_seq": self._handed,
+            "dropped": self._dropped,  # grabbed frames superseded before any read
+            "grab": self._grab.summary(),
+            "error": self.error,
+        }
+
+
+_sessions: Dict[Union[int, str], Optional[CaptureSession]] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_capture_session(
+    source: Union[int, str] = 0,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+) -> Optional[CaptureSession]:
+    """
+    Process-wide session for a source, opened and started on first use. None if the source could
+    not be opened; the failure is remembered until close_capture_sessions().
+    """
+    with _sessions_lock:
+        if source not in _sessions:
+            session = CaptureSession(source, width, height).start()
+            _sessions[source] = session if session.running else None
+        return _sessions[source]
+
+
+def close_capture_sessions() -> None:
+    """Stop and release all process-wide sessions."""
+    with _sessions_lock:
+        sessions = [s for s in _sessions.values() if s is not None]
+        _sessions.clear()
+    for session in sessions:
+        session.stop()
+
+
+def capture_session_metrics() -> dict:
+    with _sessions_lock:
+        items = list(_sessions.items())
+    return {str(source): (s.metrics() if s is not None else {"running": False}) for source, s in items}
@@ -16,6 +16,13 @@ TRAINING_DIR = DATA_DIR / "training"
 CAPTURE_RGB_RESOLUTION = (640, 480)
 CAPTURE_IR_RESOLUTION = (320, 240)
 CAPTURE_DEPTH_AVAILABLE = False  # set True when depth/ultrasound sensor present
+CAPTURE_FPS = 30                  # replay pacing for files without a frame rate
+CAPTURE_SESSION = True            # keep RGB/IR devices open; a background thread grabs into a ring buffer
+CAPTURE_RING_SLOTS = 4            # preallocated frames (>= 3); the frame last handed out is not overwritten before the next read
+CAPTURE_REPLAY_RGB_PATH: Optional[str] = None  # video / image sequence replayed instead of RGB device 0
+CAPTURE_REPLAY_IR_PATH: Optional[str] = None   # replayed instead of IR device 1
+CAPTURE_SYNC = True               # grab RGB / IR / depth in parallel and pair them by capture time
+CAPTURE_SYNC_TOLERANCE_MS = 20.0  # max |t - t_rgb| of a paired IR / depth frame; else IR is re-paired or synthesized, depth dropped
 PREFER_IR_FOR_VEIN = True
 
 # Preprocessing
@@ -25,7 +32,23 @@ NOISE_REDUCTION_KERNEL = (5, 5)   # Gaussian/blur
 SEGMENTATION_CONFIDENCE = 0.5      # palm detector threshold
 NORMALIZE_PERCENTILE = (2, 98)    # clip for contrast
 
+# Frame quality gate (thumbnail measures before detection / liveness / embedding)
+QUALITY_GATE = True
+QUALITY_THUMB_WIDTH = 160         # measures are taken on a grayscale thumbnail of this width
+QUALITY_MIN_SHARPNESS = 15.0      # Laplacian variance on the thumbnail; below = blurry
+QUALITY_EXPOSURE_RANGE = (40.0, 220.0)  # acceptable mean luma
+QUALITY_MAX_CLIPPED = 0.25        # max fraction of thumbnail pixels <= 5 or >= 250
+QUALITY_MAX_MOTION_ANISOTROPY = 0.85  # gradient structure-tensor anisotropy above = motion blur
+QUALITY_MIN_FRAME_SIDE = 240      # px, short side of the input frame
+QUALITY_MIN_REGION_FRACTION = 0.02  # min detected palm bbox area as a fraction of the frame
+
+# Near-duplicate frame elimination (multi-frame API requests)
+DEDUP_FRAMES = True
+DEDUP_MAX_HAMMING = 4             # 64-bit dHash distance at or below which consecutive frames are duplicates
+DEDUP_MIN_FRAMES = 3              # never keep fewer frames than this (liveness needs several)
+
 # Liveness
+LIVENESS_CASCADE = True           # texture gate first; skip the rest once a frame is certainly rejected
 LIVENESS_TEXTURE_MIN = 0.3        # Laplacian variance (flat = spoof)
 LIVENESS_IR_RESPONSE_MIN = 0.2   # IR must show vein-like structure
 LIVENESS_GEOMETRY_CONSISTENCY = 0.6  # shape stability across frames
@@ -34,9 +57,27 @@ LIVENESS_GEOMETRY_CONSISTENCY = 0.6  # shape stability across frames
 EMBEDDING_DIM_PALMPRINT = 256
 EMBEDDING_DIM_VEIN = 256
 EMBEDDING_DIM_GEOMETRY = 128
+GEOMETRY_FEATURE_VERSION = 2      # geometry vector layout: 1 = bbox stats only, 2 = + contour features (slots 6+); bump on any change
 IDENTITY_DIM = 512                # fused identity vector size
 DEVICE = "cpu"                    # cuda | cpu | mps
 
+# Inference scheduling (micro-batching of concurrent requests)
+INFERENCE_BATCHING = True
+INFERENCE_BATCH_WINDOW_MS = 5.0   # max time the first queued sample waits for a batch to fill
+INFERENCE_MAX_BATCH_SIZE = 16
+COMPILE_MODELS = False            # TorchScript trace + freeze at init_pipeline(); eager on failure
+COMPILE_WARMUP_BATCH_SIZES = (1, 2, 4, 8, INFERENCE_MAX_BATCH_SIZE)
+EMBEDDING_CACHE_SIZE = 0          # per-encoder LRU keyed by input digest + model version (0 = off); never persisted
+
+# CPU thread budget: cores are split across API workers, then across torch / OpenCV / BLAS
+CPU_THREAD_BUDGET: Optional[int] = None  # total cores to use; None = os.cpu_count()
+THREAD_SPLIT = {"torch": 0.5, "opencv": 0.25, "blas": 0.25}  # fractions of each worker's share
+PREPROCESS_WORKERS: Optional[int] = None  # shared pool preprocessing burst frames in parallel; None = min(4, cpus)
+CONCURRENT_VERIFICATION = True  # live frames embed / match / decide in parallel; the first accept (by frame index) cancels later frames
+VERIFY_WORKERS: Optional[int] = None  # bounded pool for concurrent per-frame verification; None = min(4, cpus)
+PIPELINED_CAPTURE = True  # camera runs: capture, preprocess + liveness and inference overlap on stage threads
+STAGE_QUEUE_SIZE = 1  # frames waiting between two stages; a full queue blocks the stage feeding it
+
 # Fusion
 FUSION_TYPE = "attention"         # "late_fusion" | "attention"
 FUSION_WEIGHTS = {
@@ -75,6 +116,10 @@ TOKEN_MAX_AGE_SEC = 300           # for future blockchain/smart-contract binding
 # API (authentication requests; blockchain-ready)
 API_HOST = "0.0.0.0"
 API_PORT = 8010
+API_WORKERS = 1                   # uvicorn worker processes; shares CPU_THREAD_BUDGET
 ENROLLMENT_MIN_SAMPLES = 3
 INFERENCE_TIMEOUT_SEC = 1.0       # real-time <1s
 RESPONSE_INCLUDE_HASH = True      # for smart-contract verification
+STREAM_MAX_FRAMES = 15            # /verify/stream: frames processed before deciding with the best one
+STREAM_REJECT_AFTER = 3           # consecutive per-frame reject decisions that end a stream early (0 = never)
+STREAM_TIMEOUT_SEC = 5.0          # /verify/stream time budget from connect to decision
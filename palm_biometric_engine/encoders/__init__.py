@@ -2,14 +2,14 @@
 Separate encoders: palmprint, palm vein, hand geometry.
 Output fixed-size embeddings for fusion.
 """
-from .palmprint_encoder import encode_palmprint, load_palmprint_encoder
-from .vein_encoder import encode_vein, load_vein_encoder
-from .geometry_encoder import encode_geometry, load_geometry_encoder
+from .palmprint_encoder import encode_palmprint, encode_palmprint_batch, load_palmprint_encoder
+from .vein_encoder import encode_vein, encode_vein_batch, load_vein_encoder
+from .geometry_encoder import encode_geometry, encode_geometry_batch, load_geometry_encoder
 from .types import PalmprintEmbedding, VeinEmbedding, GeometryEmbedding
 
 __all__ = [
-    "encode_palmprint", "load_palmprint_encoder",
-    "encode_vein", "load_vein_encoder",
-    "encode_geometry", "load_geometry_encoder",
+    "encode_palmprint", "encode_palmprint_batch", "load_palmprint_encoder",
+    "encode_vein", "encode_vein_batch", "load_vein_encoder",
+    "encode_geometry", "encode_geometry_batch", "load_geometry_encoder",
     "PalmprintEmbedding", "VeinEmbedding", "GeometryEmbedding",
 ]
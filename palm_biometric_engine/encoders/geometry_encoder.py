@@ -3,6 +3,8 @@ Hand geometry encoder: shape, size, finger spacing -> 128-d.
 """
 from __future__ import annotations
 
+from typing import List, Sequence
+
 import numpy as np
 from ..config import EMBEDDING_DIM_GEOMETRY, DEVICE
 from .types import GeometryEmbedding
@@ -14,7 +16,14 @@ except ImportError:
     torch = None
     nn = None
 
+from ..inference.buffers import BufferPool
+from ..inference.cache import EmbeddingCache
+from ..inference.compile import compile_module
+
 _GEOMETRY_MODEL = None
+_MODEL_VERSION = ""
+_INPUT_BUFFERS = BufferPool()
+_CACHE = EmbeddingCache()
 
 
 def _placeholder_emb(x: np.ndarray, dim: int) -> np.ndarray:
@@ -39,30 +48,71 @@ class _GeometryMLP(nn.Module if nn else object):
         return x / (x.norm(dim=1, keepdim=True) + 1e-8)
 
 
-def load_geometry_encoder(device: str = "cpu", dim: int = 128) -> None:
-    global _GEOMETRY_MODEL
+def load_geometry_encoder(
+    device: str = "cpu",
+    dim: int = 128,
+    compiled: bool = False,
+    warmup_batch_sizes: Sequence[int] = (1,),
+    cache_size: int = 0,
+) -> None:
+    """
+    compiled: trace + freeze and warm for warmup_batch_sizes; eager if that fails.
+    cache_size: entries in the in-memory input-digest -> embedding LRU (0 disables).
+    """
+    global _GEOMETRY_MODEL, _MODEL_VERSION
+    _CACHE.resize(cache_size)
+    _MODEL_VERSION = f"geometry:{dim}:{'compiled' if compiled else 'eager'}"
     if torch is not None and nn is not None:
         _GEOMETRY_MODEL = _GeometryMLP(in_dim=128, out_dim=dim)
         _GEOMETRY_MODEL.eval()
         _GEOMETRY_MODEL.to(device)
+        if compiled:
+            _GEOMETRY_MODEL = compile_module(
+                _GEOMETRY_MODEL,
+                lambda b: (torch.rand(b, 128, device=device),),
+                warmup_batch_sizes,
+                name="geometry",
+            )
     else:
         _GEOMETRY_MODEL = None
 
 
-def encode_geometry(geometry_vector: np.ndarray, device: str = "cpu") -> GeometryEmbedding:
-    """Geometry feature vector -> 128-d normalized embedding."""
+def _to_model_input(geometry_vector: np.ndarray) -> np.ndarray:
+    """Pad/trim geometry features to a 128-d float32 vector."""
     if geometry_vector.size < 128:
         pad = np.zeros(128, dtype=np.float32)
         pad[: geometry_vector.size] = geometry_vector.ravel()
-        geometry_vector = pad
-    else:
-        geometry_vector = geometry_vector.ravel()[:128].astype(np.float32)
-    x = geometry_vector[np.newaxis, ...]
+        return pad
+    return geometry_vector.ravel()[:128].astype(np.float32)
+
+
+def _forward_batch(device: str, geometry_vectors: List[np.ndarray]) -> List[np.ndarray]:
+    """One forward pass; rows are views of the fresh output (no per-sample copies)."""
     if torch is not None and _GEOMETRY_MODEL is not None:
-        t = torch.from_numpy(x).float().to(device)
+        # Vectors are padded/trimmed in place in this thread's reusable buffer
+        x, t = _INPUT_BUFFERS.get("geometry", len(geometry_vectors), (128,), device)
+        for slot, g in zip(x, geometry_vectors):
+            flat = g.ravel()[:128]
+            slot[: flat.size] = flat
+            slot[flat.size:] = 0.0
         with torch.no_grad():
-            emb = _GEOMETRY_MODEL(t).cpu().numpy().squeeze()
-        emb = emb.astype(np.float32)
-    else:
-        emb = _placeholder_emb(geometry_vector, EMBEDDING_DIM_GEOMETRY)
-    return GeometryEmbedding(embedding=emb, dim=emb.shape[0])
+            return list(_GEOMETRY_MODEL(t.to(device, non_blocking=True)).cpu().numpy())
+    return [_placeholder_emb(_to_model_input(g), EMBEDDING_DIM_GEOMETRY) for g in geometry_vectors]
+
+
+def cache_metrics() -> dict:
+    """Memo cache hit rate and size."""
+    return _CACHE.metrics()
+
+
+def encode_geometry_batch(geometry_vectors: Sequence[np.ndarray], device: str = "cpu") -> List[GeometryEmbedding]:
+    """Batched encode_geometry: one forward pass for all vectors not in the memo cache, results in input order."""
+    if not geometry_vectors:
+        return []
+    embs = _CACHE.map(geometry_vectors, _MODEL_VERSION, lambda items: _forward_batch(device, items))
+    return [GeometryEmbedding(embedding=e, dim=e.shape[0]) for e in embs]
+
+
+def encode_geometry(geometry_vector: np.ndarray, device: str = "cpu") -> GeometryEmbedding:
+    """Geometry feature vector -> 128-d normalized embedding."""
+    return encode_geometry_batch([geometry_vector], device=device)[0]
@@ -4,6 +4,8 @@ Output 256-d embedding for matching (cosine / ArcFace).
 """
 from __future__ import annotations
 
+from typing import List, Sequence
+
 import numpy as np
 from ..config import EMBEDDING_DIM_PALMPRINT, ROI_PALMPRINT_SIZE, DEVICE
 from .types import PalmprintEmbedding
@@ -15,7 +17,14 @@ except ImportError:
     torch = None
     nn = None
 
+from ..inference.buffers import BufferPool
+from ..inference.cache import EmbeddingCache
+from ..inference.compile import compile_module
+
 _PALMPRINT_MODEL = None
+_MODEL_VERSION = ""
+_INPUT_BUFFERS = BufferPool()
+_CACHE = EmbeddingCache()
 
 
 def _placeholder_emb(x: np.ndarray, dim: int) -> np.ndarray:
@@ -50,29 +59,74 @@ class _PalmprintCNN(nn.Module if nn else object):
         return x / (x.norm(dim=1, keepdim=True) + 1e-8)
 
 
-def load_palmprint_encoder(device: str = "cpu", dim: int = 256) -> None:
-    global _PALMPRINT_MODEL
+def load_palmprint_encoder(
+    device: str = "cpu",
+    dim: int = 256,
+    compiled: bool = False,
+    warmup_batch_sizes: Sequence[int] = (1,),
+    cache_size: int = 0,
+) -> None:
+    """
+    compiled: trace + freeze and warm for warmup_batch_sizes; eager if that fails.
+    cache_size: entries in the in-memory input-digest -> embedding LRU (0 disables).
+    """
+    global _PALMPRINT_MODEL, _MODEL_VERSION
+    _CACHE.resize(cache_size)
+    _MODEL_VERSION = f"palmprint:{dim}:{'compiled' if compiled else 'eager'}"
     if torch is not None and nn is not None:
         _PALMPRINT_MODEL = _PalmprintCNN(out_dim=dim)
         _PALMPRINT_MODEL.eval()
         _PALMPRINT_MODEL.to(device)
+        if compiled:
+            _PALMPRINT_MODEL = compile_module(
+                _PALMPRINT_MODEL,
+                lambda b: (torch.rand(b, 3, *ROI_PALMPRINT_SIZE[::-1], device=device),),
+                warmup_batch_sizes,
+                name="palmprint",
+            )
     else:
         _PALMPRINT_MODEL = None
 
 
-def encode_palmprint(palmprint_roi: np.ndarray, device: str = "cpu") -> PalmprintEmbedding:
-    """Extract 256-d normalized embedding from palmprint ROI (H,W,3) float [0,1]."""
+def _to_model_input(palmprint_roi: np.ndarray) -> np.ndarray:
+    """(H,W,3) or (H,W) float [0,1] -> 128x128x3 float32."""
     if palmprint_roi.ndim == 2:
         palmprint_roi = np.stack([palmprint_roi] * 3, axis=-1)
     if palmprint_roi.shape[:2] != ROI_PALMPRINT_SIZE[::-1]:
         import cv2
         palmprint_roi = cv2.resize(palmprint_roi, ROI_PALMPRINT_SIZE)
-    x = np.transpose(palmprint_roi, (2, 0, 1))[np.newaxis, ...].astype(np.float32)
+    return palmprint_roi.astype(np.float32, copy=False)
+
+
+def _forward_batch(device: str, palmprint_rois: List[np.ndarray]) -> List[np.ndarray]:
+    """One forward pass; rows are views of the fresh output (no per-sample copies)."""
     if torch is not None and _PALMPRINT_MODEL is not None:
-        t = torch.from_numpy(x).float().to(device)
+        w, h = ROI_PALMPRINT_SIZE
+        # ROIs go straight into this thread's reusable NCHW buffer
+        x, t = _INPUT_BUFFERS.get("palmprint", len(palmprint_rois), (3, h, w), device)
+        for slot, roi in zip(x, palmprint_rois):
+            if roi.shape[:2] != (h, w):
+                roi = _to_model_input(roi)
+            # HxW gray broadcasts across the 3 channels
+            slot[...] = np.moveaxis(roi, -1, 0) if roi.ndim == 3 else roi
         with torch.no_grad():
-            emb = _PALMPRINT_MODEL(t).cpu().numpy().squeeze()
-        emb = emb.astype(np.float32)
-    else:
-        emb = _placeholder_emb(palmprint_roi, EMBEDDING_DIM_PALMPRINT)
-    return PalmprintEmbedding(embedding=emb, dim=emb.shape[0])
+            return list(_PALMPRINT_MODEL(t.to(device, non_blocking=True)).cpu().numpy())
+    return [_placeholder_emb(_to_model_input(r), EMBEDDING_DIM_PALMPRINT) for r in palmprint_rois]
+
+
+def cache_metrics() -> dict:
+    """Memo cache hit rate and size."""
+    return _CACHE.metrics()
+
+
+def encode_palmprint_batch(palmprint_rois: Sequence[np.ndarray], device: str = "cpu") -> List[PalmprintEmbedding]:
+    """Batched encode_palmprint: one forward pass for all ROIs not in the memo cache, results in input order."""
+    if not palmprint_rois:
+        return []
+    embs = _CACHE.map(palmprint_rois, _MODEL_VERSION, lambda items: _forward_batch(device, items))
+    return [PalmprintEmbedding(embedding=e, dim=e.shape[0]) for e in embs]
+
+
+def encode_palmprint(palmprint_roi: np.ndarray, device: str = "cpu") -> PalmprintEmbedding:
+    """Extract 256-d normalized embedding from palmprint ROI (H,W,3) float [0,1]."""
+    return encode_palmprint_batch([palmprint_roi], device=device)[0]
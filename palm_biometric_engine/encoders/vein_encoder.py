@@ -3,6 +3,8 @@ Palm vein feature extraction from IR ROI. CNN output 256-d.
 """
 from __future__ import annotations
 
+from typing import List, Sequence
+
 import numpy as np
 from ..config import EMBEDDING_DIM_VEIN, ROI_VEIN_SIZE, DEVICE
 from .types import VeinEmbedding
@@ -14,7 +16,14 @@ except ImportError:
     torch = None
     nn = None
 
+from ..inference.buffers import BufferPool
+from ..inference.cache import EmbeddingCache
+from ..inference.compile import compile_module
+
 _VEIN_MODEL = None
+_MODEL_VERSION = ""
+_INPUT_BUFFERS = BufferPool()
+_CACHE = EmbeddingCache()
 
 
 def _placeholder_emb(x: np.ndarray, dim: int) -> np.ndarray:
@@ -49,18 +58,37 @@ class _VeinCNN(nn.Module if nn else object):
         return x / (x.norm(dim=1, keepdim=True) + 1e-8)
 
 
-def load_vein_encoder(device: str = "cpu", dim: int = 256) -> None:
-    global _VEIN_MODEL
+def load_vein_encoder(
+    device: str = "cpu",
+    dim: int = 256,
+    compiled: bool = False,
+    warmup_batch_sizes: Sequence[int] = (1,),
+    cache_size: int = 0,
+) -> None:
+    """
+    compiled: trace + freeze and warm for warmup_batch_sizes; eager if that fails.
+    cache_size: entries in the in-memory input-digest -> embedding LRU (0 disables).
+    """
+    global _VEIN_MODEL, _MODEL_VERSION
+    _CACHE.resize(cache_size)
+    _MODEL_VERSION = f"vein:{dim}:{'compiled' if compiled else 'eager'}"
     if torch is not None and nn is not None:
         _VEIN_MODEL = _VeinCNN(out_dim=dim)
         _VEIN_MODEL.eval()
         _VEIN_MODEL.to(device)
+        if compiled:
+            _VEIN_MODEL = compile_module(
+                _VEIN_MODEL,
+                lambda b: (torch.rand(b, 1, *ROI_VEIN_SIZE[::-1], device=device),),
+                warmup_batch_sizes,
+                name="vein",
+            )
     else:
         _VEIN_MODEL = None
 
 
-def encode_vein(vein_roi: np.ndarray, device: str = "cpu") -> VeinEmbedding:
-    """IR vein ROI (H,W,1) float [0,1] -> 256-d."""
+def _to_model_input(vein_roi: np.ndarray) -> np.ndarray:
+    """(H,W,1) or (H,W) float [0,1] -> 128x128x1 float32."""
     if vein_roi.ndim == 2:
         vein_roi = np.expand_dims(vein_roi, axis=-1)
     if vein_roi.shape[:2] != ROI_VEIN_SIZE[::-1]:
@@ -68,12 +96,37 @@ def encode_vein(vein_roi: np.ndarray, device: str = "cpu") -> VeinEmbedding:
         vein_roi = cv2.resize(vein_roi.squeeze(), ROI_VEIN_SIZE)
         if vein_roi.ndim == 2:
             vein_roi = np.expand_dims(vein_roi, axis=-1)
-    x = np.transpose(vein_roi, (2, 0, 1))[np.newaxis, ...].astype(np.float32)
+    return vein_roi.astype(np.float32, copy=False)
+
+
+def _forward_batch(device: str, vein_rois: List[np.ndarray]) -> List[np.ndarray]:
+    """One forward pass; rows are views of the fresh output (no per-sample copies)."""
     if torch is not None and _VEIN_MODEL is not None:
-        t = torch.from_numpy(x).float().to(device)
+        w, h = ROI_VEIN_SIZE
+        # ROIs go straight into this thread's reusable NCHW buffer
+        x, t = _INPUT_BUFFERS.get("vein", len(vein_rois), (1, h, w), device)
+        for slot, roi in zip(x, vein_rois):
+            if roi.shape[:2] != (h, w):
+                roi = _to_model_input(roi)
+            slot[0] = roi[..., 0] if roi.ndim == 3 else roi
         with torch.no_grad():
-            emb = _VEIN_MODEL(t).cpu().numpy().squeeze()
-        emb = emb.astype(np.float32)
-    else:
-        emb = _placeholder_emb(vein_roi, EMBEDDING_DIM_VEIN)
-    return VeinEmbedding(embedding=emb, dim=emb.shape[0])
+            return list(_VEIN_MODEL(t.to(device, non_blocking=True)).cpu().numpy())
+    return [_placeholder_emb(_to_model_input(r), EMBEDDING_DIM_VEIN) for r in vein_rois]
+
+
+def cache_metrics() -> dict:
+    """Memo cache hit rate and size."""
+    return _CACHE.metrics()
+
+
+def encode_vein_batch(vein_rois: Sequence[np.ndarray], device: str = "cpu") -> List[VeinEmbedding]:
+    """Batched encode_vein: one forward pass for all ROIs not in the memo cache, results in input order."""
+    if not vein_rois:
+        return []
+    embs = _CACHE.map(vein_rois, _MODEL_VERSION, lambda items: _forward_batch(device, items))
+    return [VeinEmbedding(embedding=e, dim=e.shape[0]) for e in embs]
+
+
+def encode_vein(vein_roi: np.ndarray, device: str = "cpu") -> VeinEmbedding:
+    """IR vein ROI (H,W,1) float [0,1] -> 256-d."""
+    return encode_vein_batch([vein_roi], device=device)[0]
@@ -5,7 +5,7 @@ Late-fusion (weighted concat + projection) or attention over modalities.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional, Sequence
 
 import numpy as np
 
@@ -26,6 +26,7 @@ from ..config import (
     ATTENTION_DIM,
     DEVICE,
 )
+from ..inference.compile import compile_module
 
 
 @dataclass
@@ -73,40 +74,59 @@ class _AttentionFusion(nn.Module if nn else object):
         return x / (x.norm(dim=1, keepdim=True) + 1e-8)
 
 
-def load_fusion_model(device: str = "cpu") -> None:
+def load_fusion_model(
+    device: str = "cpu",
+    compiled: bool = False,
+    warmup_batch_sizes: Sequence[int] = (1,),
+) -> None:
+    """compiled: trace + freeze and warm for warmup_batch_sizes; eager if that fails."""
     global _FUSION_MODEL
     if torch is not None and nn is not None:
         _FUSION_MODEL = _AttentionFusion() if FUSION_TYPE == "attention" else _LateFusion()
         _FUSION_MODEL.eval()
         _FUSION_MODEL.to(device)
+        if compiled:
+            _FUSION_MODEL = compile_module(
+                _FUSION_MODEL,
+                lambda b: (
+                    torch.rand(b, EMBEDDING_DIM_PALMPRINT, device=device),
+                    torch.rand(b, EMBEDDING_DIM_VEIN, device=device),
+                    torch.rand(b, EMBEDDING_DIM_GEOMETRY, device=device),
+                ),
+                warmup_batch_sizes,
+                name="fusion",
+            )
     else:
         _FUSION_MODEL = None
 
 
-def fuse_modalities(
-    palmprint_emb: np.ndarray,
-    vein_emb: np.ndarray,
-    geometry_emb: np.ndarray,
+def _fit(x: np.ndarray, dim: int) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32).ravel()
+    return x[:dim] if len(x) >= dim else np.pad(x, (0, dim - len(x)))
+
+
+def fuse_modalities_batch(
+    palmprint_embs: Sequence[np.ndarray],
+    vein_embs: Sequence[np.ndarray],
+    geometry_embs: Sequence[np.ndarray],
     device: str = "cpu",
-) -> IdentityVector:
+) -> List[IdentityVector]:
     """
-    Fuse three modality embeddings into single identity vector (512-d).
+    Batched fuse_modalities: one forward pass over N (palmprint, vein, geometry) triples.
     """
-    pp = np.asarray(palmprint_emb, dtype=np.float32).ravel()
-    v = np.asarray(vein_emb, dtype=np.float32).ravel()
-    g = np.asarray(geometry_emb, dtype=np.float32).ravel()
+    if not palmprint_embs:
+        return []
     # Pad/trim to expected dims
-    pp = pp[:EMBEDDING_DIM_PALMPRINT] if len(pp) >= EMBEDDING_DIM_PALMPRINT else np.pad(pp, (0, EMBEDDING_DIM_PALMPRINT - len(pp)))
-    v = v[:EMBEDDING_DIM_VEIN] if len(v) >= EMBEDDING_DIM_VEIN else np.pad(v, (0, EMBEDDING_DIM_VEIN - len(v)))
-    g = g[:EMBEDDING_DIM_GEOMETRY] if len(g) >= EMBEDDING_DIM_GEOMETRY else np.pad(g, (0, EMBEDDING_DIM_GEOMETRY - len(g)))
+    pp = np.stack([_fit(e, EMBEDDING_DIM_PALMPRINT) for e in palmprint_embs])
+    v = np.stack([_fit(e, EMBEDDING_DIM_VEIN) for e in vein_embs])
+    g = np.stack([_fit(e, EMBEDDING_DIM_GEOMETRY) for e in geometry_embs])
 
     if torch is not None and _FUSION_MODEL is not None:
-        t_pp = torch.from_numpy(pp[np.newaxis, :]).float().to(device)
-        t_v = torch.from_numpy(v[np.newaxis, :]).float().to(device)
-        t_g = torch.from_numpy(g[np.newaxis, :]).float().to(device)
+        t_pp = torch.from_numpy(pp).float().to(device)
+        t_v = torch.from_numpy(v).float().to(device)
+        t_g = torch.from_numpy(g).float().to(device)
         with torch.no_grad():
-            vec = _FUSION_MODEL(t_pp, t_v, t_g).cpu().numpy().squeeze()
-        vec = vec.astype(np.float32)
+            vecs = _FUSION_MODEL(t_pp, t_v, t_g).cpu().numpy().astype(np.float32)
     else:
         # Weighted concat then normalize
         w = FUSION_WEIGHTS
@@ -114,10 +134,22 @@ def fuse_modalities(
             pp * w["palmprint"],
             v * w["vein"],
             g * w["geometry"],
-        ])
-        if len(combined) >= IDENTITY_DIM:
-            vec = combined[:IDENTITY_DIM]
+        ], axis=1)
+        if combined.shape[1] >= IDENTITY_DIM:
+            vecs = combined[:, :IDENTITY_DIM]
         else:
-            vec = np.pad(combined, (0, IDENTITY_DIM - len(combined)))
-        vec = vec / (np.linalg.norm(vec) + 1e-8)
-    return IdentityVector(vector=vec, dim=vec.shape[0], components={})
+            vecs = np.pad(combined, ((0, 0), (0, IDENTITY_DIM - combined.shape[1])))
+        vecs = vecs / (np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-8)
+    return [IdentityVector(vector=vec, dim=vec.shape[0], components={}) for vec in vecs]
+
+
+def fuse_modalities(
+    palmprint_emb: np.ndarray,
+    vein_emb: np.ndarray,
+    geometry_emb: np.ndarray,
+    device: str = "cpu",
+) -> IdentityVector:
+    """
+    Fuse three modality embeddings into single identity vector (512-d).
+    """
+    return fuse_modalities_batch([palmprint_emb], [vein_emb], [geometry_emb], device=device)[0]
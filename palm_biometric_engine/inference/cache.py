@@ -0,0 +1,93 @@
+"""
+Content-addressed embedding memo: bounded in-memory LRU keyed by a digest of the normalized
+crop and the model version. Never persisted; disabled when max_entries is 0.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """Thread-safe LRU of read-only embeddings."""
+
+    def __init__(self, max_entries: int = 0):
+        self.max_entries = max(0, int(max_entries))
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def key(array: np.ndarray, version: str) -> bytes:
+        """128-bit BLAKE2b over model version, dtype/shape and raw crop bytes."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(version.encode())
+        h.update(f"{array.dtype.str}{array.shape}".encode())
+        h.update(np.ascontiguousarray(array).data)
+        return h.digest()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: np.ndarray) -> np.ndarray:
+        """Store a read-only copy; returns it."""
+        stored = np.array(value, copy=True)
+        stored.setflags(write=False)
+        with self._lock:
+            self._entries[key] = stored
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return stored
+
+    def resize(self, max_entries: int) -> None:
+        """Set capacity and drop all entries (call on model load)."""
+        with self._lock:
+            self.max_entries = max(0, int(max_entries))
+            self._entries.clear()
+
+    def map(
+        self,
+        items: Sequence[np.ndarray],
+        version: str,
+        compute: Callable[[List[np.ndarray]], List[np.ndarray]],
+    ) -> List[np.ndarray]:
+        """Outputs for items in order; compute() runs once, on the misses only."""
+        if not self.enabled:
+            return list(compute(list(items)))
+        keys = [self.key(x, version) for x in items]
+        out: List[Optional[np.ndarray]] = [self.get(k) for k in keys]
+        missing = [i for i, v in enumerate(out) if v is None]
+        if missing:
+            for i, value in zip(missing, compute([items[i] for i in missing])):
+                out[i] = self.put(keys[i], value)
+        return out  # type: ignore[return-value]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
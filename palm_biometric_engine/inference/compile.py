@@ -0,0 +1,57 @@
+"""
+Optional compiled model path: trace with TorchScript, freeze with torch.jit.freeze,
+and warm for the batch sizes the scheduler actually produces. Falls back to eager on any failure.
+"""
+from __future__ import annotations
+
+import warnings
+from typing import Any, Callable, Dict, Sequence, Tuple
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# name -> {"mode": "torchscript" | "eager", "error": str}
+_COMPILED: Dict[str, Dict[str, str]] = {}
+
+WARMUP_ITERS = 3  # profiling executor specializes after a couple of runs per shape
+
+
+def compile_module(
+    module: Any,
+    example_inputs: Callable[[int], Tuple["torch.Tensor", ...]],
+    batch_sizes: Sequence[int] = (1,),
+    name: str = "model",
+    atol: float = 1e-4,
+) -> Any:
+    """
+    Trace + freeze module (already in eval mode and on its device) and warm it for batch_sizes.
+    example_inputs(batch) -> tuple of input tensors. Returns the eager module if compilation fails
+    or the compiled outputs disagree with eager beyond atol.
+    """
+    if torch is None or module is None:
+        return module
+    sizes = sorted(set(int(b) for b in batch_sizes)) or [1]
+    try:
+        with torch.no_grad(), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            traced = torch.jit.trace(module, example_inputs(sizes[-1]))
+            frozen = torch.jit.freeze(traced)
+            for b in sizes:
+                inputs = example_inputs(b)
+                for _ in range(WARMUP_ITERS):
+                    out = frozen(*inputs)
+                ref = module(*inputs)
+                if not torch.allclose(out, ref, atol=atol):
+                    raise RuntimeError(f"compiled output mismatch at batch {b}")
+    except Exception as e:
+        _COMPILED[name] = {"mode": "eager", "error": str(e)}
+        return module
+    _COMPILED[name] = {"mode": "torchscript", "error": ""}
+    return frozen
+
+
+def compiled_models() -> Dict[str, Dict[str, str]]:
+    """Mode per model name (for /metrics)."""
+    return {k: dict(v) for k, v in _COMPILED.items()}
@@ -0,0 +1,60 @@
+"""
+In-process metrics: latency percentiles and named metric providers for the /metrics endpoint.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator
+
+import numpy as np
+
+
+class LatencyRecorder:
+    """Bounded window of latency samples (ms) with count / mean / p50 / p99 summary."""
+
+    def __init__(self, window: int = 1024):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, ms: float) -> None:
+        with self._lock:
+            self._samples.append(float(ms))
+            self._count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record((time.perf_counter() - t0) * 1000.0)
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            samples = np.array(self._samples, dtype=np.float64)
+            count = self._count
+        if samples.size == 0:
+            return {"count": count, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+        return {
+            "count": count,
+            "mean_ms": float(samples.mean()),
+            "p50_ms": float(np.percentile(samples, 50)),
+            "p99_ms": float(np.percentile(samples, 99)),
+        }
+
+
+_PROVIDERS: Dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict]) -> None:
+    """Register (or replace) a named metrics provider."""
+    _PROVIDERS[name] = provider
+
+
+def collect_metrics() -> Dict[str, dict]:
+    """Snapshot of all registered providers."""
+    return {name: provider() for name, provider in list(_PROVIDERS.items())}
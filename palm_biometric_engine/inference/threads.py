@@ -0,0 +1,69 @@
+"""
+CPU thread budget: split cores across uvicorn workers, then across torch intra-op,
+OpenCV and BLAS pools so that libraries do not each assume they own every core.
+"""
+from __future__ import annotations
+
+import os
+from typing import Dict, Mapping, Optional
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+_applied: Dict[str, int] = {}
+_blas_limiter = None  # keeps BLAS limits in force for the process lifetime
+
+
+def plan_thread_budget(
+    budget: Optional[int] = None,
+    workers: int = 1,
+    split: Optional[Mapping[str, float]] = None,
+) -> Dict[str, int]:
+    """Threads per library for one worker process: budget // workers, divided by split fractions."""
+    budget = budget or os.cpu_count() or 1
+    per_worker = max(1, budget // max(1, workers))
+    split = split or {"torch": 0.5, "opencv": 0.25, "blas": 0.25}
+    plan = {lib: max(1, int(round(per_worker * frac))) for lib, frac in split.items()}
+    plan["per_worker"] = per_worker
+    return plan
+
+
+def apply_thread_budget(
+    budget: Optional[int] = None,
+    workers: int = 1,
+    split: Optional[Mapping[str, float]] = None,
+) -> Dict[str, int]:
+    """Apply plan_thread_budget() to torch, OpenCV and BLAS (via threadpoolctl). Returns the plan."""
+    global _blas_limiter
+    plan = plan_thread_budget(budget, workers, split)
+    if torch is not None and "torch" in plan:
+        torch.set_num_threads(plan["torch"])
+        try:
+            # Inter-op parallelism is unused for batch-of-N single-graph inference
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # can only be set before the first parallel op
+    if cv2 is not None and "opencv" in plan:
+        cv2.setNumThreads(plan["opencv"])
+    if threadpool_limits is not None and "blas" in plan:
+        _blas_limiter = threadpool_limits(limits=plan["blas"], user_api="blas")
+    _applied.clear()
+    _applied.update(plan)
+    return plan
+
+
+def thread_budget() -> Dict[str, int]:
+    """Currently applied plan (for /metrics)."""
+    return dict(_applied)
@@ -1,6 +1,6 @@
 """
 Liveness detection: anti-spoofing for fake palms, photos, silicone molds.
 """
-from .detector import check_palm_liveness, PalmLivenessResult
+from .detector import check_palm_liveness, check_palm_liveness_batch, PalmLivenessResult, PalmBurstLivenessResult
 
-__all__ = ["check_palm_liveness", "PalmLivenessResult"]
+__all__ = ["check_palm_liveness", "check_palm_liveness_batch", "PalmLivenessResult", "PalmBurstLivenessResult"]
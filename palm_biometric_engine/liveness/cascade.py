@@ -0,0 +1,162 @@
+"""
+Early-exit liveness cascade: cues run in order of measured rejects per ms (the stage that most
+often settles a reject for the least time first) and stop as soon as the frame is certainly
+rejected. Each stage yields one cue in [0, 1] with a fusion weight, so after any stage the fused
+score lies in [evaluated, evaluated + weight of the remaining stages]. A frame that may pass
+always runs every stage, so its score is the same as without the cascade.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+@dataclass
+class CascadeStage:
+    """One cue. Below its gate the score is capped at gate_cap; with gate_rejects the frame is not live at all."""
+    name: str
+    weight: float
+    compute: Callable[[Any], float]
+    gate: Optional[float] = None
+    gate_cap: float = 0.0
+    gate_rejects: bool = False
+    gate_reason: str = ""
+
+
+@dataclass
+class CascadeOutcome:
+    cues: Dict[str, float]
+    score: float  # fused score; a lower bound when stages were skipped (the frame is then not live)
+    is_live: bool
+    decided_by: str = ""  # stage after which the cascade stopped early ("" = all stages ran)
+    gate_reason: str = ""
+    skipped: List[str] = field(default_factory=list)
+
+
+class _StageStats:
+    __slots__ = ("runs", "ms", "rejects")
+
+    def __init__(self):
+        self.runs = 0
+        self.ms = 0.0
+        self.rejects = 0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.ms / self.runs if self.runs else 0.0
+
+
+class LivenessCascade:
+    """
+    Shared across requests (thread-safe). Remaining stages are skipped only once the frame is
+    certainly rejected: a gate_rejects gate failed, a failed gate capped the score at 0, or the
+    (capped) score can no longer reach reject_below (default live_threshold; set it to the lowest
+    score any caller acts on). Frames that may pass run every stage, so stopping early never changes
+    an accept or a score above reject_below. Every reorder_every frames, stages are re-sorted by
+    rejects settled per ms of mean latency; stages that have settled none keep their declared order,
+    so declare decisive gates first.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[CascadeStage],
+        live_threshold: float = 0.5,
+        reject_below: Optional[float] = None,
+        reorder_every: int = 64,
+    ):
+        self.stages = list(stages)
+        self.live_threshold = live_threshold
+        self.reject_below = live_threshold if reject_below is None else min(reject_below, live_threshold)
+        self.reorder_every = max(1, int(reorder_every))
+        self._order = list(self.stages)
+        self._stats: Dict[str, _StageStats] = {s.name: _StageStats() for s in self.stages}
+        self._frames = 0
+        self._early_exits = 0
+        self._saved_ms = 0.0
+        self._lock = threading.Lock()
+
+    def _reject_rate_per_ms(self, name: str) -> float:
+        st = self._stats[name]
+        return st.rejects / st.runs / max(st.mean_ms, 1e-6) if st.runs else 0.0
+
+    def _reorder(self) -> None:
+        declared = {s.name: i for i, s in enumerate(self.stages)}
+        self._order = sorted(self.stages, key=lambda s: (-self._reject_rate_per_ms(s.name), declared[s.name]))
+
+    def run(self, ctx: Any, early_exit: bool = True, gates: Optional[Dict[str, float]] = None) -> CascadeOutcome:
+        """Evaluate stages on ctx; gates overrides per-stage gate thresholds by stage name."""
+        with self._lock:
+            order = self._order
+        cues: Dict[str, float] = {}
+        timings: Dict[str, float] = {}
+        remaining = sum(s.weight for s in order)
+        evaluated = 0.0
+        failed: Optional[CascadeStage] = None
+        rejected = False
+        cap = 1.0
+        decided_by = ""
+        for stage in order:
+            t0 = time.perf_counter()
+            value = float(stage.compute(ctx))
+            timings[stage.name] = (time.perf_counter() - t0) * 1000.0
+            cues[stage.name] = value
+            evaluated += stage.weight * value
+            remaining -= stage.weight
+            if stage.gate is not None:
+                if value < (gates.get(stage.name, stage.gate) if gates else stage.gate):
+                    cap = min(cap, stage.gate_cap)
+                    rejected = rejected or stage.gate_rejects
+                    failed = failed or stage
+            if not decided_by and (rejected or cap <= 0.0 or min(evaluated + remaining, cap) < self.reject_below):
+                decided_by = stage.name
+                if early_exit:
+                    break
+        score = min(max(evaluated, 0.0), cap, 1.0)
+        skipped = [s.name for s in order if s.name not in cues]
+
+        with self._lock:
+            self._frames += 1
+            for name, ms in timings.items():
+                st = self._stats[name]
+                st.runs += 1
+                st.ms += ms
+            if decided_by:
+                self._stats[decided_by].rejects += 1
+            if skipped:
+                self._early_exits += 1
+                self._saved_ms += sum(self._stats[name].mean_ms for name in skipped)
+            if self._frames % self.reorder_every == 0:
+                self._reorder()
+
+        return CascadeOutcome(
+            cues=cues,
+            score=score,
+            is_live=not rejected and score >= self.live_threshold,
+            decided_by=decided_by if skipped else "",
+            gate_reason=failed.gate_reason if failed is not None else "",
+            skipped=skipped,
+        )
+
+    def metrics(self) -> dict:
+        """Per-stage reach rate, rejects settled and mean latency; estimated time saved."""
+        with self._lock:
+            frames = self._frames
+            stages = {
+                s.name: {
+                    "runs": self._stats[s.name].runs,
+                    "reach_rate": self._stats[s.name].runs / frames if frames else 0.0,
+                    "rejects": self._stats[s.name].rejects,
+                    "mean_ms": self._stats[s.name].mean_ms,
+                }
+                for s in self._order
+            }
+            return {
+                "frames": frames,
+                "order": [s.name for s in self._order],
+                "early_exits": self._early_exits,
+                "early_exit_rate": self._early_exits / frames if frames else 0.0,
+                "time_saved_ms": self._saved_ms,
+                "stages": stages,
+            }
@@ -4,8 +4,8 @@ Detects photos, printed palms, silicone molds.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 import numpy as np
 
@@ -18,7 +18,9 @@ from ..config import (
     LIVENESS_TEXTURE_MIN,
     LIVENESS_IR_RESPONSE_MIN,
     LIVENESS_GEOMETRY_CONSISTENCY,
+    LIVENESS_CASCADE,
 )
+from .cascade import CascadeStage, LivenessCascade
 
 
 @dataclass
@@ -30,6 +32,15 @@ class PalmLivenessResult:
     ir_response_score: float
     geometry_score: float
     details: str = ""
+    skipped: List[str] = field(default_factory=list)  # cues not evaluated (cascade stopped early)
+
+
+@dataclass
+class PalmBurstLivenessResult:
+    """Per-frame liveness for a burst plus frame-to-frame geometry consistency."""
+    frames: List[PalmLivenessResult]
+    geometry_consistency: float  # mean frame-to-frame geometry score (1.0 for a single frame)
+    consistent: bool  # geometry_consistency >= LIVENESS_GEOMETRY_CONSISTENCY
 
 
 def _texture_score(palmprint_roi: np.ndarray) -> float:
@@ -63,6 +74,25 @@ def _geometry_score(geometry_vector: np.ndarray, prev_geometry: Optional[np.ndar
     return float(np.clip(1.0 - np.mean(diff) * 2, 0, 1))
 
 
+_MIN_USABLE_SCORE = 0.4  # pipelines drop frames below this score; the cascade only stops early under it
+
+# Fusion weights; cues are declared in the order they settle rejects: the texture hard gate
+# (print / photo), then IR variance (caps the score), then geometry.
+# ctx = (palmprint_roi, vein_roi, geometry_vector, prev_geometry)
+_cascade = LivenessCascade([
+    # Hard gate: very flat texture suggests print/photo
+    CascadeStage(
+        "texture", 0.4, lambda c: _texture_score(c[0]),
+        gate=LIVENESS_TEXTURE_MIN, gate_cap=0.0, gate_reason="texture_below_threshold",
+    ),
+    CascadeStage(
+        "ir_response", 0.35, lambda c: _ir_response_score(c[1]),
+        gate=LIVENESS_IR_RESPONSE_MIN, gate_cap=0.5, gate_reason="ir_response_low",
+    ),
+    CascadeStage("geometry", 0.25, lambda c: _geometry_score(c[2], c[3])),
+], reject_below=_MIN_USABLE_SCORE)
+
+
 def check_palm_liveness(
     palmprint_roi: np.ndarray,
     vein_roi: np.ndarray,
@@ -71,27 +101,93 @@ def check_palm_liveness(
 ) -> PalmLivenessResult:
     """
     Aggregate liveness from texture, IR response, geometry consistency.
+    With LIVENESS_CASCADE, cues stop early once the frame is certainly rejected (skipped cues report 0).
     """
-    ts = _texture_score(palmprint_roi)
-    irs = _ir_response_score(vein_roi)
-    gs = _geometry_score(geometry_vector, prev_geometry)
+    out = _cascade.run((palmprint_roi, vein_roi, geometry_vector, prev_geometry), early_exit=LIVENESS_CASCADE)
+    return PalmLivenessResult(
+        is_live=out.is_live,
+        score=out.score,
+        texture_score=out.cues.get("texture", 0.0),
+        ir_response_score=out.cues.get("ir_response", 0.0),
+        geometry_score=out.cues.get("geometry", 0.0),
+        details=out.gate_reason or "ok",
+        skipped=out.skipped,
+    )
 
-    # Hard gate: very flat texture suggests print/photo
-    if ts < LIVENESS_TEXTURE_MIN:
-        score = 0.0
-        details = "texture_below_threshold"
-    else:
-        score = 0.4 * ts + 0.35 * irs + 0.25 * gs
-        details = "ok"
-    if irs < LIVENESS_IR_RESPONSE_MIN and vein_roi.size > 0:
-        score = min(score, 0.5)
-        details = "ir_response_low"
 
-    return PalmLivenessResult(
-        is_live=score >= 0.5,
-        score=float(np.clip(score, 0, 1)),
-        texture_score=ts,
-        ir_response_score=irs,
-        geometry_score=gs,
-        details=details,
+def _texture_scores(palmprint_rois: np.ndarray) -> np.ndarray:
+    """_texture_score for (N, H, W[, C]) stacked ROIs: one uint8 cast, cvtColor and Laplacian for the stack."""
+    rois = palmprint_rois[..., 0] if palmprint_rois.ndim == 4 and palmprint_rois.shape[-1] == 1 else palmprint_rois
+    n, h, w = rois.shape[:3]
+    if cv2 is None or rois.size == 0:
+        return np.full(n, 0.5)
+    u8 = (rois * 255).astype(np.uint8)
+    # Rows are independent for color conversion and the Laplacian, so the stack runs as one (N*H, W) image
+    gray = cv2.cvtColor(u8.reshape(n * h, w, 3), cv2.COLOR_RGB2GRAY) if u8.ndim == 4 else u8.reshape(n * h, w)
+    lap = cv2.Laplacian(gray, cv2.CV_16S).reshape(n, h, w)  # |values| <= 1020: exact in int16
+    if n > 1 and h > 1:
+        # Edge rows saw the neighbouring frame; swap in each frame's own BORDER_REFLECT_101 row
+        g = gray.reshape(n, h, w).astype(np.int16)
+        lap[1:, 0] += g[1:, 1] - g[:-1, -1]
+        lap[:-1, -1] += g[:-1, -2] - g[1:, 0]
+    var = np.array([cv2.meanStdDev(frame)[1][0, 0] ** 2 for frame in lap])  # accumulates in double
+    return np.clip(var / 500.0, 0, 1)
+
+
+def _ir_response_scores(vein_rois: np.ndarray) -> np.ndarray:
+    """_ir_response_score for (N, H, W[, 1]) stacked ROIs."""
+    n = vein_rois.shape[0]
+    if vein_rois.size == 0:
+        return np.full(n, 0.5)
+    return np.clip(vein_rois.reshape(n, -1).std(axis=1) * 4, 0, 1)
+
+
+def _geometry_scores(geometry_vectors: np.ndarray, prev_geometry: Optional[np.ndarray] = None) -> np.ndarray:
+    """_geometry_score of each frame against the one before it (prev_geometry for the first)."""
+    g = geometry_vectors.astype(np.float64).reshape(geometry_vectors.shape[0], -1)
+    out = np.empty(g.shape[0])
+    if g.shape[0] == 0:
+        return out
+    out[0] = _geometry_score(g[0], prev_geometry)
+    out[1:] = np.clip(1.0 - np.abs(np.diff(g, axis=0)).mean(axis=1) * 2, 0, 1)
+    return out
+
+
+def check_palm_liveness_batch(
+    palmprint_rois: np.ndarray,
+    vein_rois: np.ndarray,
+    geometry_vectors: np.ndarray,
+    prev_geometry: Optional[np.ndarray] = None,
+) -> PalmBurstLivenessResult:
+    """
+    Liveness for a burst of stacked ROIs ((N, 128, 128, 3), (N, 128, 128, 1), (N, G)) in one pass.
+    Every cue is computed for every frame (no early exit), with the same gates and weights as
+    check_palm_liveness; geometry compares consecutive frames, the first against prev_geometry.
+    """
+    textures = _texture_scores(palmprint_rois)
+    irs = _ir_response_scores(vein_rois)
+    geometries = _geometry_scores(geometry_vectors, prev_geometry)
+    frames = []
+    for t, ir, g in zip(textures.tolist(), irs.tolist(), geometries.tolist()):
+        if t < LIVENESS_TEXTURE_MIN:
+            score, details = 0.0, "texture_below_threshold"
+        else:
+            score, details = 0.4 * t + 0.35 * ir + 0.25 * g, "ok"
+        if ir < LIVENESS_IR_RESPONSE_MIN:
+            score, details = min(score, 0.5), "ir_response_low"
+        score = min(max(score, 0.0), 1.0)
+        frames.append(PalmLivenessResult(
+            is_live=score >= 0.5, score=score, texture_score=t, ir_response_score=ir, geometry_score=g, details=details,
+        ))
+    pairs = geometries[1:] if prev_geometry is None else geometries
+    consistency = float(pairs.mean()) if pairs.size else 1.0
+    return PalmBurstLivenessResult(
+        frames=frames,
+        geometry_consistency=consistency,
+        consistent=consistency >= LIVENESS_GEOMETRY_CONSISTENCY,
     )
+
+
+def liveness_metrics() -> dict:
+    """Cascade stage reach / early-exit rates and time saved."""
+    return _cascade.metrics()
@@ -4,8 +4,11 @@ Real-time target <1s; no raw images stored.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 
@@ -16,16 +19,55 @@ from config import (
     TEMPLATES_DIR,
     ENCRYPT_TEMPLATES,
     DEVICE,
+    INFERENCE_BATCHING,
+    INFERENCE_BATCH_WINDOW_MS,
+    INFERENCE_MAX_BATCH_SIZE,
+    COMPILE_MODELS,
+    COMPILE_WARMUP_BATCH_SIZES,
+    EMBEDDING_CACHE_SIZE,
+    CPU_THREAD_BUDGET,
+    THREAD_SPLIT,
+    API_WORKERS,
+    PREPROCESS_WORKERS,
+    CONCURRENT_VERIFICATION,
+    VERIFY_WORKERS,
+    PIPELINED_CAPTURE,
+    STAGE_QUEUE_SIZE,
+    CAPTURE_SESSION,
+    QUALITY_GATE,
+    DEDUP_FRAMES,
+    DEDUP_MIN_FRAMES,
+    STREAM_MAX_FRAMES,
+    STREAM_REJECT_AFTER,
+    STREAM_TIMEOUT_SEC,
 )
-from capture.multimodal_capture import capture_palm_frames, PalmCaptureResult
+from capture.multimodal_capture import capture_palm_frames, capture_metrics, PalmCaptureResult
+from capture.session import close_capture_sessions, capture_session_metrics
 from preprocess.pipeline import preprocess_palm, PalmPreprocessResult
-from liveness.detector import check_palm_liveness, PalmLivenessResult
-from encoders import encode_palmprint, encode_vein, encode_geometry
+from preprocess.quality import assess_quality, check_region_size
+from preprocess.dedup import select_distinct
+from liveness.detector import (
+    check_palm_liveness,
+    check_palm_liveness_batch,
+    liveness_metrics,
+    PalmLivenessResult,
+    PalmBurstLivenessResult,
+)
+from encoders import encode_palmprint_batch, encode_vein_batch, encode_geometry_batch
 from encoders.types import PalmprintEmbedding, VeinEmbedding, GeometryEmbedding
-from fusion.fusion import fuse_modalities, load_fusion_model, IdentityVector
+from encoders.palmprint_encoder import cache_metrics as palmprint_cache_metrics
+from encoders.vein_encoder import cache_metrics as vein_cache_metrics
+from encoders.geometry_encoder import cache_metrics as geometry_cache_metrics
+from fusion.fusion import fuse_modalities_batch, load_fusion_model, IdentityVector
 from matching.matcher import match_identity, cosine_similarity
 from decision.engine import decide, PalmDecisionResult
 from storage.template_store import TemplateStore, enroll_palm_template, verify_palm_template
+from inference.compile import compiled_models
+from inference.executor import OrderedRace, configure_executor, map_ordered, shutdown_executor
+from inference.metrics import LatencyRecorder, register_metrics
+from inference.scheduler import MicroBatchScheduler
+from inference.staged import Stage, StagedExecutor, staged_metrics
+from inference.threads import apply_thread_budget, thread_budget
 
 
 @dataclass
@@ -37,6 +79,133 @@ class PalmPipelineResult:
     liveness_score: float = 0.0
     similarity_score: float = 0.0
     template_hash: Optional[str] = None
+    frame_reasons: Dict[int, List[str]] = field(default_factory=dict)  # frames dropped before liveness, by index
+    frames_skipped: int = 0  # near-duplicate frames never processed
+
+
+def _encode_batch(preps: List[PalmPreprocessResult]) -> List[IdentityVector]:
+    """Encode all three modalities and fuse, one forward pass per model for the whole batch."""
+    pp_embs = encode_palmprint_batch([p.palmprint_roi for p in preps], device=DEVICE)
+    v_embs = encode_vein_batch([p.vein_roi for p in preps], device=DEVICE)
+    g_embs = encode_geometry_batch([p.geometry_vector for p in preps], device=DEVICE)
+    return fuse_modalities_batch(
+        [e.embedding for e in pp_embs],
+        [e.embedding for e in v_embs],
+        [e.embedding for e in g_embs],
+        device=DEVICE,
+    )
+
+
+# Shared across requests; started in init_pipeline(). Runs inline when not started.
+_encode_scheduler = MicroBatchScheduler(
+    _encode_batch,
+    max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=INFERENCE_BATCH_WINDOW_MS,
+    name="palm-encoders",
+)
+register_metrics("encoder_scheduler", _encode_scheduler.metrics)
+register_metrics("compiled_models", compiled_models)
+register_metrics("thread_budget", thread_budget)
+register_metrics("capture_sessions", capture_session_metrics)
+register_metrics("palm_capture", capture_metrics)
+register_metrics("staged_capture", staged_metrics)
+register_metrics("liveness_cascade", liveness_metrics)
+register_metrics("encoder_cache", lambda: {
+    "palmprint": palmprint_cache_metrics(),
+    "vein": vein_cache_metrics(),
+    "geometry": geometry_cache_metrics(),
+})
+
+_stream_latency = LatencyRecorder()  # ms from stream start to decision
+_stream_outcomes = {"accept": 0, "reject": 0, "budget": 0, "ended": 0}
+_stream_lock = threading.Lock()
+
+
+def _stream_metrics() -> dict:
+    with _stream_lock:
+        outcomes = dict(_stream_outcomes)
+    return {"time_to_decision": _stream_latency.summary(), "outcomes": outcomes}
+
+
+register_metrics("verify_stream", _stream_metrics)
+
+
+_NOT_ENROLLED = "User not enrolled (or enrolled with an older geometry feature layout; re-enroll)."
+
+
+def _drop_duplicates(images: List[np.ndarray], min_keep: int) -> Tuple[List[int], Dict[int, List[str]]]:
+    """Indices of frames worth processing, and near_duplicate reasons for the rest."""
+    if not DEDUP_FRAMES:
+        return list(range(len(images))), {}
+    kept = select_distinct(images, min_keep=max(DEDUP_MIN_FRAMES, min_keep))
+    kept_set = set(kept)
+    return kept, {i: ["near_duplicate"] for i in range(len(images)) if i not in kept_set}
+
+
+def _preprocess_checked(
+    rgb: np.ndarray,
+    ir: Optional[np.ndarray] = None,
+    depth: Optional[np.ndarray] = None,
+) -> Tuple[Optional[PalmPreprocessResult], List[str]]:
+    """Quality gate, preprocess, palm-size check. Returns (None, reasons) for unusable frames."""
+    if QUALITY_GATE:
+        quality = assess_quality(rgb)
+        if not quality.ok:
+            return None, quality.reasons
+    prep = preprocess_palm(rgb, ir, depth)
+    if QUALITY_GATE and prep.palm_mask is not None:
+        reason = check_region_size(prep.palm_bbox, rgb.shape)
+        if reason is not None:
+            return None, [reason]
+    return prep, []
+
+
+def _preprocess_burst(
+    frames: List[Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]],
+) -> Iterator[Tuple[Optional[PalmPreprocessResult], List[str]]]:
+    """
+    Quality-gate and preprocess (rgb, ir, depth) frames concurrently on the shared pool,
+    yielding (prep, reasons) in order; prep is None for frames the gate rejected.
+    """
+    return map_ordered(lambda f: _preprocess_checked(*f), frames)
+
+
+def _capture_stage(i: int):
+    """Capture frame i as (i, (rgb, ir, depth)). Pipelined, several frames are in flight, so session views are copied."""
+    cap = capture_palm_frames(num_frames=1, require_ir=False)[0]
+    if cap.rgb is None:
+        return None
+    rgb = cap.rgb.copy() if PIPELINED_CAPTURE and CAPTURE_SESSION else cap.rgb
+    return i, (rgb, cap.ir, cap.depth)
+
+
+def _camera_run(num_frames: int, stages: List[Stage], name: str) -> StagedExecutor:
+    """Capture frames 0..num_frames-1 and run them through stages; overlapped unless PIPELINED_CAPTURE is off."""
+    return StagedExecutor(
+        range(num_frames),
+        [("capture", _capture_stage), *stages],
+        queue_size=STAGE_QUEUE_SIZE,
+        threaded=PIPELINED_CAPTURE,
+        name=name,
+    )
+
+
+def _burst_liveness(preps: List[PalmPreprocessResult]) -> PalmBurstLivenessResult:
+    """Liveness for every preprocessed frame of a burst in one pass; geometry is chained frame to frame."""
+    return check_palm_liveness_batch(
+        np.stack([p.palmprint_roi for p in preps]),
+        np.stack([p.vein_roi for p in preps]),
+        np.stack([p.geometry_vector for p in preps]),
+    )
+
+
+def _inconsistent_burst(burst: PalmBurstLivenessResult) -> str:
+    return f"Palm geometry inconsistent across frames ({burst.geometry_consistency:.2f})."
+
+
+def _encode_identity(prep: PalmPreprocessResult) -> IdentityVector:
+    """Encode + fuse one sample through the shared micro-batching scheduler."""
+    return _encode_scheduler.run(prep)
 
 
 def _run_single(
@@ -47,12 +216,7 @@ def _run_single(
     user_id: Optional[str] = None,
 ) -> tuple[IdentityVector, float, PalmDecisionResult, bool, Optional[str]]:
     """Encode, fuse, match (if ref/store), decide."""
-    pp_emb = encode_palmprint(prep.palmprint_roi, device=DEVICE)
-    v_emb = encode_vein(prep.vein_roi, device=DEVICE)
-    g_emb = encode_geometry(prep.geometry_vector, device=DEVICE)
-    identity = fuse_modalities(
-        pp_emb.embedding, v_emb.embedding, g_emb.embedding, device=DEVICE,
-    )
+    identity = _encode_identity(prep)
     similarity = 0.0
     match = False
     template_hash = None
@@ -66,6 +230,61 @@ def _run_single(
     return identity, similarity, dec, match, template_hash
 
 
+def _encode_live(live: List[Tuple[PalmPreprocessResult, PalmLivenessResult]]) -> List[IdentityVector]:
+    """Encode the selected live samples concurrently on the verify pool (they share micro-batches)."""
+    with OrderedRace(_encode_identity, lambda _: False, concurrent=CONCURRENT_VERIFICATION) as race:
+        for prep, _ in live:
+            race.submit(prep)
+        return race.finish()
+
+
+def _verify_burst(
+    frames: List[Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]],
+    indices: List[int],
+    ref_vector: np.ndarray,
+) -> Tuple[List[tuple], Dict[int, List[str]], List[float]]:
+    """
+    Preprocess, liveness (in frame order, geometry chained) and encode / match / decide of live
+    frames racing on the verify pool. Returns the per-frame (index, similarity, decision, match,
+    template_hash) results up to the first accept, the gate reasons and liveness scores of those
+    frames; frames after the accepted one count as never processed, as in a sequential run.
+    """
+    def verify_frame(item: Tuple[int, PalmPreprocessResult, PalmLivenessResult]):
+        i, prep, live = item
+        _, similarity, dec, match, template_hash = _run_single(prep, live, ref_vector=ref_vector)
+        return i, similarity, dec, match, template_hash
+
+    scores: List[Tuple[int, float]] = []
+    reasons_seen: Dict[int, List[str]] = {}
+    prev_geometry = None
+    race = OrderedRace(verify_frame, lambda r: r[2].decision == "accept", concurrent=CONCURRENT_VERIFICATION)
+    with closing(_preprocess_burst(frames)) as preps, race:
+        for i, (prep, reasons) in zip(indices, preps):
+            if prep is None:
+                reasons_seen[i] = reasons
+                continue
+            live = check_palm_liveness(prep.palmprint_roi, prep.vein_roi, prep.geometry_vector, prev_geometry)
+            prev_geometry = prep.geometry_vector
+            if live.score < 0.4:
+                continue
+            scores.append((i, live.score))
+            if not race.submit((i, prep, live)):
+                break
+        results = race.finish()
+    cutoff = results[-1][0] if race.settled else max(indices, default=0)
+    reasons = {i: r for i, r in reasons_seen.items() if i <= cutoff}
+    return results, reasons, [score for i, score in scores if i <= cutoff]
+
+
+def _best_result(results: List[tuple]):
+    """Highest-similarity frame (first on ties), as the sequential loop picked it."""
+    best = None
+    for r in results:
+        if r[1] > (best[1] if best is not None else 0.0):
+            best = r
+    return best
+
+
 def run_enrollment(
     user_id: str,
     num_samples: Optional[int] = None,
@@ -76,26 +295,30 @@ def run_enrollment(
     if store is None:
         store = TemplateStore(base_dir=TEMPLATES_DIR, encrypt=ENCRYPT_TEMPLATES)
 
-    captures = capture_palm_frames(num_frames=num_samples * 2, require_ir=False)
-    vectors: List[np.ndarray] = []
-    liveness_scores: List[float] = []
-    prev_geometry = None
+    frame_reasons: Dict[int, List[str]] = {}
 
-    for cap in captures:
-        if cap.rgb is None:
-            continue
-        prep = preprocess_palm(cap.rgb, cap.ir, cap.depth)
-        live = check_palm_liveness(
-            prep.palmprint_roi, prep.vein_roi, prep.geometry_vector, prev_geometry,
+    def preprocess(item):
+        i, frame = item
+        prep, reasons = _preprocess_checked(*frame)
+        if prep is None:
+            frame_reasons[i] = reasons
+        return prep
+
+    # Burst liveness needs every frame, so only capture and preprocessing overlap here
+    with _camera_run(num_samples * 2, [("preprocess", preprocess)], "palm-enroll") as staged:
+        preps: List[PalmPreprocessResult] = list(staged)
+    burst = _burst_liveness(preps) if preps else None
+    if burst is not None and not burst.consistent:
+        return PalmPipelineResult(
+            decision="reject",
+            confidence=0.0,
+            message=_inconsistent_burst(burst),
+            match=False,
+            frame_reasons=frame_reasons,
         )
-        if live.score < 0.5:
-            continue
-        identity, _, _, _, _ = _run_single(prep, live)
-        vectors.append(identity.vector)
-        liveness_scores.append(live.score)
-        prev_geometry = prep.geometry_vector.copy()
-        if len(vectors) >= num_samples:
-            break
+    live = [(prep, r) for prep, r in zip(preps, burst.frames if burst else []) if r.score >= 0.5][:num_samples]
+    liveness_scores = [r.score for _, r in live]
+    vectors = [identity.vector for identity in _encode_live(live)]
 
     if len(vectors) < num_samples:
         return PalmPipelineResult(
@@ -104,6 +327,7 @@ def run_enrollment(
             message=f"Need at least {num_samples} live samples; got {len(vectors)}.",
             match=False,
             liveness_score=float(np.mean(liveness_scores)) if liveness_scores else 0.0,
+            frame_reasons=frame_reasons,
         )
 
     mean_vec = np.mean(vectors, axis=0).astype(np.float32)
@@ -117,6 +341,7 @@ def run_enrollment(
         liveness_score=float(np.mean(liveness_scores)),
         similarity_score=1.0,
         template_hash=template_hash,
+        frame_reasons=frame_reasons,
     )
 
 
@@ -130,40 +355,52 @@ def run_verification(
         store = TemplateStore(base_dir=TEMPLATES_DIR, encrypt=ENCRYPT_TEMPLATES)
     loaded = store.load(user_id)
     if loaded is None:
-        return PalmPipelineResult(decision="reject", confidence=0.0, message="User not enrolled.", match=False)
+        return PalmPipelineResult(decision="reject", confidence=0.0, message=_NOT_ENROLLED, match=False)
     ref_vector, _ = loaded
 
-    captures = capture_palm_frames(num_frames=num_frames, require_ir=False)
-    best_score = 0.0
-    best_decision = None
-    best_match = False
-    best_hash = None
-    liveness_scores = []
-    for cap in captures:
-        if cap.rgb is None:
-            continue
-        prep = preprocess_palm(cap.rgb, cap.ir, cap.depth)
-        live = check_palm_liveness(prep.palmprint_roi, prep.vein_roi, prep.geometry_vector)
-        if live.score < 0.4:
-            continue
-        liveness_scores.append(live.score)
-        identity, similarity, dec, match, template_hash = _run_single(prep, live, ref_vector=ref_vector)
-        if similarity > best_score:
-            best_score = similarity
-            best_decision = dec
-            best_match = match
-            best_hash = template_hash
-        if dec.decision == "accept":
-            break
-
-    if best_decision is None:
+    frame_reasons: Dict[int, List[str]] = {}
+    scores: List[Tuple[int, float]] = []
+    prev_geometry = None
+
+    def preprocess(item):
+        nonlocal prev_geometry
+        i, frame = item
+        prep, reasons = _preprocess_checked(*frame)
+        if prep is None:
+            frame_reasons[i] = reasons
+            return None
+        live = check_palm_liveness(prep.palmprint_roi, prep.vein_roi, prep.geometry_vector, prev_geometry)
+        prev_geometry = prep.geometry_vector
+        scores.append((i, live.score))
+        return (i, prep, live) if live.score >= 0.4 else None
+
+    def infer(item):
+        i, prep, live = item
+        _, similarity, dec, match, template_hash = _run_single(prep, live, ref_vector=ref_vector)
+        return i, similarity, dec, match, template_hash
+
+    results: List[tuple] = []
+    cutoff = num_frames
+    with _camera_run(num_frames, [("preprocess", preprocess), ("infer", infer)], "palm-verify") as staged:
+        for r in staged:
+            results.append(r)
+            if r[2].decision == "accept":
+                cutoff = r[0]
+                break
+    # Frames preprocessed ahead of the accepted one count as never captured, as in a sequential run
+    frame_reasons = {i: r for i, r in frame_reasons.items() if i <= cutoff}
+    liveness_scores = [score for i, score in scores if i <= cutoff]
+    best = _best_result(results)
+    if best is None:
         return PalmPipelineResult(
             decision="reject",
             confidence=0.0,
             message="No valid frames or liveness failed.",
             match=False,
             liveness_score=float(np.mean(liveness_scores)) if liveness_scores else 0.0,
+            frame_reasons=frame_reasons,
         )
+    _, best_score, best_decision, best_match, best_hash = best
     return PalmPipelineResult(
         decision=best_decision.decision,
         confidence=best_decision.confidence,
@@ -172,6 +409,7 @@ def run_verification(
         liveness_score=float(np.mean(liveness_scores)) if liveness_scores else 0.0,
         similarity_score=best_score,
         template_hash=best_hash,
+        frame_reasons=frame_reasons,
     )
 
 
@@ -186,36 +424,25 @@ def run_verification_from_images(
         store = TemplateStore(base_dir=TEMPLATES_DIR, encrypt=ENCRYPT_TEMPLATES)
     loaded = store.load(user_id)
     if loaded is None:
-        return PalmPipelineResult(decision="reject", confidence=0.0, message="User not enrolled.", match=False)
+        return PalmPipelineResult(decision="reject", confidence=0.0, message=_NOT_ENROLLED, match=False)
     ref_vector, _ = loaded
     ir_images = ir_images or [None] * len(rgb_images)
-    best_score = 0.0
-    best_decision = None
-    best_match = False
-    best_hash = None
-    liveness_scores = []
-    for rgb, ir in zip(rgb_images, ir_images):
-        prep = preprocess_palm(rgb, ir)
-        live = check_palm_liveness(prep.palmprint_roi, prep.vein_roi, prep.geometry_vector)
-        if live.score < 0.4:
-            continue
-        liveness_scores.append(live.score)
-        identity, similarity, dec, match, template_hash = _run_single(prep, live, ref_vector=ref_vector)
-        if similarity > best_score:
-            best_score = similarity
-            best_decision = dec
-            best_match = match
-            best_hash = template_hash
-        if dec.decision == "accept":
-            break
-    if best_decision is None:
+    kept, frame_reasons = _drop_duplicates(rgb_images, min_keep=1)
+    frames = [(rgb_images[i], ir_images[i], None) for i in kept]
+    results, reasons, liveness_scores = _verify_burst(frames, kept, ref_vector)
+    frame_reasons.update(reasons)
+    best = _best_result(results)
+    if best is None:
         return PalmPipelineResult(
             decision="reject",
             confidence=0.0,
             message="No valid frames or liveness failed.",
             match=False,
             liveness_score=float(np.mean(liveness_scores)) if liveness_scores else 0.0,
+            frame_reasons=frame_reasons,
+            frames_skipped=len(rgb_images) - len(kept),
         )
+    _, best_score, best_decision, best_match, best_hash = best
     return PalmPipelineResult(
         decision=best_decision.decision,
         confidence=best_decision.confidence,
@@ -224,9 +451,130 @@ def run_verification_from_images(
         liveness_score=float(np.mean(liveness_scores)) if liveness_scores else 0.0,
         similarity_score=best_score,
         template_hash=best_hash,
+        frame_reasons=frame_reasons,
+        frames_skipped=len(rgb_images) - len(kept),
     )
 
 
+@dataclass
+class StreamUpdate:
+    """Outcome of one frame pushed to a VerificationStream."""
+    frame: int  # 0-based index in the stream
+    reasons: List[str] = field(default_factory=list)  # quality-gate reasons when the frame was dropped
+    liveness_score: Optional[float] = None  # None when the frame never reached liveness
+    decision: Optional[str] = None  # this frame's decision; None unless the frame was live
+    result: Optional[PalmPipelineResult] = None  # set once the stream is decided
+
+
+class VerificationStream:
+    """
+    Verification of frames that arrive one at a time (the /verify/stream endpoint), so frames are
+    processed while the client is still capturing. push() runs the quality gate, preprocessing and
+    liveness (geometry chained to the previous frame) and encodes / matches / decides live frames.
+    The stream is decided on the first accept, after reject_after consecutive reject decisions, or
+    once max_frames or timeout seconds are used up. The best frame so far decides, as in a batch of
+    the same frames. Not thread-safe: push frames in order from one caller.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        store: Optional[TemplateStore] = None,
+        max_frames: int = STREAM_MAX_FRAMES,
+        timeout: float = STREAM_TIMEOUT_SEC,
+        reject_after: int = STREAM_REJECT_AFTER,
+    ):
+        if store is None:
+            store = TemplateStore(base_dir=TEMPLATES_DIR, encrypt=ENCRYPT_TEMPLATES)
+        self.user_id = user_id
+        self.max_frames = max_frames
+        self.reject_after = reject_after
+        self.frames = 0
+        self.result: Optional[PalmPipelineResult] = None
+        self._t0 = time.perf_counter()
+        self._deadline = self._t0 + timeout
+        self._prev_geometry: Optional[np.ndarray] = None
+        self._frame_reasons: Dict[int, List[str]] = {}
+        self._scores: List[float] = []
+        self._results: List[tuple] = []
+        self._rejects = 0
+        loaded = store.load(user_id)
+        if loaded is None:
+            self.result = PalmPipelineResult(decision="reject", confidence=0.0, message=_NOT_ENROLLED, match=False)
+        else:
+            self._ref_vector, _ = loaded
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def remaining(self) -> float:
+        """Seconds left of the time budget."""
+        return max(0.0, self._deadline - time.perf_counter())
+
+    def push(self, rgb: np.ndarray, ir: Optional[np.ndarray] = None) -> StreamUpdate:
+        """Process the next frame; .result is set once the stream is decided."""
+        if self.result is not None:
+            raise RuntimeError("verification stream already decided")
+        update = StreamUpdate(frame=self.frames)
+        self.frames += 1
+        prep, update.reasons = _preprocess_checked(rgb, ir)
+        if prep is None:
+            self._frame_reasons[update.frame] = update.reasons
+        else:
+            live = check_palm_liveness(prep.palmprint_roi, prep.vein_roi, prep.geometry_vector, self._prev_geometry)
+            self._prev_geometry = prep.geometry_vector
+            update.liveness_score = live.score
+            if live.score >= 0.4:
+                self._scores.append(live.score)
+                _, similarity, dec, match, template_hash = _run_single(prep, live, ref_vector=self._ref_vector)
+                self._results.append((update.frame, similarity, dec, match, template_hash))
+                update.decision = dec.decision
+                self._rejects = self._rejects + 1 if dec.decision == "reject" else 0
+        if update.decision == "accept":
+            update.result = self._decide("accept")
+        elif self.reject_after and self._rejects >= self.reject_after:
+            update.result = self._decide("reject")
+        elif self.frames >= self.max_frames or self.remaining() <= 0:
+            update.result = self._decide("budget")
+        return update
+
+    def finish(self) -> PalmPipelineResult:
+        """Decide with the frames pushed so far (the client stopped sending, or the budget ran out while waiting)."""
+        if self.result is not None:
+            return self.result
+        return self._decide("budget" if self.remaining() <= 0 else "ended")
+
+    def _decide(self, outcome: str) -> PalmPipelineResult:
+        liveness_score = float(np.mean(self._scores)) if self._scores else 0.0
+        best = _best_result(self._results)
+        if best is None:
+            self.result = PalmPipelineResult(
+                decision="reject",
+                confidence=0.0,
+                message="No valid frames or liveness failed.",
+                match=False,
+                liveness_score=liveness_score,
+                frame_reasons=self._frame_reasons,
+            )
+        else:
+            _, best_score, best_decision, best_match, best_hash = best
+            self.result = PalmPipelineResult(
+                decision=best_decision.decision,
+                confidence=best_decision.confidence,
+                message=best_decision.message,
+                match=best_match,
+                liveness_score=liveness_score,
+                similarity_score=best_score,
+                template_hash=best_hash,
+                frame_reasons=self._frame_reasons,
+            )
+        _stream_latency.record((time.perf_counter() - self._t0) * 1000.0)
+        with _stream_lock:
+            _stream_outcomes[outcome] += 1
+        return self.result
+
+
 def run_enrollment_from_images(
     user_id: str,
     rgb_images: List[np.ndarray],
@@ -239,21 +587,28 @@ def run_enrollment_from_images(
     if store is None:
         store = TemplateStore(base_dir=TEMPLATES_DIR, encrypt=ENCRYPT_TEMPLATES)
     ir_images = ir_images or [None] * len(rgb_images)
-    vectors = []
-    liveness_scores = []
-    for rgb, ir in zip(rgb_images, ir_images):
-        prep = preprocess_palm(rgb, ir)
-        live = check_palm_liveness(prep.palmprint_roi, prep.vein_roi, prep.geometry_vector)
-        if live.score < 0.5:
-            continue
-        pp_emb = encode_palmprint(prep.palmprint_roi, device=DEVICE)
-        v_emb = encode_vein(prep.vein_roi, device=DEVICE)
-        g_emb = encode_geometry(prep.geometry_vector, device=DEVICE)
-        identity = fuse_modalities(pp_emb.embedding, v_emb.embedding, g_emb.embedding, device=DEVICE)
-        vectors.append(identity.vector)
-        liveness_scores.append(live.score)
-        if len(vectors) >= min_samples:
-            break
+    kept, frame_reasons = _drop_duplicates(rgb_images, min_keep=min_samples)
+    frames = [(rgb_images[i], ir_images[i], None) for i in kept]
+    preps: List[PalmPreprocessResult] = []
+    with closing(_preprocess_burst(frames)) as results:
+        for i, (prep, reasons) in zip(kept, results):
+            if prep is None:
+                frame_reasons[i] = reasons
+            else:
+                preps.append(prep)
+    burst = _burst_liveness(preps) if preps else None
+    if burst is not None and not burst.consistent:
+        return PalmPipelineResult(
+            decision="reject",
+            confidence=0.0,
+            message=_inconsistent_burst(burst),
+            match=False,
+            frame_reasons=frame_reasons,
+            frames_skipped=len(rgb_images) - len(kept),
+        )
+    live = [(prep, r) for prep, r in zip(preps, burst.frames if burst else []) if r.score >= 0.5][:min_samples]
+    liveness_scores = [r.score for _, r in live]
+    vectors = [identity.vector for identity in _encode_live(live)]
     if len(vectors) < min_samples:
         return PalmPipelineResult(
             decision="reject",
@@ -261,6 +616,8 @@ def run_enrollment_from_images(
             message=f"Need at least {min_samples} live samples; got {len(vectors)}.",
             match=False,
             liveness_score=float(np.mean(liveness_scores)) if liveness_scores else 0.0,
+            frame_reasons=frame_reasons,
+            frames_skipped=len(rgb_images) - len(kept),
         )
     mean_vec = np.mean(vectors, axis=0).astype(np.float32)
     mean_vec /= np.linalg.norm(mean_vec) + 1e-8
@@ -273,15 +630,33 @@ def run_enrollment_from_images(
         liveness_score=float(np.mean(liveness_scores)),
         similarity_score=1.0,
         template_hash=template_hash,
+        frame_reasons=frame_reasons,
+        frames_skipped=len(rgb_images) - len(kept),
     )
 
 
 def init_pipeline() -> None:
-    """Load encoders and fusion model; ensure dirs."""
+    """Apply the CPU thread budget, load encoders and fusion model, start the batching scheduler; ensure dirs."""
     from encoders import load_palmprint_encoder, load_vein_encoder, load_geometry_encoder
     from config import EMBEDDING_DIM_PALMPRINT, EMBEDDING_DIM_VEIN, EMBEDDING_DIM_GEOMETRY
-    load_palmprint_encoder(device=DEVICE, dim=EMBEDDING_DIM_PALMPRINT)
-    load_vein_encoder(device=DEVICE, dim=EMBEDDING_DIM_VEIN)
-    load_geometry_encoder(device=DEVICE, dim=EMBEDDING_DIM_GEOMETRY)
-    load_fusion_model(device=DEVICE)
+    apply_thread_budget(CPU_THREAD_BUDGET, workers=API_WORKERS, split=THREAD_SPLIT)
+    configure_executor(PREPROCESS_WORKERS, VERIFY_WORKERS)
+    compile_opts = dict(
+        compiled=COMPILE_MODELS,
+        warmup_batch_sizes=COMPILE_WARMUP_BATCH_SIZES if INFERENCE_BATCHING else (1,),
+    )
+    encoder_opts = dict(compile_opts, cache_size=EMBEDDING_CACHE_SIZE)
+    load_palmprint_encoder(device=DEVICE, dim=EMBEDDING_DIM_PALMPRINT, **encoder_opts)
+    load_vein_encoder(device=DEVICE, dim=EMBEDDING_DIM_VEIN, **encoder_opts)
+    load_geometry_encoder(device=DEVICE, dim=EMBEDDING_DIM_GEOMETRY, **encoder_opts)
+    load_fusion_model(device=DEVICE, **compile_opts)
+    if INFERENCE_BATCHING:
+        _encode_scheduler.start()
     TEMPLATES_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def shutdown_pipeline() -> None:
+    """Stop background workers started by init_pipeline() and release capture devices."""
+    _encode_scheduler.stop()
+    shutdown_executor()
+    close_capture_sessions()
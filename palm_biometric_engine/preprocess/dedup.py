@@ -0,0 +1,66 @@
+"""
+Near-duplicate frame elimination for multi-frame requests: 64-bit difference hash (dHash)
+per frame; consecutive frames within a Hamming radius form a group and only the sharpest
+frame of each group is kept (never fewer than min_keep frames).
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+from ..config import DEDUP_MAX_HAMMING, DEDUP_MIN_FRAMES
+from .quality import gray_thumbnail
+
+_HASH_THUMB_WIDTH = 64
+
+
+def dhash(img: np.ndarray, size: int = 8) -> int:
+    """size*size-bit difference hash: sign of horizontal gradients on a (size+1) x size thumbnail."""
+    small = cv2.resize(gray_thumbnail(img, _HASH_THUMB_WIDTH), (size + 1, size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _sharpness(img: np.ndarray) -> float:
+    return float(cv2.meanStdDev(cv2.Laplacian(gray_thumbnail(img, _HASH_THUMB_WIDTH), cv2.CV_32F))[1][0, 0] ** 2)
+
+
+def select_distinct(
+    images: Sequence[Optional[np.ndarray]],
+    max_distance: int = DEDUP_MAX_HAMMING,
+    min_keep: int = DEDUP_MIN_FRAMES,
+) -> List[int]:
+    """
+    Indices of frames to process, in input order. A frame joins the current group while its hash
+    is within max_distance of the group's first frame; each group keeps its sharpest frame. If that
+    leaves fewer than min_keep frames, the sharpest dropped frames are added back.
+    """
+    valid = [i for i, img in enumerate(images) if img is not None and img.size]
+    if cv2 is None or len(valid) <= max(1, min_keep):
+        return list(range(len(images)))
+    hashes = {i: dhash(images[i]) for i in valid}
+    sharp = {i: _sharpness(images[i]) for i in valid}
+    kept, dropped = [], []
+    group = [valid[0]]
+    for i in valid[1:]:
+        if bin(hashes[i] ^ hashes[group[0]]).count("1") <= max_distance:
+            group.append(i)
+            continue
+        best = max(group, key=sharp.get)
+        kept.append(best)
+        dropped.extend(j for j in group if j != best)
+        group = [i]
+    best = max(group, key=sharp.get)
+    kept.append(best)
+    dropped.extend(j for j in group if j != best)
+    if len(kept) < min_keep:
+        dropped.sort(key=sharp.get, reverse=True)
+        kept.extend(dropped[: min_keep - len(kept)])
+    invalid = [i for i in range(len(images)) if i not in hashes]
+    return sorted(kept + invalid)
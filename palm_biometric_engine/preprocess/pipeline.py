@@ -30,6 +30,16 @@ class PalmPreprocessResult:
     geometry_vector: np.ndarray    # hand shape/size/finger spacing
     palm_bbox: Optional[Tuple[int, int, int, int]] = None
     success: bool = True
+    palm_mask: Optional[np.ndarray] = None     # uint8 0/255 skin mask cropped to palm_bbox
+    palm_contour: Optional[np.ndarray] = None  # largest skin contour, full-frame coordinates
+
+
+@dataclass
+class PalmSegmentation:
+    """One segmentation pass: bbox plus the mask and contour it came from (None on fallback)."""
+    bbox: Tuple[int, int, int, int]
+    mask: Optional[np.ndarray] = None
+    contour: Optional[np.ndarray] = None
 
 
 def _noise_reduce(img: np.ndarray) -> np.ndarray:
@@ -40,8 +50,14 @@ def _noise_reduce(img: np.ndarray) -> np.ndarray:
     return cv2.GaussianBlur(img, NOISE_REDUCTION_KERNEL, 0)
 
 
-def _segment_palm_rgb(rgb: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
-    """Rough palm region: skin color + contour. Returns (x, y, w, h) or None."""
+def _center_bbox(shape: Tuple[int, ...]) -> Tuple[int, int, int, int]:
+    """Fallback: center crop 60% as palm."""
+    h, w = shape[:2]
+    return (int(w * 0.2), int(h * 0.2), int(w * 0.6), int(h * 0.6))
+
+
+def _segment_palm(rgb: np.ndarray) -> Optional[PalmSegmentation]:
+    """Skin color + largest contour, keeping mask and contour for ROI and geometry."""
     if cv2 is None or rgb is None:
         return None
     hsv = cv2.cvtColor(rgb, cv2.COLOR_BGR2HSV)
@@ -52,17 +68,18 @@ def _segment_palm_rgb(rgb: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
     mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((15, 15), np.uint8))
     contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
     if not contours:
-        # Fallback: center crop 60% as palm
-        h, w = rgb.shape[:2]
-        x = int(w * 0.2)
-        y = int(h * 0.2)
-        return (x, y, int(w * 0.6), int(h * 0.6))
+        return PalmSegmentation(bbox=_center_bbox(rgb.shape))
     largest = max(contours, key=cv2.contourArea)
     x, y, w, h = cv2.boundingRect(largest)
     if w < 30 or h < 30:
-        h, w = rgb.shape[:2]
-        return (int(w * 0.2), int(h * 0.2), int(w * 0.6), int(h * 0.6))
-    return (x, y, w, h)
+        return PalmSegmentation(bbox=_center_bbox(rgb.shape))
+    return PalmSegmentation(bbox=(x, y, w, h), mask=mask, contour=largest)
+
+
+def _segment_palm_rgb(rgb: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """Rough palm region: skin color + contour. Returns (x, y, w, h) or None."""
+    seg = _segment_palm(rgb)
+    return seg.bbox if seg is not None else None
 
 
 def _segment_palm_ir(ir: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
@@ -80,12 +97,52 @@ def _segment_palm_ir(ir: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
     return cv2.boundingRect(largest)
 
 
+# uint8 -> [0, 1] float32, same values as .astype(np.float32) / 255.0
+_UNIT_FLOAT_LUT = np.arange(256, dtype=np.uint8).astype(np.float32) / 255.0
+
+
+def _hist_percentiles(roi: np.ndarray, percentile: Tuple[float, float]) -> np.ndarray:
+    """
+    np.percentile(roi, percentile) for uint8 data from a 256-bin histogram, without sorting a copy.
+    Order statistics come from the CDF; interpolation mirrors numpy's "linear" method exactly.
+    """
+    hist = cv2.calcHist([roi], [0], None, [256], [0, 256]).ravel()
+    cdf = np.cumsum(hist.astype(np.int64))
+    n = int(cdf[-1])
+    virtual = (n - 1) * np.true_divide(np.asanyarray(percentile), 100)
+    prev = np.floor(virtual)
+    gamma = virtual - prev
+    prev_idx = np.clip(prev.astype(np.intp), 0, n - 1)
+    next_idx = np.clip(prev_idx + 1, 0, n - 1)
+    prev_idx = np.where(virtual >= n - 1, n - 1, prev_idx)
+    # Value at sorted position k is the first bin whose cumulative count exceeds k
+    a = np.searchsorted(cdf, prev_idx, side="right").astype(np.float64)
+    b = np.searchsorted(cdf, next_idx, side="right").astype(np.float64)
+    diff = b - a
+    return np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)
+
+
 def _normalize_roi(roi: np.ndarray, target_size: Tuple[int, int], percentile: Tuple[float, float] = (2, 98)) -> np.ndarray:
     """Resize and contrast-normalize ROI."""
     if cv2 is None:
         return np.asarray(roi)
     if roi.ndim == 3 and roi.shape[-1] == 1:
         roi = roi.squeeze(-1)
+    if roi.dtype != np.uint8 or roi.size == 0:
+        return _normalize_roi_float(roi, target_size, percentile)
+    if roi.ndim == 2:
+        # Percentile stretch as a 256-entry table: same expression as the float path, per grey level
+        lo, hi = _hist_percentiles(roi, percentile)
+        levels = np.clip((np.arange(256, dtype=np.uint8).astype(np.float32) - lo) / (hi - lo + 1e-8), 0, 1)
+        roi = cv2.LUT(roi, (levels * 255).astype(np.uint8))
+    roi = cv2.LUT(cv2.resize(roi, target_size), _UNIT_FLOAT_LUT)
+    if roi.ndim == 2:
+        roi = np.expand_dims(roi, axis=-1)
+    return roi
+
+
+def _normalize_roi_float(roi: np.ndarray, target_size: Tuple[int, int], percentile: Tuple[float, float]) -> np.ndarray:
+    """Reference path (non-uint8 input): np.percentile stretch, resize, scale to [0, 1]."""
     if roi.ndim == 2:
         lo, hi = np.percentile(roi, percentile)
         roi = np.clip((roi.astype(np.float32) - lo) / (hi - lo + 1e-8), 0, 1)
@@ -115,14 +172,14 @@ def extract_roi(
         palmprint_roi = np.stack([palmprint_roi] * 3, axis=-1)
 
     if ir is not None:
-        # Align IR to same bbox (resize ir to rgb size then crop, or scale bbox)
+        # Align IR to the same region by scaling the bbox (the ROI resize handles the rest)
         if ir.shape[:2] != rgb.shape[:2]:
-            ir_resized = cv2.resize(ir.squeeze(), (rgb.shape[1], rgb.shape[0])) if cv2 else ir
-            if ir_resized.ndim == 2:
-                ir_resized = np.expand_dims(ir_resized, -1)
+            sy, sx = ir.shape[0] / rgb.shape[0], ir.shape[1] / rgb.shape[1]
+            ix0, iy0 = int(x * sx), int(y * sy)
+            ix1, iy1 = max(ix0 + 1, int(round((x + w) * sx))), max(iy0 + 1, int(round((y + h) * sy)))
+            vein_crop = ir[iy0:iy1, ix0:ix1]
         else:
-            ir_resized = ir
-        vein_crop = ir_resized[y : y + h, x : x + w]
+            vein_crop = ir[y : y + h, x : x + w]
         if vein_crop.ndim == 3:
             vein_crop = vein_crop.squeeze()
         vein_crop = _noise_reduce(vein_crop)
@@ -135,21 +192,90 @@ def extract_roi(
     return palmprint_roi, vein_roi
 
 
+_GEOMETRY_DIM = 128
+_WIDTH_BANDS = 8   # mask width sampled at this many rows (palm -> fingertips)
+_MAX_VALLEYS = 4   # finger valleys between five fingers
+
+
+def _contour_features(
+    contour: np.ndarray,
+    mask: Optional[np.ndarray],
+    palm_bbox: Tuple[int, int, int, int],
+) -> np.ndarray:
+    """
+    Shape features from the segmentation contour: solidity, extent, compactness, log Hu moments,
+    finger valleys (convexity defects: count, depths, spacing) and hand width profile.
+    """
+    x, y, w, h = palm_bbox
+    area = float(cv2.contourArea(contour))
+    hull_pts = cv2.convexHull(contour)
+    hull_area = float(cv2.contourArea(hull_pts))
+    perimeter = float(cv2.arcLength(contour, True))
+    solidity = area / (hull_area + 1e-8)
+    extent = area / (w * h + 1e-8)
+    compactness = perimeter / (np.sqrt(area) + 1e-8) / 10.0
+    hu = cv2.HuMoments(cv2.moments(contour)).ravel()
+    hu = -np.sign(hu) * np.log10(np.abs(hu) + 1e-30) / 30.0
+
+    valley_depths = np.zeros(_MAX_VALLEYS, dtype=np.float32)
+    valley_gaps = np.zeros(_MAX_VALLEYS - 1, dtype=np.float32)
+    num_valleys = 0
+    try:
+        defects = cv2.convexityDefects(contour, cv2.convexHull(contour, returnPoints=False))
+    except cv2.error:
+        defects = None  # self-intersecting contour
+    if defects is not None:
+        d = defects[:, 0]
+        depth = d[:, 3] / 256.0  # fixed-point 8.8
+        deep = d[depth > 0.1 * h]
+        if len(deep):
+            deep = deep[np.argsort(-deep[:, 3])][:_MAX_VALLEYS]
+            far = contour[deep[:, 2], 0]
+            order = np.argsort(far[:, 0])
+            num_valleys = len(deep)
+            valley_depths[:num_valleys] = deep[order, 3] / 256.0 / (h + 1e-8)
+            if num_valleys > 1:
+                gaps = np.linalg.norm(np.diff(far[order].astype(np.float32), axis=0), axis=1)
+                valley_gaps[: num_valleys - 1] = gaps / (w + 1e-8)
+
+    widths = np.zeros(_WIDTH_BANDS, dtype=np.float32)
+    if mask is not None:
+        rows = y + ((np.arange(_WIDTH_BANDS) + 0.5) * h / _WIDTH_BANDS).astype(int)
+        widths[:] = np.count_nonzero(mask[rows, x : x + w], axis=1) / (w + 1e-8)
+
+    return np.concatenate([
+        np.array([solidity, extent, compactness, num_valleys / _MAX_VALLEYS], dtype=np.float32),
+        hu.astype(np.float32),
+        valley_depths,
+        valley_gaps,
+        widths,
+    ])
+
+
 def _geometry_features(
     rgb: np.ndarray,
     palm_bbox: Optional[Tuple[int, int, int, int]],
+    contour: Optional[np.ndarray] = None,
+    mask: Optional[np.ndarray] = None,
 ) -> np.ndarray:
-    """Hand geometry: aspect ratio, area ratio, simple shape stats (fixed-dim vector)."""
+    """
+    Hand geometry (fixed-dim vector): bbox aspect / area / position stats, followed by
+    contour shape features when a segmentation contour is available. The layout is
+    GEOMETRY_FEATURE_VERSION; identity vectors (and templates) from another layout do not compare.
+    """
     if palm_bbox is None:
-        return np.zeros(128, dtype=np.float32)  # placeholder dim
+        return np.zeros(_GEOMETRY_DIM, dtype=np.float32)  # placeholder dim
     x, y, w, h = palm_bbox
     aspect = w / (h + 1e-8)
     area_ratio = (w * h) / (rgb.shape[0] * rgb.shape[1] + 1e-8)
     # Pad to fixed size for encoder input
     feats = np.array([aspect, area_ratio, w, h, x, y], dtype=np.float32)
     feats = feats / (np.array([3.0, 1.0, 640.0, 480.0, 640.0, 480.0], dtype=np.float32) + 1e-8)
-    out = np.zeros(128, dtype=np.float32)
-    out[: min(6, len(out))] = feats[:6]
+    out = np.zeros(_GEOMETRY_DIM, dtype=np.float32)
+    out[:6] = feats
+    if contour is not None and cv2 is not None:
+        shape = _contour_features(contour, mask, palm_bbox)
+        out[6 : 6 + shape.size] = shape
     return out
 
 
@@ -160,14 +286,24 @@ def preprocess_palm(
 ) -> PalmPreprocessResult:
     """
     Full preprocessing: noise reduction, palm segmentation, ROI extraction, geometry.
+    Segmentation runs once; its bbox, mask and contour feed ROI extraction and geometry.
     """
-    palm_bbox = _segment_palm_rgb(rgb)
+    seg = _segment_palm(rgb)
+    palm_bbox = seg.bbox if seg is not None else None
     palmprint_roi, vein_roi = extract_roi(rgb, ir, palm_bbox)
-    geometry_vector = _geometry_features(rgb, palm_bbox)
+    contour = seg.contour if seg is not None else None
+    mask = seg.mask if seg is not None else None
+    geometry_vector = _geometry_features(rgb, palm_bbox, contour, mask)
+    palm_mask = None
+    if mask is not None:
+        x, y, w, h = palm_bbox
+        palm_mask = mask[y : y + h, x : x + w]
     return PalmPreprocessResult(
         palmprint_roi=palmprint_roi,
         vein_roi=vein_roi,
         geometry_vector=geometry_vector,
         palm_bbox=palm_bbox,
         success=True,
+        palm_mask=palm_mask,
+        palm_contour=contour,
     )
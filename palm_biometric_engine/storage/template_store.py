@@ -12,6 +12,8 @@ from typing import Optional, Tuple
 
 import numpy as np
 
+from ..config import GEOMETRY_FEATURE_VERSION
+
 try:
     from cryptography.fernet import Fernet
     from cryptography.hazmat.primitives import hashes
@@ -67,16 +69,19 @@ def decrypt_template(encrypted: bytes) -> bytes:
 
 
 def template_to_bytes(vector: np.ndarray) -> bytes:
-    """Serialize identity vector only (no images)."""
+    """Serialize identity vector only (no images), tagged with the geometry feature layout it was built from."""
     return json.dumps({
         "vec": vector.astype(np.float32).tobytes().hex(),
         "shape": list(vector.shape),
+        "geometry_version": GEOMETRY_FEATURE_VERSION,
     }).encode("utf-8")
 
 
-def bytes_to_template(data: bytes) -> np.ndarray:
+def bytes_to_template(data: bytes) -> Tuple[np.ndarray, int]:
+    """Identity vector and its geometry feature version (1 for templates written before versioning)."""
     raw = json.loads(data.decode("utf-8"))
-    return np.frombuffer(bytes.fromhex(raw["vec"]), dtype=np.float32).reshape(raw["shape"])
+    vec = np.frombuffer(bytes.fromhex(raw["vec"]), dtype=np.float32).reshape(raw["shape"])
+    return vec, int(raw.get("geometry_version", 1))
 
 
 class TemplateStore:
@@ -102,13 +107,19 @@ class TemplateStore:
         return template_hash(vector)
 
     def load(self, user_id: str) -> Optional[Tuple[np.ndarray, Optional[str]]]:
+        """
+        (vector, hash), or None if the user has no template or it was enrolled with another
+        GEOMETRY_FEATURE_VERSION (its geometry features would not compare; the user must re-enroll).
+        """
         p = self._path(user_id)
         if not p.exists():
             return None
         data = p.read_bytes()
         if self.encrypt:
             data = decrypt_template(data)
-        vec = bytes_to_template(data)
+        vec, geometry_version = bytes_to_template(data)
+        if geometry_version != GEOMETRY_FEATURE_VERSION:
+            return None
         meta_path = p.with_suffix(".meta")
         h = None
         if meta_path.exists():